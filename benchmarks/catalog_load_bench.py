@@ -0,0 +1,55 @@
+"""Benchmarks catalog loading with different numbers of parsing processes.
+
+Each run times parsing alone and the full VideoLibrary constructor, which
+also builds the ordinal, tag, title, completion and listing indexes.
+
+Run from the repository root:
+    python -m benchmarks.catalog_load_bench [rows] [workers ...]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from src import video_library
+
+
+def write_catalog(path, rows):
+    """Writes a synthetic catalog with rows lines and a few hundred tags."""
+    with open(path, "w") as catalog:
+        for i in range(rows):
+            catalog.write(f"Synthetic video number {i} | video_{i}_id | "
+                          f"#tag{i % 97} , #tag{i % 389} , #all\n")
+
+
+def time_load(path, workers):
+    """Returns the seconds taken to parse the catalog, and to load a
+    VideoLibrary from it, with workers processes."""
+    start = time.perf_counter()
+    video_library._read_catalog(path, workers)
+    parsed = time.perf_counter()
+    video_library.VideoLibrary(path, workers=workers)
+    return parsed - start, time.perf_counter() - parsed
+
+
+def main(argv):
+    rows = int(argv[0]) if argv else 2_000_000
+    worker_counts = [int(arg) for arg in argv[1:]] or sorted(
+        {1, 2, 4, os.cpu_count() or 1})
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "videos.txt")
+        write_catalog(path, rows)
+        size_mb = os.path.getsize(path) / 2 ** 20
+        print(f"{rows} rows, {size_mb:.1f} MB")
+        video_library.PARALLEL_LOAD_MIN_BYTES = 0
+        baseline = None
+        for workers in worker_counts:
+            parse_seconds, seconds = time_load(path, workers)
+            baseline = baseline or seconds
+            print(f"workers={workers:<3} parse {parse_seconds:7.2f}s  "
+                  f"load {seconds:7.2f}s  speedup x{baseline / seconds:.2f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
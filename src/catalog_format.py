@@ -0,0 +1,233 @@
+"""Reading and writing of the columnar catalog format.
+
+A columnar catalog stores each field of the videos in its own separately
+compressed column, so a process can load only the columns it needs:
+
+    MAGIC
+    header length (uint32, little endian)
+    header: JSON {"compression", "rows", "columns": {name: [offset, length]}}
+    column blobs, offsets relative to the end of the header
+
+Columns:
+    strings      Deduplicated tag and flag-reason strings, NUL separated.
+    ids          Video ids, NUL separated.
+    titles       Video titles, NUL separated.
+    tag_offsets  uint32 array; the tags of row i are
+                 tag_ids[tag_offsets[i]:tag_offsets[i + 1]].
+    tag_ids      uint32 array of indexes into strings.
+    flags        int32 array; index into strings of the flag reason, or -1.
+"""
+
+from array import array
+import json
+import lzma
+import struct
+import sys
+import zlib
+
+MAGIC = b"VIDCOLS1"
+
+_SEPARATOR = "\x00"
+
+_COMPRESSORS = {
+    "none": (lambda data: data, lambda data: data),
+    "zlib": (zlib.compress, zlib.decompress),
+    "lzma": (lzma.compress, lzma.decompress),
+}
+
+# Columns needed to decode each column besides itself.
+_DEPENDENCIES = {
+    "tag_ids": ("strings", "tag_offsets"),
+    "flags": ("strings",),
+}
+
+
+class CatalogFormatException(Exception):
+    """A class used to represent an unreadable columnar catalog."""
+    pass
+
+
+def is_columnar_catalog(path):
+    """Returns True if the file at path starts with the columnar MAGIC."""
+    with open(path, "rb") as catalog_file:
+        return catalog_file.read(len(MAGIC)) == MAGIC
+
+
+def _pack_strings(strings):
+    return _SEPARATOR.join(strings).encode("utf-8")
+
+
+def _unpack_strings(data, rows):
+    return str(data, "utf-8").split(_SEPARATOR) if rows else []
+
+
+def _pack_array(values):
+    values = array(values.typecode, values)
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values.tobytes()
+
+
+def _unpack_array(typecode, data):
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values
+
+
+def write_columnar_catalog(path, rows, compression="zlib"):
+    """Writes catalog rows in the columnar format.
+
+    Args:
+        path: The file to write.
+        rows: Iterable of (video_id, title, tags, flag) tuples, flag being
+            the flag reason or None.
+        compression: "zlib", "lzma" or "none".
+    """
+    data = columnar_catalog_bytes(rows, compression)
+    with open(path, "wb") as catalog_file:
+        catalog_file.write(data)
+
+
+def columnar_catalog_bytes(rows, compression="zlib"):
+    """Returns catalog rows encoded in the columnar format.
+
+    Args:
+        rows: Iterable of (video_id, title, tags, flag) tuples.
+        compression: "zlib", "lzma" or "none".
+    """
+    if compression not in _COMPRESSORS:
+        raise CatalogFormatException(f"Unknown compression: {compression}")
+    compress = _COMPRESSORS[compression][0]
+
+    string_ids = {}
+    ids, titles, flags = [], [], array("i")
+    tag_offsets, tag_ids = array("I", [0]), array("I")
+    for video_id, title, tags, flag in rows:
+        ids.append(video_id)
+        titles.append(title)
+        for tag in tags:
+            tag_ids.append(string_ids.setdefault(tag, len(string_ids)))
+        tag_offsets.append(len(tag_ids))
+        flags.append(-1 if flag is None else string_ids.setdefault(flag, len(string_ids)))
+
+    columns = {
+        "strings": _pack_strings(string_ids),
+        "ids": _pack_strings(ids),
+        "titles": _pack_strings(titles),
+        "tag_offsets": _pack_array(tag_offsets),
+        "tag_ids": _pack_array(tag_ids),
+        "flags": _pack_array(flags),
+    }
+    directory, blobs, offset = {}, [], 0
+    for name, data in columns.items():
+        blob = compress(data)
+        directory[name] = [offset, len(blob)]
+        blobs.append(blob)
+        offset += len(blob)
+    header = json.dumps({"compression": compression, "rows": len(ids),
+                         "columns": directory}).encode("utf-8")
+
+    return b"".join([MAGIC, struct.pack("<I", len(header)), header] + blobs)
+
+
+def read_columnar_catalog(path, columns=("ids", "titles", "tags", "flags")):
+    """Reads some columns of a columnar catalog.
+
+    Only the byte ranges of the requested columns (and the string dictionary
+    when tags or flags are requested) are read and decompressed.
+
+    Args:
+        path: The file to read.
+        columns: Any of "ids", "titles", "tags" and "flags".
+
+    Returns:
+        A dict mapping each requested column to a list with one entry per
+        row: id and title strings, tuples of tags, flag reasons or None.
+
+    Raises:
+        CatalogFormatException: If the file is not a columnar catalog or
+            is damaged, e.g. truncated while being written.
+    """
+    with open(path, "rb") as catalog_file:
+        try:
+            return _read_columns(catalog_file, columns, path)
+        except (struct.error, ValueError, KeyError, IndexError, TypeError,
+                zlib.error, lzma.LZMAError) as e:
+            raise CatalogFormatException(f"{path} is damaged: {e}") from e
+
+
+def read_columnar_buffer(buffer, columns=("ids", "titles", "tags", "flags")):
+    """Reads some columns of a columnar catalog held in memory.
+
+    With compression "none", column bytes are decoded straight from buffer
+    (e.g. a shared memory segment) without an intermediate copy.
+
+    Args:
+        buffer: A bytes-like object holding a columnar catalog.
+        columns: Any of "ids", "titles", "tags" and "flags".
+
+    Returns:
+        The same dict as read_columnar_catalog.
+    """
+    return _read_columns(_BufferReader(buffer), columns, "buffer")
+
+
+class _BufferReader:
+    """Minimal read/seek/tell file interface over a memoryview"""
+
+    def __init__(self, buffer):
+        self._view = memoryview(buffer).cast("B")
+        self._position = 0
+
+    def read(self, size):
+        data = self._view[self._position:self._position + size]
+        self._position += len(data)
+        return data
+
+    def seek(self, position):
+        self._position = position
+
+    def tell(self):
+        return self._position
+
+
+def _read_columns(catalog_file, columns, source):
+    """Reads and decodes the requested columns from a file-like object"""
+    stored = {"tags": "tag_ids"}
+    needed = set()
+    for column in columns:
+        name = stored.get(column, column)
+        needed.add(name)
+        needed.update(_DEPENDENCIES.get(name, ()))
+
+    if bytes(catalog_file.read(len(MAGIC))) != MAGIC:
+        raise CatalogFormatException(f"{source} is not a columnar catalog")
+    (header_length,) = struct.unpack("<I", catalog_file.read(4))
+    header = json.loads(bytes(catalog_file.read(header_length)))
+    decompress = _COMPRESSORS[header["compression"]][1]
+    base = catalog_file.tell()
+    raw = {}
+    for name in needed:
+        if name not in header["columns"]:
+            raise CatalogFormatException(f"Unknown column: {name}")
+        offset, length = header["columns"][name]
+        catalog_file.seek(base + offset)
+        raw[name] = decompress(catalog_file.read(length))
+
+    rows = header["rows"]
+    strings = _unpack_strings(raw["strings"], True) if "strings" in raw else None
+    result = {}
+    for column in columns:
+        if column in ("ids", "titles"):
+            result[column] = _unpack_strings(raw[column], rows)
+        elif column == "tags":
+            offsets = _unpack_array("I", raw["tag_offsets"])
+            tag_ids = _unpack_array("I", raw["tag_ids"])
+            result[column] = [tuple(strings[tag_id] for tag_id in tag_ids[offsets[i]:offsets[i + 1]])
+                              for i in range(rows)]
+        elif column == "flags":
+            result[column] = [None if flag < 0 else strings[flag]
+                              for flag in _unpack_array("i", raw["flags"])]
+    return result
@@ -0,0 +1,85 @@
+"""Recording and replaying of command sessions.
+
+A command log is a JSON lines file, gzip compressed when its name ends in
+.gz. Each line is one command:
+
+    {"t": seconds since the session started, "cmd": the command line,
+     "answers": answers given to search prompts, "out": printed output}
+"""
+
+import contextlib
+import gzip
+import io
+import json
+import sys
+import time
+
+
+def _open_log(path, mode):
+    if str(path).endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def read_log(path):
+    """Returns the entries of a command log as a list of dicts"""
+    with _open_log(path, "r") as log_file:
+        return [json.loads(line) for line in log_file if line.strip()]
+
+
+class _Tee(io.TextIOBase):
+    """Writes to a stream while keeping a copy of the text"""
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._copy = io.StringIO()
+
+    def write(self, text):
+        self._copy.write(text)
+        return self._stream.write(text)
+
+    def flush(self):
+        self._stream.flush()
+
+    def getvalue(self):
+        return self._copy.getvalue()
+
+
+class CommandRecorder:
+    """A class used to record the commands of an interactive session."""
+
+    def __init__(self, path, video_player):
+        """Starts recording to path and hooks the player's search prompts.
+
+        Args:
+            path: The log file to write, gzip compressed if it ends in .gz.
+            video_player: The VideoPlayer whose prompt answers are recorded.
+        """
+        self._log_file = _open_log(path, "w")
+        self._start = time.monotonic()
+        self._answers = []
+        video_player.response_reader = self._read_answer
+
+    def _read_answer(self):
+        answer = input()
+        self._answers.append(answer)
+        return answer
+
+    @contextlib.contextmanager
+    def record(self, command_line):
+        """Context manager recording one command and the output it prints"""
+        timestamp = time.monotonic() - self._start
+        self._answers = []
+        tee = _Tee(sys.stdout)
+        try:
+            with contextlib.redirect_stdout(tee):
+                yield
+        finally:
+            self._log_file.write(json.dumps({
+                "t": round(timestamp, 6), "cmd": command_line,
+                "answers": self._answers, "out": tee.getvalue(),
+            }, separators=(",", ":")) + "\n")
+
+    def close(self):
+        """Flushes and closes the log file"""
+        self._log_file.close()
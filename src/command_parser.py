@@ -4,6 +4,22 @@ import textwrap
 from typing import Sequence
 
 
+# Command names offered by tab-completion in the interactive shell.
+COMMAND_NAMES = (
+    "NUMBER_OF_VIDEOS", "SHOW_ALL_VIDEOS", "PLAY", "PLAY_RANDOM", "STOP",
+    "PAUSE", "CONTINUE", "SHOW_PLAYING", "CREATE_PLAYLIST", "ADD_TO_PLAYLIST",
+    "REMOVE_FROM_PLAYLIST", "CLEAR_PLAYLIST", "DELETE_PLAYLIST",
+    "SHOW_PLAYLIST", "SHOW_ALL_PLAYLISTS", "SEARCH_VIDEOS",
+    "SEARCH_VIDEOS_WITH_TAG", "FLAG_VIDEO", "ALLOW_VIDEO", "FLAG_VIDEOS",
+    "ALLOW_VIDEOS", "SEARCH_CACHE_STATS", "COMPLETE", "ADD_VIDEO",
+    "REMOVE_VIDEO", "RETAG_VIDEO", "SEARCH_TAGS", "PLAY_PLAYLIST", "NEXT",
+    "PREVIOUS", "HISTORY", "PLAY_LAST", "RECOMMEND", "SAVE_STATE",
+    "LOAD_STATE", "SHOW_FLAGGED", "ALLOW_BY_REASON", "SEARCH_PLAYLIST",
+    "SEARCH_PLAYLIST_TAG", "TRENDING", "TOP_SEARCHES", "FIND_DUPLICATES",
+    "HELP", "EXIT",
+)
+
+
 class CommandException(Exception):
     """A class used to represent a wrong command exception."""
     pass
@@ -59,18 +75,25 @@ class CommandParser:
             self._player.create_playlist(command[1])
 
         elif command[0].upper() == "ADD_TO_PLAYLIST":
-            if len(command) != 3:
+            if len(command) == 3:
+                self._player.add_to_playlist(command[1], command[2])
+            elif len(command) > 3:
+                self._player.add_videos_to_playlist(command[1], command[2:])
+            else:
                 raise CommandException(
                     "Please enter ADD_TO_PLAYLIST command followed by a "
-                    "playlist name and video_id to add.")
-            self._player.add_to_playlist(command[1], command[2])
+                    "playlist name and one or more video_ids to add.")
 
         elif command[0].upper() == "REMOVE_FROM_PLAYLIST":
-            if len(command) != 3:
+            if len(command) == 3:
+                self._player.remove_from_playlist(command[1], command[2])
+            elif len(command) > 3:
+                self._player.remove_videos_from_playlist(
+                    command[1], command[2:])
+            else:
                 raise CommandException(
                     "Please enter REMOVE_FROM_PLAYLIST command followed by a "
-                    "playlist name and video_id to remove.")
-            self._player.remove_from_playlist(command[1], command[2])
+                    "playlist name and one or more video_ids to remove.")
 
         elif command[0].upper() == "CLEAR_PLAYLIST":
             if len(command) != 2:
@@ -94,7 +117,87 @@ class CommandParser:
             self._player.show_playlist(command[1])
 
         elif command[0].upper() == "SHOW_ALL_PLAYLISTS":
-            self._player.show_all_playlists()
+            arguments, page = command[1:], None
+            if len(arguments) >= 2 and arguments[-2].upper() == "PAGE":
+                if not arguments[-1].isdigit():
+                    raise CommandException(
+                        "Please enter SHOW_ALL_PLAYLISTS command optionally "
+                        "followed by a prefix and PAGE <number>.")
+                arguments, page = arguments[:-2], int(arguments[-1])
+            if len(arguments) > 1:
+                raise CommandException(
+                    "Please enter SHOW_ALL_PLAYLISTS command optionally "
+                    "followed by a prefix and PAGE <number>.")
+            self._player.show_all_playlists(arguments[0] if arguments else "", page)
+
+        elif command[0].upper() == "PLAY_PLAYLIST":
+            if len(command) == 2:
+                self._player.play_playlist(command[1])
+            elif len(command) == 3 and command[2].upper() == "SHUFFLE":
+                self._player.play_playlist(command[1], shuffle=True)
+            else:
+                raise CommandException(
+                    "Please enter PLAY_PLAYLIST command followed by a "
+                    "playlist name and optionally SHUFFLE.")
+
+        elif command[0].upper() == "NEXT":
+            self._player.next_video()
+
+        elif command[0].upper() == "PREVIOUS":
+            self._player.previous_video()
+
+        elif command[0].upper() == "HISTORY":
+            if len(command) == 1:
+                self._player.show_history()
+            elif len(command) == 2 and command[1].isdigit():
+                self._player.show_history(int(command[1]))
+            else:
+                raise CommandException(
+                    "Please enter HISTORY command optionally followed by "
+                    "the number of events to show.")
+
+        elif command[0].upper() == "FIND_DUPLICATES":
+            if len(command) == 1:
+                self._player.find_duplicates()
+            elif len(command) == 2:
+                self._player.find_duplicates(command[1])
+            else:
+                raise CommandException(
+                    "Please enter FIND_DUPLICATES command optionally followed "
+                    "by a video_id.")
+
+        elif command[0].upper() == "TRENDING":
+            if len(command) == 1:
+                self._player.show_trending()
+            elif len(command) == 2 and command[1].isdigit():
+                self._player.show_trending(int(command[1]))
+            else:
+                raise CommandException(
+                    "Please enter TRENDING command optionally followed by "
+                    "the number of videos to show.")
+
+        elif command[0].upper() == "TOP_SEARCHES":
+            if len(command) == 1:
+                self._player.show_top_searches()
+            elif len(command) == 2 and command[1].isdigit():
+                self._player.show_top_searches(int(command[1]))
+            else:
+                raise CommandException(
+                    "Please enter TOP_SEARCHES command optionally followed by "
+                    "the number of search terms to show.")
+
+        elif command[0].upper() == "PLAY_LAST":
+            self._player.play_last()
+
+        elif command[0].upper() == "RECOMMEND":
+            if len(command) == 1:
+                self._player.recommend()
+            elif len(command) == 2:
+                self._player.recommend(command[1])
+            else:
+                raise CommandException(
+                    "Please enter RECOMMEND command optionally followed by "
+                    "a video_id.")
 
         elif command[0].upper() == "SEARCH_VIDEOS":
             if len(command) != 2:
@@ -110,6 +213,27 @@ class CommandParser:
                     "video tag.")
             self._player.search_videos_tag(command[1])
 
+        elif command[0].upper() == "SEARCH_PLAYLIST":
+            if len(command) != 3:
+                raise CommandException(
+                    "Please enter SEARCH_PLAYLIST command followed by a "
+                    "playlist name and a search term.")
+            self._player.search_playlist(command[1], command[2])
+
+        elif command[0].upper() == "SEARCH_PLAYLIST_TAG":
+            if len(command) != 3:
+                raise CommandException(
+                    "Please enter SEARCH_PLAYLIST_TAG command followed by a "
+                    "playlist name and a video tag.")
+            self._player.search_playlist_tag(command[1], command[2])
+
+        elif command[0].upper() == "SEARCH_TAGS":
+            if len(command) < 2:
+                raise CommandException(
+                    "Please enter SEARCH_TAGS command followed by a tag "
+                    "expression, e.g. #cat AND NOT #dog.")
+            self._player.search_tags(" ".join(command[1:]))
+
         elif command[0].upper() == "FLAG_VIDEO":
             if len(command) == 3:
                 self._player.flag_video(command[1], command[2])
@@ -127,6 +251,82 @@ class CommandParser:
                     "video_id.")
             self._player.allow_video(command[1])
 
+        elif command[0].upper() == "FLAG_VIDEOS":
+            if len(command) < 3:
+                raise CommandException(
+                    "Please enter FLAG_VIDEOS command followed by a "
+                    "flag reason and one or more video_ids.")
+            self._player.flag_videos(command[1], command[2:])
+
+        elif command[0].upper() == "ALLOW_VIDEOS":
+            if len(command) < 2:
+                raise CommandException(
+                    "Please enter ALLOW_VIDEOS command followed by one or "
+                    "more video_ids.")
+            self._player.allow_videos(command[1:])
+
+        elif command[0].upper() == "SHOW_FLAGGED":
+            if len(command) == 1:
+                self._player.show_flagged()
+            else:
+                self._player.show_flagged(" ".join(command[1:]))
+
+        elif command[0].upper() == "ALLOW_BY_REASON":
+            if len(command) < 2:
+                raise CommandException(
+                    "Please enter ALLOW_BY_REASON command followed by a "
+                    "flag reason.")
+            self._player.allow_by_reason(" ".join(command[1:]))
+
+        elif command[0].upper() == "ADD_VIDEO":
+            title_words = [word for word in command[2:]
+                           if not word.startswith("#")]
+            if len(command) < 3 or not title_words:
+                raise CommandException(
+                    "Please enter ADD_VIDEO command followed by a video_id, "
+                    "a title and optional #tags.")
+            self._player.add_video(
+                command[1], " ".join(title_words),
+                [word for word in command[2:] if word.startswith("#")])
+
+        elif command[0].upper() == "REMOVE_VIDEO":
+            if len(command) != 2:
+                raise CommandException(
+                    "Please enter REMOVE_VIDEO command followed by a "
+                    "video_id.")
+            self._player.remove_video_from_library(command[1])
+
+        elif command[0].upper() == "RETAG_VIDEO":
+            if len(command) < 2:
+                raise CommandException(
+                    "Please enter RETAG_VIDEO command followed by a "
+                    "video_id and the new #tags.")
+            self._player.retag_video(command[1], command[2:])
+
+        elif command[0].upper() == "SAVE_STATE":
+            if len(command) != 2:
+                raise CommandException(
+                    "Please enter SAVE_STATE command followed by a file "
+                    "path.")
+            self._player.save_state(command[1])
+
+        elif command[0].upper() == "LOAD_STATE":
+            if len(command) != 2:
+                raise CommandException(
+                    "Please enter LOAD_STATE command followed by a file "
+                    "path.")
+            self._player.load_state(command[1])
+
+        elif command[0].upper() == "SEARCH_CACHE_STATS":
+            self._player.search_cache_stats()
+
+        elif command[0].upper() == "COMPLETE":
+            if len(command) != 2:
+                raise CommandException(
+                    "Please enter COMPLETE command followed by the start of "
+                    "a video_id or title.")
+            self._player.complete(command[1])
+
         elif command[0].upper() == "HELP":
             self._get_help()
         else:
@@ -147,16 +347,39 @@ class CommandParser:
             CONTINUE - Resume the current paused video.
             SHOW_PLAYING - Displays the title, url and paused status of the video that is currently playing (or paused).
             CREATE_PLAYLIST <playlist_name> - Creates a new (empty) playlist with the provided name.
-            ADD_TO_PLAYLIST <playlist_name> <video_id> - Adds the requested video to the playlist.
-            REMOVE_FROM_PLAYLIST <playlist_name> <video_id> - Removes the specified video from the specified playlist
+            ADD_TO_PLAYLIST <playlist_name> <video_id> [<video_id> ...] - Adds the requested videos to the playlist.
+            REMOVE_FROM_PLAYLIST <playlist_name> <video_id> [<video_id> ...] - Removes the specified videos from the specified playlist
             CLEAR_PLAYLIST <playlist_name> - Removes all the videos from the playlist.
             DELETE_PLAYLIST <playlist_name> - Deletes the playlist.
             SHOW_PLAYLIST <playlist_name> - List all the videos in this playlist.
-            SHOW_ALL_PLAYLISTS - Display all the available playlists.
+            SHOW_ALL_PLAYLISTS [prefix] [PAGE <n>] - Display the available playlists, optionally only those starting with prefix or one page of them.
+            PLAY_PLAYLIST <playlist_name> [SHUFFLE] - Plays the videos of the playlist, in order or shuffled.
+            NEXT - Plays the next video of the playlist being played.
+            PREVIOUS - Plays the previous video of the playlist being played.
+            HISTORY [n] - Displays the n (default 10) most recent play, stop, pause and continue events.
+            FIND_DUPLICATES [video_id] - Displays videos with nearly the same title and tags as video_id, or all groups of them.
+            TRENDING [n] - Displays the n (default 10) most played videos.
+            TOP_SEARCHES [n] - Displays the n (default 10) most frequent search terms.
+            PLAY_LAST - Plays again the most recently played video other than the current one.
+            RECOMMEND [video_id] - Displays videos sharing the most tags with the given (or playing) video.
             SEARCH_VIDEOS <search_term> - Display all the videos whose titles contain the search_term.
             SEARCH_VIDEOS_WITH_TAG <tag_name> -Display all videos whose tags contains the provided tag.
+            SEARCH_PLAYLIST <playlist_name> <search_term> - Display the videos of a playlist whose titles contain the search_term.
+            SEARCH_PLAYLIST_TAG <playlist_name> <tag_name> - Display the videos of a playlist whose tags contain the provided tag.
+            SEARCH_TAGS <tag_expression> - Display all videos matching tags combined with AND, OR, NOT and parentheses.
             FLAG_VIDEO <video_id> <flag_reason> - Mark a video as flagged.
             ALLOW_VIDEO <video_id> - Removes a flag from a video.
+            FLAG_VIDEOS <flag_reason> <video_id> [<video_id> ...] - Flags several videos with the same reason.
+            ALLOW_VIDEOS <video_id> [<video_id> ...] - Removes the flag from several videos.
+            SHOW_FLAGGED [flag_reason] - Lists the videos flagged with a reason, or how many videos each reason flagged.
+            ALLOW_BY_REASON <flag_reason> - Removes the flag from every video flagged with the reason.
+            ADD_VIDEO <video_id> <title> [#tag ...] - Adds a new video to the library.
+            REMOVE_VIDEO <video_id> - Removes a video from the library and from every playlist.
+            RETAG_VIDEO <video_id> [#tag ...] - Replaces the tags of a video.
+            SAVE_STATE <path> - Saves flags, playlists and playback state to a file.
+            LOAD_STATE <path> - Restores flags, playlists and playback state from a file.
+            SEARCH_CACHE_STATS - Shows hit and miss counters of the search result cache.
+            COMPLETE <prefix> - Lists videos whose video_id or title starts with the prefix.
             HELP - Displays help.
             EXIT - Terminates the program execution.
         """)
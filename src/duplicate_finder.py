@@ -0,0 +1,187 @@
+"""A near-duplicate video finder class."""
+
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+import os
+import random
+import zlib
+
+_PRIME = (1 << 61) - 1                                  # Modulus of the MinHash permutations
+_EMPTY = (1 << 64) - 1                                  # Signature value of videos without features
+PARALLEL_THRESHOLD = 20000                              # Videos from which signatures use a process pool
+_CHUNK_SIZE = 5000                                      # Videos per process pool task
+
+
+def video_features(title, tags, k=3):
+    """Returns the hashed features of a video: title k-shingles and tags.
+
+    Titles are case-folded and reduced to words of letters and digits
+    before being cut into overlapping k-character shingles.
+    """
+    words = "".join(char if char.isalnum() else " " for char in title.casefold()).split()
+    text = " ".join(words)
+    shingles = {text[index:index + k] for index in range(max(len(text) - k + 1, 1))} if text else set()
+    shingles.update(tag.casefold() for tag in tags)
+    return [zlib.crc32(feature.encode("utf-8")) for feature in shingles]
+
+
+def _permutations(num_perm, seed):
+    """Returns the (a, b) coefficients of the hash permutations a * x + b"""
+    rng = random.Random(seed)
+    return [(rng.randrange(1, _PRIME), rng.randrange(_PRIME)) for _ in range(num_perm)]
+
+
+def _signatures(task):
+    """Returns the MinHash signatures of (title, tags) items as one flat array.
+
+    Module level so it can run in a process pool; removed videos are None.
+    """
+    items, num_perm, seed = task
+    permutations = _permutations(num_perm, seed)
+    signatures = array("Q")
+    for item in items:
+        features = video_features(*item) if item else None
+        if not features:
+            signatures.extend([_EMPTY] * num_perm)
+            continue
+        signatures.extend(min((a * feature + b) % _PRIME for feature in features)
+                          for a, b in permutations)
+    return signatures
+
+
+class DuplicateFinder:
+    """A class used to find videos whose titles and tags nearly match.
+
+    Every video gets a MinHash signature over its title shingles and tags,
+    stored in one flat array. Signatures are cut into bands and each band
+    is hashed into a bucket, so videos sharing any band are candidates
+    (locality-sensitive hashing). A query only compares the video with the
+    members of its own buckets, and candidates are kept when the share of
+    equal signature values, an estimate of their Jaccard similarity,
+    reaches the threshold.
+    """
+
+    def __init__(self, library, num_perm=64, bands=16, threshold=0.5, processes=None, seed=1):
+        """Builds the signatures and band buckets of every video of the library.
+
+        Args:
+            library: The VideoLibrary to search.
+            num_perm: Number of MinHash values per video.
+            bands: Number of LSH bands; num_perm must be a multiple.
+            threshold: Minimum estimated similarity of duplicates.
+            processes: Worker processes computing signatures; by default a
+                pool is only used from PARALLEL_THRESHOLD videos on.
+            seed: Seed of the hash permutations.
+        """
+        self._num_perm = num_perm
+        self._rows = num_perm // bands
+        self._threshold = threshold
+        self._catalog_version = library.catalog_version
+        size = library.ordinal_count
+
+        items = [None] * size
+        for video in library.get_all_videos():
+            items[library.get_ordinal(video.video_id)] = (video.title, video.tags)
+        tasks = [(items[start:start + _CHUNK_SIZE], num_perm, seed) for start in range(0, size, _CHUNK_SIZE)]
+        if processes is None:
+            processes = os.cpu_count() if size >= PARALLEL_THRESHOLD else 1
+        self._signatures = array("Q")
+        if processes > 1 and len(tasks) > 1:
+            with ProcessPoolExecutor(processes) as pool:
+                for signatures in pool.map(_signatures, tasks):
+                    self._signatures.extend(signatures)
+        else:
+            for task in tasks:
+                self._signatures.extend(_signatures(task))
+
+        # One bucket dict per band: hash of the band values -> ordinals
+        self._buckets = [{} for _ in range(bands)]
+        for ordinal in range(size):
+            if self._signatures[ordinal * num_perm] == _EMPTY:      # Removed or featureless
+                continue
+            for band, key in enumerate(self._band_keys(ordinal)):
+                self._buckets[band].setdefault(key, array("I")).append(ordinal)
+
+    @property
+    def catalog_version(self) -> int:
+        """Returns the library catalog version the index was built from"""
+        return self._catalog_version
+
+    def _signature(self, ordinal):
+        start = ordinal * self._num_perm
+        return self._signatures[start:start + self._num_perm]
+
+    def _band_keys(self, ordinal):
+        """Returns the bucket key of every band of a video's signature"""
+        signature = self._signature(ordinal)
+        return [hash(tuple(signature[start:start + self._rows]))
+                for start in range(0, self._num_perm, self._rows)]
+
+    def similarity(self, ordinal, other):
+        """Returns the estimated Jaccard similarity of two videos"""
+        equal = sum(a == b for a, b in zip(self._signature(ordinal), self._signature(other)))
+        return equal / self._num_perm
+
+    def similar(self, ordinal, is_excluded=None):
+        """Returns (ordinal, similarity) pairs of the near duplicates of a video.
+
+        Args:
+            ordinal: The ordinal of the reference video.
+            is_excluded: Optional callable dropping ordinals.
+
+        Returns:
+            The pairs, most similar first.
+        """
+        if (ordinal + 1) * self._num_perm > len(self._signatures):    # Added after the index was built
+            return []
+        if self._signatures[ordinal * self._num_perm] == _EMPTY:
+            return []
+        candidates = set()
+        for band, key in enumerate(self._band_keys(ordinal)):
+            candidates.update(self._buckets[band].get(key, ()))
+        candidates.discard(ordinal)
+        matches = []
+        for other in candidates:
+            if is_excluded and is_excluded(other):
+                continue
+            similarity = self.similarity(ordinal, other)
+            if similarity >= self._threshold:
+                matches.append((other, similarity))
+        return sorted(matches, key=lambda match: (-match[1], match[0]))
+
+    def groups(self, is_excluded=None):
+        """Returns the groups of near duplicate videos.
+
+        Videos are joined when they are near duplicates of each other, so a
+        group may chain through intermediate videos.
+
+        Returns:
+            Lists of at least two ordinals, in ordinal order.
+        """
+        shared = set()                                  # Videos sharing a bucket with another
+        for buckets in self._buckets:
+            for members in buckets.values():
+                if len(members) > 1:
+                    shared.update(members)
+
+        parents = {}                                    # Union-find over the joined videos
+
+        def root(ordinal):
+            while parents[ordinal] != ordinal:
+                parents[ordinal] = parents[parents[ordinal]]            # Path halving
+                ordinal = parents[ordinal]
+            return ordinal
+
+        for ordinal in shared:
+            if is_excluded and is_excluded(ordinal):
+                continue
+            for other, _ in self.similar(ordinal, is_excluded):
+                parents.setdefault(ordinal, ordinal)
+                parents.setdefault(other, other)
+                first, second = root(ordinal), root(other)
+                if first != second:
+                    parents[max(first, second)] = min(first, second)
+        groups = {}
+        for ordinal in parents:
+            groups.setdefault(root(ordinal), []).append(ordinal)
+        return sorted(sorted(group) for group in groups.values())
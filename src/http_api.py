@@ -0,0 +1,206 @@
+"""A read-only JSON HTTP API over a VideoPlayer.
+
+Usage:
+    python -m src.http_api [--port 8000] [--catalog PATH]
+or alongside the interactive shell:
+    python -m src.run --http 8000
+
+Endpoints (GET):
+    /videos                    All videos, in listing order.
+    /videos/<video_id>         One video.
+    /search?q=<term>           Unflagged videos whose title contains term.
+    /search?tag=<tag>          Unflagged videos with the tag.
+    /search?tags=<expression>  Videos matching an AND/OR/NOT tag expression.
+    /playlists                 Playlist names, sorted.
+    /playlists/<name>          The videos of a playlist, in playlist order.
+
+Every response carries an ETag built from an id drawn when the server
+starts, the library epoch and the playlist version counters; the id keeps
+tags from an earlier process, whose counters also started at 0, from
+matching. A request whose If-None-Match holds the
+current ETag gets 304 Not Modified before anything is looked up or
+rendered, and rendered bodies are kept in a small LRU keyed by path so
+polls without an ETag are not re-rendered either.
+"""
+
+import argparse
+from collections import OrderedDict
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+import json
+import threading
+import uuid
+from urllib.parse import parse_qs
+from urllib.parse import unquote
+from urllib.parse import urlsplit
+
+from .player_result import to_json
+from .tag_query import TagQueryException
+from .video_player import VideoPlayer
+
+
+class ApiException(Exception):
+    """A class used to represent a request that cannot be answered."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class ApiServer(ThreadingHTTPServer):
+    """A class used to serve the read-only API of one VideoPlayer."""
+
+    daemon_threads = True
+
+    def __init__(self, video_player, address=("127.0.0.1", 8000), lock=None, cache_size=256):
+        """Api Server Constructor
+
+        Args:
+            video_player: The VideoPlayer to expose.
+            address: (host, port) to listen on, port 0 picks a free one.
+            lock: Lock also held by whoever else drives the player, as the
+                player is not thread-safe. A private one by default.
+            cache_size: Number of rendered bodies kept.
+        """
+        self.video_player = video_player
+        self.lock = lock or threading.Lock()
+        self._bodies = OrderedDict()                    # path -> (etag, body)
+        self._cache_size = cache_size
+        self._instance = uuid.uuid4().hex[:12]          # Counters restart with the process
+        super().__init__(address, _ApiHandler)
+
+    def etag(self, path):
+        """Returns the current ETag of path; must be called with the lock held"""
+        player = self.video_player
+        epoch = player.video_library.epoch
+        if path.startswith("/playlists"):
+            name = unquote(path[len("/playlists/"):]) if path.startswith("/playlists/") else None
+            playlist = player.get_playlist(name) if name else None
+            version = playlist.version if playlist else 0
+            return f'"{self._instance}.{epoch}.{player.playlists_version}.{version}"'
+        return f'"{self._instance}.{epoch}"'
+
+    def cached_body(self, path, etag):
+        """Returns the body rendered for path at etag, or None"""
+        entry = self._bodies.get(path)
+        if entry is None or entry[0] != etag:
+            return None
+        self._bodies.move_to_end(path)
+        return entry[1]
+
+    def store_body(self, path, etag, body):
+        """Keeps the body rendered for path at etag"""
+        self._bodies[path] = (etag, body)
+        self._bodies.move_to_end(path)
+        if len(self._bodies) > self._cache_size:
+            self._bodies.popitem(last=False)
+
+    def render(self, path):
+        """Returns the JSON value for path; must be called with the lock held"""
+        player = self.video_player
+        library = player.video_library
+        url = urlsplit(path)
+        parts = [unquote(part) for part in url.path.strip("/").split("/")]
+        if parts == ["videos"]:
+            return [to_json(library.get_video(video_id)) for video_id in library.get_sorted_video_ids()]
+        if len(parts) == 2 and parts[0] == "videos":
+            video = library.get_video(parts[1])
+            if not video:
+                raise ApiException(HTTPStatus.NOT_FOUND, "Video does not exist")
+            return to_json(video)
+        if parts == ["search"]:
+            return to_json(self._search(library, parse_qs(url.query)))
+        if parts == ["playlists"]:
+            return player.get_sorted_playlist_names()
+        if len(parts) == 2 and parts[0] == "playlists":
+            playlist = player.get_playlist(parts[1])
+            if not playlist:
+                raise ApiException(HTTPStatus.NOT_FOUND, "Playlist does not exist")
+            return {"name": playlist.title,
+                    "videos": [to_json(library.get_video(video_id))
+                               for video_id in player.get_playlist_video_ids(playlist)]}
+        raise ApiException(HTTPStatus.NOT_FOUND, "No such endpoint")
+
+    def _search(self, library, query):
+        """Returns the videos matching the q, tag or tags query parameter"""
+        if "q" in query:
+            return [video for video in library.search_titles(query["q"][0]) if not video.flag]
+        if "tag" in query:
+            return library.search_tag(query["tag"][0])
+        if "tags" in query:
+            try:
+                return library.search_tag_query(query["tags"][0])
+            except TagQueryException as e:
+                raise ApiException(HTTPStatus.BAD_REQUEST, str(e))
+        raise ApiException(HTTPStatus.BAD_REQUEST, "Expected a q, tag or tags parameter")
+
+
+class _ApiHandler(BaseHTTPRequestHandler):
+    """Answers GET requests of an ApiServer"""
+
+    def do_GET(self):
+        server = self.server
+        path = urlsplit(self.path).path
+        with server.lock:
+            etag = server.etag(path)
+            if etag in _parse_etags(self.headers.get("If-None-Match", "")):
+                self.send_response(HTTPStatus.NOT_MODIFIED)     # Nothing looked up or rendered
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            body = server.cached_body(self.path, etag)
+            status = HTTPStatus.OK
+            if body is None:
+                try:
+                    body = json.dumps(server.render(self.path), separators=(",", ":")).encode("utf-8")
+                    server.store_body(self.path, etag, body)
+                except ApiException as e:
+                    status, body = e.status, json.dumps({"error": str(e)}).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if status == HTTPStatus.OK:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")   # Always revalidate
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass                                            # Keep the shell quiet
+
+
+def _parse_etags(header):
+    """Returns the ETags listed in an If-None-Match header, weak ones included"""
+    tags = set()
+    for tag in header.split(","):
+        tag = tag.strip()
+        tags.add(tag[2:] if tag.startswith("W/") else tag)
+    return tags
+
+
+def start_server(video_player, port, lock=None, host="127.0.0.1"):
+    """Starts an ApiServer in a daemon thread and returns it"""
+    server = ApiServer(video_player, (host, port), lock)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Serve the video library as JSON.")
+    arg_parser.add_argument("--port", type=int, default=8000)
+    arg_parser.add_argument("--host", default="127.0.0.1")
+    arg_parser.add_argument("--catalog", help="catalog file, src/videos.txt by default")
+    args = arg_parser.parse_args(argv)
+    server = ApiServer(VideoPlayer(catalog_path=args.catalog), (args.host, args.port))
+    print(f"Serving on http://{args.host}:{server.server_address[1]}/videos")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,329 @@
+"""Drives the player with virtual users to find its throughput limits.
+
+Usage:
+    python -m src.load_generator [--users 1,2,4,8,16] [--duration 5]
+        [--mix PLAY=30,SEARCH_VIDEOS=20,...] [--socket] [--catalog PATH]
+
+Each virtual user has its own CommandParser and VideoPlayer and issues a
+weighted random mix of commands in its own thread, either in-process or
+through a local TCP socket to a SessionServer. All users share one
+VideoLibrary and PlaybackClock, which are not thread-safe, so commands run
+under one lock. For every number of users the report shows sustained
+throughput, latency percentiles per command and resident memory growth,
+and the knee of the throughput curve: the point after which more users
+mostly add latency.
+"""
+
+import argparse
+import math
+import os
+import random
+import socket
+import socketserver
+import threading
+import time
+
+from .command_parser import CommandException
+from .command_parser import CommandParser
+from .playback_clock import PlaybackClock
+from .replay import percentile
+from .video_library import VideoLibrary
+from .video_player import VideoPlayer
+
+DEFAULT_MIX = {
+    "PLAY": 25, "SHOW_PLAYING": 10, "PAUSE": 5, "CONTINUE": 5, "STOP": 3,
+    "SEARCH_VIDEOS": 15, "SEARCH_VIDEOS_WITH_TAG": 8, "CREATE_PLAYLIST": 3,
+    "ADD_TO_PLAYLIST": 12, "SHOW_PLAYLIST": 5, "FLAG_VIDEO": 2,
+    "ALLOW_VIDEO": 2, "RECOMMEND": 5,
+}
+_END_OF_OUTPUT = "\0"                                   # Line ending a response on the socket
+_ERROR_PREFIX = "Internal error: "
+_PLAYLISTS_PER_USER = 4
+
+
+def parse_mix(text):
+    """Returns a command mix from "NAME=weight,NAME=weight" text"""
+    mix = {}
+    for item in text.split(","):
+        name, _, weight = item.partition("=")
+        if name.upper() not in DEFAULT_MIX:
+            raise ValueError(f"Unknown command in mix: {name}")
+        mix[name.upper()] = float(weight or 1)
+    return mix
+
+
+def resident_memory():
+    """Returns the resident set size of this process in bytes"""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):       # Not Linux: fall back to the peak
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class VirtualUser:
+    """A class used to represent one simulated user issuing commands."""
+
+    def __init__(self, library, mix, seed):
+        """Virtual User Constructor
+
+        Args:
+            library: The VideoLibrary, used to pick existing ids and terms.
+            mix: dict of command name -> relative weight.
+            seed: Seed of the user's random choices.
+        """
+        self._random = random.Random(seed)
+        self._names = list(mix)
+        self._weights = list(mix.values())
+        self._video_ids = [video.video_id for video in library.get_all_videos()]
+        self._words = sorted({word for video in library.get_all_videos()
+                              for word in video.title.split()}) or ["video"]
+        self._tags = sorted({tag for video in library.get_all_videos()
+                             for tag in video.tags}) or ["#tag"]
+        self._playlists = [f"user{seed}_list{index}" for index in range(_PLAYLISTS_PER_USER)]
+
+    def next_command(self):
+        """Returns the next command as a list of words"""
+        choice = self._random.choice
+        name = self._random.choices(self._names, self._weights)[0]
+        if name in ("PLAY", "FLAG_VIDEO", "ALLOW_VIDEO", "RECOMMEND"):
+            return [name, choice(self._video_ids)]
+        if name == "SEARCH_VIDEOS":
+            return [name, choice(self._words)]
+        if name == "SEARCH_VIDEOS_WITH_TAG":
+            return [name, choice(self._tags)]
+        if name in ("CREATE_PLAYLIST", "SHOW_PLAYLIST"):
+            return [name, choice(self._playlists)]
+        if name == "ADD_TO_PLAYLIST":
+            return [name, choice(self._playlists), choice(self._video_ids)]
+        return [name]
+
+
+class InProcessSession:
+    """A class used to run one user's commands on a player in this process."""
+
+    def __init__(self, library, clock, lock, render=True):
+        self._player = VideoPlayer(video_library=library, playback_clock=clock)
+        self._player.response_reader = lambda: ""      # Decline search prompts
+        self._player.renderer = (lambda result: result.text()) if render else None
+        self._parser = CommandParser(self._player)
+        self._lock = lock
+
+    def execute(self, command):
+        """Runs one command, returns False if it was rejected or failed"""
+        with self._lock:
+            try:
+                self._player.advance_clock()
+                self._parser.execute_command(command)
+            except Exception:                           # CommandException or a player bug
+                return False
+        return True
+
+    def close(self):
+        pass
+
+
+class SessionServer(socketserver.ThreadingTCPServer):
+    """A class used to serve one player session per TCP connection.
+
+    Clients send one command per line and receive its output lines followed
+    by a line holding only a NUL character. Search prompts are declined.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, library, clock, address=("127.0.0.1", 0)):
+        self.library = library
+        self.clock = clock
+        self.lock = threading.Lock()
+        super().__init__(address, _SessionHandler)
+
+
+class _SessionHandler(socketserver.StreamRequestHandler):
+    """Runs the commands of one connection on its own player"""
+
+    def handle(self):
+        lines = []
+        player = VideoPlayer(video_library=self.server.library, playback_clock=self.server.clock)
+        player.response_reader = lambda: ""
+        player.renderer = lambda result: lines.extend(result.text())
+        parser = CommandParser(player)
+        for request in self.rfile:
+            lines.clear()
+            with self.server.lock:
+                try:
+                    player.advance_clock()
+                    parser.execute_command(request.decode("utf-8").split())
+                except CommandException as e:
+                    lines.append(str(e))
+                except Exception as e:                  # Keep serving the session
+                    lines.append(f"{_ERROR_PREFIX}{type(e).__name__}: {e}")
+            lines.append(_END_OF_OUTPUT)
+            self.wfile.write(("\n".join(lines) + "\n").encode("utf-8"))
+
+
+class SocketSession:
+    """A class used to run one user's commands through a SessionServer."""
+
+    def __init__(self, address):
+        self._socket = socket.create_connection(address)
+        self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._reader = self._socket.makefile("rb")
+
+    def execute(self, command):
+        """Sends one command and waits for its whole output"""
+        self._socket.sendall((" ".join(command) + "\n").encode("utf-8"))
+        ok = True
+        for line in self._reader:
+            if line.rstrip(b"\n") == _END_OF_OUTPUT.encode():
+                return ok
+            ok = ok and not line.startswith(_ERROR_PREFIX.encode())
+        raise ConnectionError("Server closed the connection")
+
+    def close(self):
+        self._reader.close()
+        self._socket.close()
+
+
+def run_level(users, duration, make_session, library, mix=None, warmup=0.5, seed=0):
+    """Runs users virtual users concurrently and measures them.
+
+    Args:
+        users: Number of concurrent virtual users.
+        duration: Seconds to measure, after warmup seconds not measured.
+        make_session: Callable returning a new session for one user.
+        library: The VideoLibrary the users pick ids and terms from.
+        mix: dict of command name -> weight, DEFAULT_MIX by default.
+        warmup: Seconds run before measuring starts.
+        seed: Seed of the first user; user i uses seed + i.
+
+    Returns:
+        A dict with users, commands, errors, throughput (commands/s),
+        latencies (command name -> sorted seconds) and memory_growth (bytes).
+    """
+    sessions = [make_session() for _ in range(users)]
+    virtual_users = [VirtualUser(library, mix or DEFAULT_MIX, seed + index) for index in range(users)]
+    latencies = [dict() for _ in range(users)]
+    errors = [0] * users
+    memory_before = resident_memory()
+    measure_from = time.perf_counter() + warmup
+    stop_at = measure_from + duration
+
+    def drive(index):
+        session, user, timings = sessions[index], virtual_users[index], latencies[index]
+        while True:
+            command = user.next_command()
+            began = time.perf_counter()
+            if began >= stop_at:
+                return
+            ok = session.execute(command)
+            if began >= measure_from:
+                timings.setdefault(command[0], []).append(time.perf_counter() - began)
+                errors[index] += not ok
+
+    threads = [threading.Thread(target=drive, args=(index,)) for index in range(users)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for session in sessions:
+        session.close()
+
+    merged = {}
+    for timings in latencies:
+        for name, values in timings.items():
+            merged.setdefault(name, []).extend(values)
+    commands = sum(len(values) for values in merged.values())
+    return {
+        "users": users,
+        "commands": commands,
+        "errors": sum(errors),
+        "throughput": commands / duration,
+        "latencies": {name: sorted(values) for name, values in merged.items()},
+        "memory_growth": resident_memory() - memory_before,
+    }
+
+
+def find_knee(levels):
+    """Returns the number of users at the knee of the throughput curve.
+
+    Users are compared on a log scale and both axes are normalized to
+    [0, 1]; the knee is the level farthest above the straight line from the
+    first level to the best one (the Kneedle method).
+    """
+    if not levels:
+        return None
+    best = max(range(len(levels)), key=lambda index: levels[index]["throughput"])
+    curve = levels[:best + 1]
+    if len(curve) < 3:
+        return curve[-1]["users"]
+    xs = [math.log2(level["users"]) for level in curve]
+    ys = [level["throughput"] for level in curve]
+    x_span, y_span = (xs[-1] - xs[0]) or 1, (ys[-1] - ys[0]) or 1
+    distances = [(y - ys[0]) / y_span - (x - xs[0]) / x_span for x, y in zip(xs, ys)]
+    return curve[max(range(len(curve)), key=distances.__getitem__)]["users"]
+
+
+def format_report(levels):
+    """Returns the load report as text"""
+    lines = [f"{'users':>6}{'cmd/s':>11}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+             f"{'errors':>8}{'mem MB':>9}"]
+    for level in levels:
+        values = sorted(value for values in level["latencies"].values() for value in values)
+        lines.append(f"{level['users']:>6}{level['throughput']:>11.0f}"
+                     + "".join(f"{percentile(values, p) * 1000:>10.3f}" for p in (0.50, 0.95, 0.99))
+                     + f"{level['errors']:>8}{level['memory_growth'] / 2 ** 20:>+9.1f}")
+    if levels:
+        last = levels[-1]
+        lines.append(f"Per command at {last['users']} users:")
+        for name in sorted(last["latencies"]):
+            values = last["latencies"][name]
+            lines.append(f"  {name:<24}{len(values):>8}"
+                         + "".join(f"{percentile(values, p) * 1000:>10.3f}" for p in (0.50, 0.95, 0.99)))
+        lines.append(f"Knee of the throughput curve: {find_knee(levels)} users")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Load the player with virtual users.")
+    arg_parser.add_argument("--users", default="1,2,4,8,16",
+                            help="comma separated numbers of concurrent users to try")
+    arg_parser.add_argument("--duration", type=float, default=5.0,
+                            help="seconds measured at each number of users")
+    arg_parser.add_argument("--warmup", type=float, default=0.5,
+                            help="seconds run before measuring at each number of users")
+    arg_parser.add_argument("--mix", type=parse_mix, default=None,
+                            help="weighted commands, e.g. PLAY=30,SEARCH_VIDEOS=20")
+    arg_parser.add_argument("--socket", action="store_true",
+                            help="send commands through a local TCP socket")
+    arg_parser.add_argument("--catalog", help="catalog file, src/videos.txt by default")
+    arg_parser.add_argument("--seed", type=int, default=0)
+    args = arg_parser.parse_args(argv)
+
+    library = VideoLibrary(args.catalog)
+    clock = PlaybackClock()
+    server = None
+    if args.socket:
+        server = SessionServer(library, clock)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        make_session = lambda: SocketSession(server.server_address)
+    else:
+        lock = threading.Lock()
+        make_session = lambda: InProcessSession(library, clock, lock)
+
+    levels = []
+    try:
+        for users in (int(value) for value in args.users.split(",")):
+            levels.append(run_level(users, args.duration, make_session, library,
+                                    args.mix, args.warmup, args.seed))
+    finally:
+        if server:
+            server.shutdown()
+            server.server_close()
+    print(format_report(levels))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""A play history class."""
+
+from array import array
+import time
+
+PLAY = 0
+STOP = 1
+PAUSE = 2
+CONTINUE = 3
+
+EVENT_NAMES = ("Played", "Stopped", "Paused", "Continued")
+
+
+class PlayHistory:
+    """A class used to represent a fixed-capacity ring buffer of play events.
+
+    Events are kept in three preallocated parallel arrays (monotonic
+    timestamp, event code, video ordinal), so memory stays constant however
+    long the session runs; once full, the oldest event is overwritten.
+    """
+
+    def __init__(self, capacity=1000):
+        self._capacity = capacity
+        self._timestamps = array("d", bytes(8 * capacity))
+        self._events = bytearray(capacity)
+        self._ordinals = array("q", bytes(8 * capacity))
+        self._next = 0                                  # Slot the next event is written to
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def capacity(self) -> int:
+        """Returns the maximum number of events kept"""
+        return self._capacity
+
+    def record(self, event, ordinal):
+        """Records an event for a video ordinal at the current monotonic time"""
+        slot = self._next
+        self._timestamps[slot] = time.monotonic()
+        self._events[slot] = event
+        self._ordinals[slot] = ordinal
+        self._next = (slot + 1) % self._capacity
+        self._size = min(self._size + 1, self._capacity)
+
+    def recent(self, n=None):
+        """Yields up to n (timestamp, event, ordinal) tuples, newest first"""
+        count = self._size if n is None else min(n, self._size)
+        for i in range(1, count + 1):
+            slot = (self._next - i) % self._capacity
+            yield self._timestamps[slot], self._events[slot], self._ordinals[slot]
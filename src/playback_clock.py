@@ -0,0 +1,205 @@
+"""Simulated playback positions and end-of-video timers.
+
+A PlaybackPosition stores where a video was and when, so its current
+position is computed on demand from the clock: nothing happens while a
+video plays. End-of-video events are kept in a hierarchical TimerWheel
+that a PlaybackClock shared by any number of sessions advances, so
+millions of concurrent sessions cost one slot entry each and a clock
+advance only touches the timers that are due (plus an occasional cascade
+of a coarser slot).
+"""
+
+import itertools
+import time
+
+DEFAULT_VIDEO_DURATION = 180.0                          # Seconds, catalogs carry no durations
+
+
+def format_position(seconds):
+    """Returns seconds as m:ss, or h:mm:ss from one hour on"""
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
+
+
+class PlaybackPosition:
+    """A class used to represent the position of one playing video."""
+
+    __slots__ = ("duration", "_offset", "_started_at")
+
+    def __init__(self, duration, now):
+        """Starts playback from the beginning.
+
+        Args:
+            duration: Length of the video in seconds.
+            now: Current clock time.
+        """
+        self.duration = duration
+        self._offset = 0.0                              # Position when last started or paused
+        self._started_at = now                          # None while paused
+
+    @property
+    def paused(self) -> bool:
+        """Returns whether the position is frozen"""
+        return self._started_at is None
+
+    def position(self, now):
+        """Returns the playback position in seconds, at most the duration"""
+        if self._started_at is None:
+            return self._offset
+        return min(self._offset + now - self._started_at, self.duration)
+
+    def remaining(self, now):
+        """Returns the seconds left until the end of the video"""
+        return self.duration - self.position(now)
+
+    def pause(self, now):
+        """Freezes the position"""
+        self._offset = self.position(now)
+        self._started_at = None
+
+    def resume(self, now):
+        """Starts the position moving again"""
+        if self._started_at is None:
+            self._started_at = now
+
+
+class TimerWheel:
+    """A class used to represent a hierarchical timing wheel.
+
+    Level 0 has one slot per tick, each higher level has slots covering a
+    whole turn of the level below it. A timer is filed in the lowest level
+    whose span covers its deadline and moves down one level each time the
+    wheel below it completes a turn, so scheduling, cancelling and firing
+    are O(1) per timer.
+    """
+
+    def __init__(self, tick=1.0, slot_bits=8, levels=4, start=0.0):
+        """Timer Wheel Constructor
+
+        Args:
+            tick: Seconds per level 0 slot; the resolution of the timers.
+            slot_bits: log2 of the number of slots per level.
+            levels: Number of levels. Deadlines further out than
+                2 ** (slot_bits * levels) ticks are filed at the top level
+                and re-filed until they are due.
+            start: Clock time of tick 0.
+        """
+        self._tick = tick
+        self._start = start
+        self._bits = slot_bits
+        self._mask = (1 << slot_bits) - 1
+        self._wheels = [[{} for _ in range(1 << slot_bits)] for _ in range(levels)]
+        self._current = 0                               # Next tick to process
+        self._slots = {}                                # handle -> slot dict holding it
+        self._handles = itertools.count()
+
+    def __len__(self):
+        return len(self._slots)
+
+    def _to_tick(self, when):
+        """Returns the tick in progress at clock time when"""
+        return int((when - self._start) // self._tick)
+
+    def _file(self, handle, deadline, callback):
+        """Files a timer in the slot covering its deadline"""
+        delta = max(deadline - self._current, 0)
+        level = 0
+        while level < len(self._wheels) - 1 and delta >> (self._bits * (level + 1)):
+            level += 1
+        filed_at = max(deadline, self._current)
+        if delta >> (self._bits * (level + 1)):         # Beyond the top level: file at its edge
+            filed_at = self._current + (1 << (self._bits * (level + 1))) - 1
+        slot = self._wheels[level][(filed_at >> (self._bits * level)) & self._mask]
+        slot[handle] = (deadline, callback)
+        self._slots[handle] = slot
+
+    def schedule(self, when, callback):
+        """Calls callback once the clock reaches when.
+
+        Returns:
+            A handle for cancel().
+        """
+        handle = next(self._handles)
+        deadline = -int((self._start - when) // self._tick)     # First tick starting at or after when
+        self._file(handle, deadline, callback)
+        return handle
+
+    def cancel(self, handle):
+        """Cancels a timer, if it has not fired yet"""
+        slot = self._slots.pop(handle, None)
+        if slot is not None:
+            del slot[handle]
+
+    def _cascade(self, level):
+        """Re-files the timers of the level slot that the wheel just entered"""
+        index = (self._current >> (self._bits * level)) & self._mask
+        slot = self._wheels[level][index]
+        self._wheels[level][index] = {}
+        if index == 0 and level + 1 < len(self._wheels):
+            self._cascade(level + 1)
+        for handle, (deadline, callback) in slot.items():
+            self._file(handle, deadline, callback)
+
+    def advance(self, now):
+        """Fires every timer due by now, in deadline order.
+
+        Returns:
+            The number of timers fired.
+        """
+        target = self._to_tick(now)
+        fired = 0
+        while self._current <= target:
+            if not self._slots:                         # Nothing filed: jump straight there
+                self._current = target + 1
+                break
+            index = self._current & self._mask
+            if index == 0 and len(self._wheels) > 1:
+                self._cascade(1)
+            slot = self._wheels[0][index]
+            self._wheels[0][index] = {}
+            self._current += 1
+            for handle, (deadline, callback) in list(slot.items()):
+                if self._slots.pop(handle, None) is None:   # Cancelled by an earlier callback
+                    continue
+                if deadline >= self._current:           # Filed at the top edge, not due yet
+                    self._file(handle, deadline, callback)
+                    continue
+                callback()
+                fired += 1
+        return fired
+
+
+class PlaybackClock:
+    """A class used to represent the clock shared by playback sessions."""
+
+    def __init__(self, now=time.monotonic, tick=1.0):
+        """Playback Clock Constructor
+
+        Args:
+            now: Callable returning the current time in seconds.
+            tick: Resolution of end-of-video events in seconds.
+        """
+        self._now = now
+        self._wheel = TimerWheel(tick, start=now())
+
+    def now(self):
+        """Returns the current time in seconds"""
+        return self._now()
+
+    def schedule(self, delay, callback):
+        """Calls callback delay seconds from now, on a later advance()"""
+        return self._wheel.schedule(self._now() + delay, callback)
+
+    def cancel(self, handle):
+        """Cancels a scheduled callback"""
+        self._wheel.cancel(handle)
+
+    def advance(self):
+        """Fires the callbacks that are due, returns how many fired"""
+        return self._wheel.advance(self._now())
+
+    @property
+    def pending(self) -> int:
+        """Returns the number of scheduled callbacks"""
+        return len(self._wheel)
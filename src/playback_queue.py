@@ -0,0 +1,87 @@
+"""A playback queue class."""
+
+from array import array
+import random
+
+
+class PlaybackQueue:
+    """A class used to represent the queue of a playlist being played.
+
+    The queue takes a snapshot of the playlist ordinals, shuffled up front
+    with a Fisher-Yates permutation when requested, and walks it with a
+    cursor so NEXT and PREVIOUS are O(1) steps. Entries that were removed
+    from the playlist or flagged are skipped lazily when the cursor reaches
+    them. Videos added to the playlist while it plays are appended to the
+    upcoming part of the queue the next time the cursor moves.
+    """
+
+    def __init__(self, playlist, is_playable, shuffle=False):
+        """Playback Queue Constructor
+
+        Args:
+            playlist: The Playlist to be played.
+            is_playable: Callable telling if a video ordinal can be played.
+            shuffle: Whether to play the playlist in a random order.
+        """
+        self._playlist = playlist
+        self._is_playable = is_playable
+        self._shuffle = shuffle
+        self._order = array("I", playlist.get_all_ordinals)
+        if shuffle:
+            self._fisher_yates(0)
+        self._queued = set(self._order)
+        self._version = playlist.version
+        self._position = -1
+
+    @property
+    def playlist(self):
+        """Returns the Playlist being played"""
+        return self._playlist
+
+    @property
+    def shuffle(self) -> bool:
+        """Returns True if the queue plays in a random order"""
+        return self._shuffle
+
+    def _fisher_yates(self, start):
+        """Shuffles _order[start:] in place"""
+        order = self._order
+        for i in range(len(order) - 1, start, -1):
+            j = random.randint(start, i)
+            order[i], order[j] = order[j], order[i]
+
+    def _sync(self):
+        """Appends videos added to the playlist since the last sync"""
+        if self._version == self._playlist.version:
+            return
+        self._version = self._playlist.version
+        start = len(self._order)
+        for ordinal in self._playlist.get_all_ordinals:
+            if ordinal not in self._queued:
+                self._queued.add(ordinal)
+                self._order.append(ordinal)
+        if self._shuffle and len(self._order) > start:          # Mix new videos into what is still to come
+            self._fisher_yates(self._position + 1)
+
+    def _valid(self, ordinal):
+        """Checks a queued video is still in the playlist and playable"""
+        return self._playlist.check_video_in_playlist(ordinal) and self._is_playable(ordinal)
+
+    def _step(self, direction):
+        """Moves the cursor to the next valid entry in direction"""
+        self._sync()
+        position = self._position + direction
+        while 0 <= position < len(self._order):
+            if self._valid(self._order[position]):
+                self._position = position
+                return self._order[position]
+            position += direction
+        return None
+
+    def next(self):
+        """Advances to the next playable video -> ordinal or None at the end"""
+        return self._step(1)
+
+    def previous(self):
+        """Goes back to the previous playable video -> ordinal or None at the start"""
+        return self._step(-1)
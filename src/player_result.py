@@ -0,0 +1,93 @@
+"""Structured results of VideoPlayer operations and their renderers.
+
+Every VideoPlayer operation returns a Result and hands it to the player's
+renderer:
+    render_text         Prints the terminal output, line for line as before.
+    render_json_lines   Writes one JSON object per result for machine
+                        consumers, without ever formatting the text.
+A player whose renderer is None formats nothing at all.
+"""
+
+import json
+import sys
+
+from .video import Video
+
+OK = "ok"
+NOT_FOUND = "not_found"                         # Video or playlist does not exist
+CONFLICT = "conflict"                           # Already exists, added, flagged or paused
+FLAGGED = "flagged"                             # Video is flagged
+INVALID_STATE = "invalid_state"                 # Nothing playing, not paused, no queue...
+INVALID_ARGUMENT = "invalid_argument"           # Malformed query or snapshot
+EMPTY = "empty"                                 # Nothing to show
+READ_ONLY = "read_only"                         # Catalog cannot be changed
+IO_ERROR = "io_error"                           # File could not be read or written
+
+
+class Result:
+    """A class used to represent the outcome of one VideoPlayer operation."""
+
+    __slots__ = ("operation", "status", "videos", "playlist", "rows", "_text")
+
+    def __init__(self, operation, status, text=(), videos=(), playlist=None, rows=()):
+        """Result constructor.
+
+        Args:
+            operation: Name of the VideoPlayer method, e.g. "play_video".
+            status: One of the status codes of this module.
+            text: The terminal output, as a line, a list of lines or a
+                callable returning lines (only called when rendered as text).
+            videos: The Video instances the operation affected.
+            playlist: The name of the playlist the operation affected.
+            rows: The result rows: Video instances, names or tuples.
+        """
+        self.operation = operation
+        self.status = status
+        self.videos = tuple(videos)
+        self.playlist = playlist
+        self.rows = rows
+        self._text = text
+
+    @property
+    def ok(self) -> bool:
+        """Returns whether the operation succeeded"""
+        return self.status == OK
+
+    def text(self):
+        """Returns the terminal output of the operation as a list of lines"""
+        text = self._text() if callable(self._text) else self._text
+        return [text] if isinstance(text, str) else list(text)
+
+    def to_dict(self):
+        """Returns the result as JSON serializable dict, without its text"""
+        return {
+            "op": self.operation,
+            "status": self.status,
+            "videos": [video.video_id for video in self.videos],
+            "playlist": self.playlist,
+            "rows": [to_json(row) for row in self.rows],
+        }
+
+
+def to_json(value):
+    """Converts result rows and Videos to JSON serializable values"""
+    if isinstance(value, Video):
+        return {"id": value.video_id, "title": value.title,
+                "tags": list(value.tags), "flag": value.flag}
+    if isinstance(value, (tuple, list)):
+        return [to_json(item) for item in value]
+    if isinstance(value, dict):
+        return {key: to_json(item) for key, item in value.items()}
+    return value
+
+
+def render_text(result):
+    """Prints the terminal output of a result"""
+    for line in result.text():
+        print(line)
+
+
+def render_json_lines(result, file=None):
+    """Writes a result as one line of JSON"""
+    file = file or sys.stdout
+    file.write(json.dumps(result.to_dict(), separators=(",", ":")) + "\n")
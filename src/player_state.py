@@ -0,0 +1,87 @@
+"""Reading and writing of player state snapshots.
+
+A snapshot is a pickle (protocol 5) whose large arrays are stored out of
+band, so they are written and read as raw memory instead of being walked
+element by element:
+
+    MAGIC
+    number of buffers (uint32, little endian)
+    pickle length (uint64) and pickle bytes
+    for each buffer: length (uint64) and raw bytes
+"""
+
+from array import array
+import pickle
+import struct
+
+MAGIC = b"VIDSTAT1"
+
+
+class StateFormatException(Exception):
+    """A class used to represent an unreadable state snapshot."""
+    pass
+
+
+def out_of_band(values):
+    """Wraps an array so it is pickled as an out-of-band buffer"""
+    return pickle.PickleBuffer(values)
+
+
+def to_array(typecode, buffer):
+    """Turns a buffer restored from a snapshot back into an array"""
+    values = array(typecode)
+    values.frombytes(buffer)
+    return values
+
+
+def write_state(path, state):
+    """Writes a state dict, built with out_of_band() arrays, to path."""
+    buffers = []
+    data = pickle.dumps(state, protocol=5, buffer_callback=buffers.append)
+    with open(path, "wb") as state_file:
+        state_file.write(MAGIC)
+        state_file.write(struct.pack("<IQ", len(buffers), len(data)))
+        state_file.write(data)
+        for buffer in buffers:
+            raw = buffer.raw()
+            state_file.write(struct.pack("<Q", raw.nbytes))
+            state_file.write(raw)
+
+
+def read_state(path):
+    """Reads a state dict written by write_state.
+
+    Out-of-band arrays come back as memoryviews over the file contents;
+    use to_array() to get arrays again.
+
+    Raises:
+        StateFormatException: If the file is not a state snapshot.
+    """
+    with open(path, "rb") as state_file:
+        contents = memoryview(state_file.read())
+    if contents[:len(MAGIC)] != MAGIC:
+        raise StateFormatException(f"{path} is not a player state snapshot")
+    try:
+        position = len(MAGIC)
+        count, length = struct.unpack_from("<IQ", contents, position)
+        position += struct.calcsize("<IQ")
+        data = contents[position:position + length]
+        position += length
+        buffers = []
+        for _ in range(count):
+            (size,) = struct.unpack_from("<Q", contents, position)
+            position += 8
+            buffers.append(contents[position:position + size])
+            position += size
+    except struct.error:
+        raise StateFormatException(f"{path} is truncated")
+    if position != len(contents):                       # Lengths must add up to the file size
+        raise StateFormatException(f"{path} is truncated or has trailing data")
+    try:
+        state = pickle.loads(data, buffers=buffers)
+    except (pickle.UnpicklingError, EOFError, ValueError, TypeError,
+            AttributeError, ImportError, IndexError, KeyError) as e:
+        raise StateFormatException(f"{path} is corrupt ({type(e).__name__})")
+    if not isinstance(state, dict):
+        raise StateFormatException(f"{path} is corrupt (not a state dict)")
+    return state
@@ -0,0 +1,107 @@
+"""A sorted playlist name index class."""
+
+import bisect
+
+
+class PlaylistNames:
+    """A class used to keep playlist names sorted.
+
+    Names are listed in plain string order, kept in a list updated with a
+    bisect on every add and remove, so listing is a walk over it. Lookups
+    and prefix queries are case insensitive and use a second pair of
+    parallel lists ordered by case-folded key, where a prefix is the slice
+    between two bisect positions. The matches of the last prefix queried
+    are kept in listing order and updated on add and remove, so paging
+    through them sorts once.
+    """
+
+    def __init__(self, names=()):
+        self._names = []                                # Names as created, in listing order
+        self._keys = []                                 # Case-folded names, sorted
+        self._key_names = []                            # Names in the order of _keys
+        self._cached_key = None                         # Case-folded prefix of the last query
+        self._cached_names = []                         # ...its matches, in listing order
+        for name in names:
+            self.add(name)
+
+    def __len__(self):
+        return len(self._names)
+
+    def __iter__(self):
+        return iter(self._names)
+
+    def _index(self, name):
+        """Returns the position of name in _keys, None if it is not stored"""
+        key = name.casefold()
+        index = bisect.bisect_left(self._keys, key)
+        if index < len(self._keys) and self._keys[index] == key:
+            return index
+        return None
+
+    def get(self, name):
+        """Returns the stored spelling of name (case insensitive), or None"""
+        index = self._index(name)
+        return None if index is None else self._key_names[index]
+
+    def add(self, name):
+        """Adds a name, returns False if it is already stored"""
+        key = name.casefold()
+        index = bisect.bisect_left(self._keys, key)
+        if index < len(self._keys) and self._keys[index] == key:
+            return False
+        self._keys.insert(index, key)
+        self._key_names.insert(index, name)
+        bisect.insort(self._names, name)
+        if self._cached_key is not None and key.startswith(self._cached_key):
+            bisect.insort(self._cached_names, name)
+        return True
+
+    def remove(self, name):
+        """Removes a name (case insensitive), returns the stored spelling or None"""
+        index = self._index(name)
+        if index is None:
+            return None
+        key = self._keys.pop(index)
+        name = self._key_names.pop(index)
+        del self._names[bisect.bisect_left(self._names, name)]
+        if self._cached_key is not None and key.startswith(self._cached_key):
+            del self._cached_names[bisect.bisect_left(self._cached_names, name)]
+        return name
+
+    def _prefix_range(self, prefix):
+        """Returns the (start, end) positions in _keys of the names starting with prefix"""
+        key = prefix.casefold()
+        start = bisect.bisect_left(self._keys, key)
+        end = bisect.bisect_left(self._keys, key + "\U0010ffff")
+        while end < len(self._keys) and self._keys[end].startswith(key):   # Keys holding max code point
+            end += 1
+        return start, end
+
+    def count(self, prefix=""):
+        """Returns the number of names starting with prefix (case insensitive)"""
+        if not prefix:
+            return len(self._names)
+        start, end = self._prefix_range(prefix)
+        return end - start
+
+    def names(self, prefix="", offset=0, limit=None):
+        """Returns names starting with prefix, in listing order.
+
+        Without a prefix the page is a slice of the listing; with one, only
+        the matching names are sorted, once per prefix.
+
+        Args:
+            prefix: The (case insensitive) start of the names.
+            offset: Number of matching names to skip.
+            limit: Maximum number of names returned, all by default.
+        """
+        if prefix:
+            key = prefix.casefold()
+            if key != self._cached_key:
+                start, end = self._prefix_range(prefix)
+                self._cached_key, self._cached_names = key, sorted(self._key_names[start:end])
+            matches = self._cached_names
+        else:
+            matches = self._names
+        end = len(matches) if limit is None else offset + limit
+        return matches[offset:end]
@@ -0,0 +1,234 @@
+"""A video recommender class."""
+
+from array import array
+import bisect
+import heapq
+import random
+
+_PRIME = (1 << 61) - 1                                  # Modulus of the MinHash permutations
+
+
+class Recommender:
+    """A class used to recommend videos that share tags with a given video.
+
+    The video-tag matrix is stored in CSR form with array-backed index
+    arrays, both by video (ordinal -> tag ids) and transposed (tag id ->
+    ordinals). For every video the top-k most similar videos by Jaccard
+    similarity of their tag sets are precomputed into one flat array, so a
+    recommendation is a slice of at most k ordinals.
+
+    Candidates come from two sources, each limited to max_postings videos
+    so a video costs the same whatever the catalog size:
+      - the postings of its tags, rarest (highest IDF) first, stopping at
+        the first tag too frequent to scan whole;
+      - MinHash signatures of the tag sets hashed into LSH bands, smallest
+        bucket first. Videos share a bucket when their tag sets agree on a
+        band, so frequent tags contribute the videos that overlap the most
+        with the reference video, not an arbitrary slice of their postings.
+    Every candidate is then scored by its exact Jaccard similarity.
+
+    After catalog changes only the changed videos, the rows that listed
+    them and the rows they may now enter are ranked again (see update).
+    """
+
+    def __init__(self, library, k=10, max_postings=128, bands=8, rows=2, seed=1):
+        """Builds the similarity table for every video of the library.
+
+        Args:
+            library: The VideoLibrary to recommend from.
+            k: The number of similar videos kept per video.
+            max_postings: The most videos taken from tag postings, and
+                again from LSH buckets, for one video.
+            bands: Number of LSH bands.
+            rows: MinHash values per band.
+            seed: Seed of the hash permutations.
+        """
+        self._k = k
+        self._max_postings = max_postings
+        self._rows = rows
+        rng = random.Random(seed)
+        self._permutations = [(rng.randrange(1, _PRIME), rng.randrange(_PRIME)) for _ in range(bands * rows)]
+        self._tag_hashes = {}                               # Tag id -> its value under every permutation
+        self._catalog_version = library.catalog_version
+        size = library.ordinal_count
+
+        # Video -> tags CSR: tags of ordinal o are indices[indptr[o]:indptr[o + 1]]
+        self._indptr = array("q", bytes(8 * (size + 1)))
+        self._indices = array("I")
+        for ordinal, tag_ids in library.iter_ordinal_tags():
+            self._indices.extend(dict.fromkeys(tag_ids))    # Distinct tags, in order
+            self._indptr[ordinal + 1] = len(self._indices)
+        for ordinal in range(size):                         # Removed ordinals get empty rows
+            self._indptr[ordinal + 1] = max(self._indptr[ordinal + 1], self._indptr[ordinal])
+        self._retagged = {}                                 # Ordinal -> tag ids replacing its CSR row
+
+        # Tag -> videos CSR, the transpose of the above, as one array per tag,
+        # and one bucket dict per LSH band: band key -> ordinals
+        self._postings = {}
+        self._buckets = [{} for _ in range(bands)]
+        for ordinal in range(size):
+            self._index(ordinal)
+
+        # Top-k similar videos per video, k slots each, -1 when unused
+        self._similar = array("q", [-1]) * (size * k)
+        for ordinal in range(size):
+            self._store(ordinal, self._rank(ordinal, self._candidates(ordinal)))
+
+    @property
+    def catalog_version(self) -> int:
+        """Returns the library catalog version the table was built from"""
+        return self._catalog_version
+
+    def _tags(self, ordinal):
+        """Returns the distinct tag ids of a video"""
+        tag_ids = self._retagged.get(ordinal)
+        if tag_ids is not None:
+            return tag_ids
+        if ordinal + 1 >= len(self._indptr):
+            return ()
+        return self._indices[self._indptr[ordinal]:self._indptr[ordinal + 1]]
+
+    def _band_keys(self, tag_ids):
+        """Returns the bucket key of every LSH band of a tag set's MinHash signature"""
+        hashes = []
+        for tag_id in tag_ids:
+            values = self._tag_hashes.get(tag_id)
+            if values is None:
+                values = self._tag_hashes[tag_id] = [(a * tag_id + b) % _PRIME for a, b in self._permutations]
+            hashes.append(values)
+        signature = [min(values) for values in zip(*hashes)]
+        return [hash(tuple(signature[start:start + self._rows]))
+                for start in range(0, len(signature), self._rows)]
+
+    def _index(self, ordinal):
+        """Adds a video to the postings of its tags and to its LSH buckets"""
+        tag_ids = self._tags(ordinal)
+        for tag_id in tag_ids:
+            bisect.insort(self._postings.setdefault(tag_id, array("I")), ordinal)
+        if tag_ids:
+            for buckets, key in zip(self._buckets, self._band_keys(tag_ids)):
+                bisect.insort(buckets.setdefault(key, array("I")), ordinal)
+
+    def _unindex(self, ordinal):
+        """Removes a video from the postings of its tags and from its LSH buckets"""
+        tag_ids = self._tags(ordinal)
+        for tag_id in tag_ids:
+            postings = self._postings[tag_id]
+            del postings[bisect.bisect_left(postings, ordinal)]
+        if tag_ids:
+            for buckets, key in zip(self._buckets, self._band_keys(tag_ids)):
+                members = buckets[key]
+                del members[bisect.bisect_left(members, ordinal)]
+                if not members:
+                    del buckets[key]
+
+    def _candidates(self, ordinal):
+        """Returns the videos worth scoring against a video, see the class docstring"""
+        tag_ids = self._tags(ordinal)
+        candidates = set()
+        if not tag_ids:
+            return candidates
+        budget = self._max_postings
+        for tag_id in sorted(tag_ids, key=lambda tag_id: len(self._postings[tag_id])):   # Rarest first
+            others = self._postings[tag_id]
+            if len(others) > budget:                        # This and the remaining tags are too frequent
+                break
+            budget -= len(others)
+            candidates.update(others)
+        budget = self._max_postings
+        buckets = [buckets[key] for buckets, key in zip(self._buckets, self._band_keys(tag_ids))]
+        for members in sorted(buckets, key=len):            # Most specific band matches first
+            if budget <= 0:
+                break
+            candidates.update(members[:budget])             # Ties in a bucket favor low ordinals, as the ranking does
+            budget -= len(members)
+        candidates.discard(ordinal)
+        return candidates
+
+    def _rank(self, ordinal, candidates):
+        """Returns the (-Jaccard similarity, ordinal) pairs of the k candidates most similar to a video"""
+        tag_ids = set(self._tags(ordinal))
+        indptr, indices, retagged = self._indptr, self._indices, self._retagged
+        csr_size = len(indptr) - 1
+        ranked = []
+        for other in candidates:
+            other_tags = retagged.get(other)
+            if other_tags is None:
+                other_tags = indices[indptr[other]:indptr[other + 1]] if other < csr_size else ()
+            overlap = len(tag_ids.intersection(other_tags))
+            if overlap:
+                ranked.append((-overlap / (len(tag_ids) + len(other_tags) - overlap), other))
+        return heapq.nsmallest(self._k, ranked)
+
+    def _store(self, ordinal, ranked):
+        """Writes the ranked ordinals of a video into its row of the table"""
+        start = ordinal * self._k
+        self._similar[start:start + self._k] = array("q", [other for _, other in ranked]
+                                                     + [-1] * (self._k - len(ranked)))
+
+    def _rows_listing(self, ordinals):
+        """Returns the rows of the table that list any of ordinals"""
+        table = self._similar.tobytes()
+        rows = set()
+        for ordinal in ordinals:
+            pattern = array("q", [ordinal]).tobytes()
+            position = table.find(pattern)
+            while position != -1:
+                if position % len(pattern) == 0:            # Aligned on an entry
+                    rows.add(position // len(pattern) // self._k)
+                position = table.find(pattern, position + 1)
+        return rows
+
+    def update(self, library):
+        """Applies the catalog changes made since the table was built.
+
+        Changed videos are re-indexed and ranked again, rows that listed
+        them are ranked again, and each changed video is offered to the
+        rows of its candidates, which it may now enter.
+
+        Args:
+            library: The VideoLibrary the table was built from.
+
+        Returns:
+            False if the library no longer logs every change since the table
+            was built, and a new Recommender must be built instead.
+        """
+        changed = library.changed_ordinals(self._catalog_version)
+        if changed is None:
+            return False
+        size = library.ordinal_count
+        grown = size - len(self._similar) // self._k
+        if grown > 0:                                       # Slots for added videos
+            self._similar.extend(array("q", [-1]) * (grown * self._k))
+        stale = self._rows_listing(changed) - changed
+        for ordinal in changed:
+            self._unindex(ordinal)
+            self._retagged[ordinal] = tuple(dict.fromkeys(library.tag_ids_of(ordinal)))
+            self._index(ordinal)
+        offers = {}                                         # Row -> changed videos to offer it
+        for ordinal in changed:
+            candidates = self._candidates(ordinal)
+            self._store(ordinal, self._rank(ordinal, candidates))
+            for other in candidates - changed - stale:
+                offers.setdefault(other, []).append(ordinal)
+        for ordinal in stale:
+            self._store(ordinal, self._rank(ordinal, self._candidates(ordinal)))
+        for ordinal, offered in offers.items():
+            start = ordinal * self._k
+            listed = [other for other in self._similar[start:start + self._k] if other >= 0]
+            self._store(ordinal, self._rank(ordinal, listed + offered))
+        self._catalog_version = library.catalog_version
+        return True
+
+    def similar(self, ordinal, is_excluded=None):
+        """Returns up to k ordinals most similar to ordinal, best first.
+
+        Args:
+            ordinal: The ordinal of the reference video.
+            is_excluded: Optional callable dropping ordinals, e.g. flagged.
+        """
+        start = ordinal * self._k
+        if start >= len(self._similar):                     # Added after the table was built
+            return []
+        return [other for other in self._similar[start:start + self._k]
+                if other >= 0 and not (is_excluded and is_excluded(other))]
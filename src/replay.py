@@ -0,0 +1,124 @@
+"""Replays recorded command logs and reports latency percentiles.
+
+Usage:
+    python -m src.replay LOG [--as-fast-as-possible] [--sessions N]
+
+Each session drives its own CommandParser and VideoPlayer with the commands
+of LOG, answering search prompts with the recorded answers. The report shows
+throughput, p50/p95/p99 latency per command and the number of commands
+whose output differs from the recording.
+"""
+
+import argparse
+import contextlib
+from concurrent.futures import ProcessPoolExecutor
+import io
+import math
+import time
+
+from .command_log import read_log
+from .command_parser import CommandException
+from .command_parser import CommandParser
+from .video_player import VideoPlayer
+
+
+def percentile(sorted_values, fraction):
+    """Returns the nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def replay_session(entries, real_time=True):
+    """Replays log entries against a fresh player.
+
+    Args:
+        entries: Entries returned by read_log.
+        real_time: Wait between commands to match the recorded timestamps.
+
+    Returns:
+        A dict of command name -> list of latencies in seconds, and the list
+        of (index, command line) whose output diverged from the recording.
+    """
+    player = VideoPlayer()
+    parser = CommandParser(player)
+    latencies, divergences = {}, []
+    start = time.monotonic()
+    for index, entry in enumerate(entries):
+        if real_time:
+            delay = entry["t"] - (time.monotonic() - start)
+            if delay > 0:
+                time.sleep(delay)
+        answers = iter(entry.get("answers", ()))
+        player.response_reader = lambda: next(answers, "")
+        player.advance_clock()                          # As the interactive loop does
+        output = io.StringIO()
+        command = entry["cmd"].split()
+        began = time.perf_counter()
+        with contextlib.redirect_stdout(output):
+            try:
+                parser.execute_command(command)
+            except CommandException as e:
+                print(e)
+        elapsed = time.perf_counter() - began
+        name = command[0].upper() if command else ""
+        latencies.setdefault(name, []).append(elapsed)
+        if "out" in entry and output.getvalue() != entry["out"]:
+            divergences.append((index, entry["cmd"]))
+    return latencies, divergences
+
+
+def replay(entries, sessions=1, real_time=True):
+    """Replays log entries in parallel sessions, one process each.
+
+    Returns:
+        Merged latencies per command, divergences, and wall-clock seconds.
+    """
+    began = time.perf_counter()
+    if sessions == 1:
+        results = [replay_session(entries, real_time)]
+    else:
+        with ProcessPoolExecutor(max_workers=sessions) as pool:
+            results = list(pool.map(replay_session, [entries] * sessions, [real_time] * sessions))
+    elapsed = time.perf_counter() - began
+
+    latencies, divergences = {}, []
+    for session_latencies, session_divergences in results:
+        for name, values in session_latencies.items():
+            latencies.setdefault(name, []).extend(values)
+        divergences.extend(session_divergences)
+    return latencies, divergences, elapsed
+
+
+def format_report(latencies, divergences, elapsed):
+    """Returns the replay report as text"""
+    total = sum(len(values) for values in latencies.values())
+    lines = [f"{total} commands in {elapsed:.3f}s "
+             f"({total / elapsed if elapsed else 0:.0f} commands/s)",
+             f"{'command':<24}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"]
+    for name in sorted(latencies):
+        values = sorted(latencies[name])
+        lines.append(f"{name:<24}{len(values):>8}"
+                     + "".join(f"{percentile(values, p) * 1000:>10.3f}" for p in (0.50, 0.95, 0.99)))
+    lines.append(f"{len(divergences)} commands diverged from the recording")
+    for index, command in divergences[:20]:
+        lines.append(f"  #{index}: {command}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Replay a recorded command log.")
+    arg_parser.add_argument("log", help="log written by python -m src.run --record")
+    arg_parser.add_argument("--as-fast-as-possible", action="store_true",
+                            help="do not wait between commands")
+    arg_parser.add_argument("--sessions", type=int, default=1,
+                            help="number of parallel sessions (processes)")
+    args = arg_parser.parse_args(argv)
+    latencies, divergences, elapsed = replay(
+        read_log(args.log), args.sessions, not args.as_fast_as_possible)
+    print(format_report(latencies, divergences, elapsed))
+
+
+if __name__ == "__main__":
+    main()
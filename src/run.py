@@ -1,21 +1,107 @@
 """A youtube terminal simulator."""
+import argparse
+import contextlib
+import threading
+from .command_log import CommandRecorder
+from .http_api import start_server
+from .player_result import render_json_lines
+from .shared_catalog import SharedCatalog
+from .shared_catalog import SharedVideoLibrary
 from .video_player import VideoPlayer
+from .command_parser import COMMAND_NAMES
 from .command_parser import CommandException
 from .command_parser import CommandParser
 
 
+def _make_completer(video_player, readline):
+    """Returns a readline completer for command names and video ids."""
+    matches = []
+
+    def completer(text, state):
+        if state == 0:
+            line = readline.get_line_buffer()
+            if not line[:readline.get_begidx()].strip():            # First word: a command name
+                matches[:] = [name for name in COMMAND_NAMES
+                              if name.startswith(text.upper())]
+            else:                                                   # Any other word: a video id
+                matches[:] = video_player.complete_video_ids(text)
+        return matches[state] if state < len(matches) else None
+
+    return completer
+
+
+def _unlocked_reader(read_answer, lock):
+    """Returns a prompt reader that releases lock while it waits for the answer."""
+    def read_unlocked():
+        lock.release()                                              # Let HTTP requests in meanwhile
+        try:
+            return read_answer()
+        finally:
+            lock.acquire()
+
+    return read_unlocked
+
+
+def _enable_tab_completion(video_player):
+    """Turns on tab-completion when readline is available."""
+    try:
+        import readline
+    except ImportError:                                             # e.g. Windows without pyreadline
+        return
+    readline.set_completer(_make_completer(video_player, readline))
+    readline.set_completer_delims(" \t\n")
+    readline.parse_and_bind("tab: complete")
+
+
 if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument(
+        "--record", metavar="LOG",
+        help="record every command, prompt answer and output to LOG "
+             "(gzip compressed if it ends in .gz) for src.replay")
+    arg_parser.add_argument(
+        "--attach", metavar="NAME",
+        help="use the catalog published by 'python -m src.shared_catalog NAME' "
+             "instead of loading one")
+    arg_parser.add_argument(
+        "--output", choices=("text", "json"), default="text",
+        help="print player results as text (default) or as JSON lines")
+    arg_parser.add_argument(
+        "--http", metavar="PORT", type=int,
+        help="also serve listings, searches and playlists as JSON on "
+             "http://127.0.0.1:PORT")
+    args = arg_parser.parse_args()
+
     print("""Hello and welcome to YouTube, what would you like to do?
     Enter HELP for list of available commands or EXIT to terminate.""")
-    video_player = VideoPlayer()
+    shared = SharedCatalog.attach(args.attach) if args.attach else None
+    video_player = VideoPlayer(video_library=shared and SharedVideoLibrary(shared))
+    if args.output == "json":
+        video_player.renderer = render_json_lines
     parser = CommandParser(video_player)
+    recorder = CommandRecorder(args.record, video_player) if args.record else None
+    if args.output == "json":                                       # No text prompt to answer
+        video_player.response_reader = lambda: ""
+    _enable_tab_completion(video_player)
+    player_lock = threading.Lock()                                  # Shared with the HTTP API
+    http_server = start_server(video_player, args.http, player_lock) if args.http else None
+    if http_server:                                                 # Free the lock while a prompt waits
+        video_player.response_reader = _unlocked_reader(video_player.response_reader or input, player_lock)
     while True:
         command = input("YT> ")
         if command.upper() == "EXIT":
             break
-        try:
-            parser.execute_command(command.split())
-        except CommandException as e:
-            print(e)
+        with player_lock:
+            video_player.check_for_library_updates()
+            video_player.advance_clock()
+            with recorder.record(command) if recorder else contextlib.nullcontext():
+                try:
+                    parser.execute_command(command.split())
+                except CommandException as e:
+                    print(e)
+    if recorder:
+        recorder.close()
+    if http_server:
+        http_server.shutdown()
     print("YouTube has now terminated its execution. "
           "Thank you and goodbye!")
@@ -0,0 +1,44 @@
+"""A search result cache class."""
+
+from collections import OrderedDict
+
+
+class SearchCache:
+    """A bounded LRU cache of search results, invalidated by library epoch.
+
+    Each entry remembers the library epoch it was computed at. An entry whose
+    epoch is older than the current one is stale and counts as a miss, so a
+    flag change only invalidates entries as they are looked up instead of
+    flushing the whole cache.
+    """
+
+    def __init__(self, capacity=256):
+        self._capacity = capacity
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def capacity(self) -> int:
+        """Returns the maximum number of cached searches"""
+        return self._capacity
+
+    def get(self, key, epoch):
+        """Returns the cached video ids for key, or None if missing/stale"""
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != epoch:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key, epoch, video_ids):
+        """Stores video ids for key, evicting the least recently used entry"""
+        self._entries[key] = (epoch, tuple(video_ids))
+        self._entries.move_to_end(key)
+        if len(self._entries) > self._capacity:
+            self._entries.popitem(last=False)
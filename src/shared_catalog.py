@@ -0,0 +1,627 @@
+"""A catalog shared between player processes through shared memory.
+
+One loader process publishes the catalog and its flags:
+
+    python -m src.shared_catalog NAME [catalog_path]
+
+and any number of players attach to it read-only:
+
+    python -m src.run --attach NAME
+
+Two segments are created:
+    NAME_catalog  A section table followed by the catalog and its indexes,
+                  laid out so they are read in place: packed titles and ids,
+                  the case-folded title buffer, the id table sorted by id,
+                  the sorted tag keys with the ordinals of each tag, the
+                  listing order and the completion keys.
+    NAME_flags    A uint64 epoch, a table of flag reasons and one flag code
+                  byte per video ordinal (0 = not flagged, n = reason n).
+                  Reason slots no video uses any more are reclaimed once
+                  the table is full; a generation counter per slot tells
+                  other processes their cached text is stale.
+
+Attached processes build no per-video structures: lookups bisect or search
+memoryviews over the catalog segment, and Video objects are only created
+for the videos a call returns.
+
+Flag codes live only in shared memory, so a FLAG_VIDEO in one process is
+seen by every other process on its next read. Flag writes (rare) take an
+advisory file lock and advance the shared epoch so cached searches in all
+processes go stale.
+"""
+
+from array import array
+from multiprocessing import resource_tracker
+from multiprocessing import shared_memory
+import bisect
+import json
+import os
+import random
+import re
+import signal
+import struct
+import sys
+import tempfile
+
+try:
+    import fcntl
+except ImportError:                                     # No advisory locks on Windows
+    fcntl = None
+
+from .catalog_format import write_columnar_catalog
+from .video import Video
+from .video_library import VideoLibrary
+from .video_library import _TITLE_SEPARATOR
+from .video_library import _bitmap_of
+from .video_library import _iter_bits
+from .video_library import _listing_key
+
+REASON_SLOTS = 254                                      # Codes 1..254 name a stored reason
+REASON_SIZE = 512                                       # Bytes per slot: header + utf-8
+OVERFLOW_CODE = 255                                     # Used once every slot is taken
+OVERFLOW_REASON = "(reason not recorded)"
+_HEADER = struct.Struct("<Q")
+_SLOT = struct.Struct("<HH")                            # Text length + 1 (0 = free slot), generation
+_CODES_START = _HEADER.size + REASON_SLOTS * REASON_SIZE
+_MAGIC = b"VIDSHM01"
+_TABLE_HEADER = struct.Struct("<8sI")                   # Magic, length of the JSON section table
+
+# Sections of the catalog segment and their memoryview format. Strings are
+# packed utf-8, each followed by a NUL, with n + 1 offsets into the pack.
+_SECTIONS = {
+    "ids": "B", "id_offsets": "Q",                      # Video ids, by ordinal
+    "titles": "B", "title_offsets": "Q",                # Titles, by ordinal
+    "tags": "B", "tag_offsets": "Q",                    # NUL-joined tags, by ordinal
+    "folded_ids": "B", "folded_id_offsets": "Q",        # Case-folded ids, by ordinal
+    "folded_titles": "B", "folded_title_offsets": "Q",  # Case-folded titles, the title search buffer
+    "id_order": "I",                                    # Ordinals sorted by video id
+    "tag_keys": "B", "tag_key_offsets": "Q",            # Sorted case-folded tags, tag id = position
+    "tag_ids": "I", "tag_id_offsets": "Q",              # Tag ids of each ordinal
+    "postings": "I", "posting_offsets": "Q",            # Sorted ordinals of each tag id
+    "listing": "I",                                     # Ordinals in listing order
+    "completion": "Q",                                  # ordinal * 2 + (0 id, 1 title), by key
+}
+
+
+def _pack_strings(strings):
+    """Returns the NUL-terminated utf-8 pack of strings and its offsets"""
+    data, offsets = bytearray(), array("Q", [0])
+    for string in strings:
+        data += string.encode("utf-8") + b"\0"
+        offsets.append(len(data))
+    return data, offsets
+
+
+def _index_sections(videos):
+    """Returns the bytes of every catalog section for videos, in ordinal order"""
+    folded_ids = [video.video_id.casefold() for video in videos]
+    folded_titles = [video.title.casefold() for video in videos]
+    tag_keys = sorted({tag.casefold() for video in videos for tag in video.tags})
+    tag_numbers = {key: tag_id for tag_id, key in enumerate(tag_keys)}
+    tag_ids, tag_id_offsets = array("I"), array("Q", [0])
+    postings = [array("I") for _ in tag_keys]
+    for ordinal, video in enumerate(videos):
+        numbers = [tag_numbers[tag.casefold()] for tag in video.tags]
+        tag_ids.extend(numbers)
+        tag_id_offsets.append(len(tag_ids))
+        for tag_id in sorted(set(numbers)):
+            postings[tag_id].append(ordinal)
+    posting_offsets = array("Q", [0])
+    for posting in postings:
+        posting_offsets.append(posting_offsets[-1] + len(posting))
+    completion = sorted([(folded_ids[ordinal], video.video_id, ordinal * 2)
+                         for ordinal, video in enumerate(videos)]
+                        + [(folded_titles[ordinal], video.video_id, ordinal * 2 + 1)
+                           for ordinal, video in enumerate(videos)])
+
+    sections = {}
+    for name, offsets, strings in (
+            ("ids", "id_offsets", [video.video_id for video in videos]),
+            ("titles", "title_offsets", [video.title for video in videos]),
+            ("tags", "tag_offsets", [_TITLE_SEPARATOR.join(video.tags) for video in videos]),
+            ("folded_ids", "folded_id_offsets", folded_ids),
+            ("folded_titles", "folded_title_offsets", folded_titles),
+            ("tag_keys", "tag_key_offsets", tag_keys)):
+        sections[name], sections[offsets] = _pack_strings(strings)
+    sections["id_order"] = array("I", sorted(range(len(videos)), key=lambda ordinal: videos[ordinal].video_id))
+    sections["tag_ids"], sections["tag_id_offsets"] = tag_ids, tag_id_offsets
+    sections["postings"] = b"".join(postings)
+    sections["posting_offsets"] = posting_offsets
+    sections["listing"] = array("I", sorted(range(len(videos)), key=lambda ordinal: _listing_key(videos[ordinal])))
+    sections["completion"] = array("Q", [entry for _, _, entry in completion])
+    return {name: bytes(sections[name]) for name in _SECTIONS}
+
+
+def _catalog_bytes(videos):
+    """Returns the catalog segment contents: section table, then 8-byte aligned sections"""
+    sections = _index_sections(videos)
+    table, position = {}, 0
+    for name, data in sections.items():
+        table[name] = [position, len(data)]
+        position += -(-len(data) // 8) * 8
+    header = json.dumps({"rows": len(videos), "sections": table}).encode("utf-8")
+    header += b" " * (-(_TABLE_HEADER.size + len(header)) % 8)
+    data = bytearray(_TABLE_HEADER.pack(_MAGIC, len(header)) + header)
+    for name, section in sections.items():
+        data += section + bytes(-len(section) % 8)
+    return data
+
+
+def _stored_reason(reason):
+    """Returns reason cut to fit a slot, on a character boundary"""
+    encoded = reason.encode("utf-8")
+    if len(encoded) <= REASON_SIZE - _SLOT.size:
+        return reason
+    return encoded[:REASON_SIZE - _SLOT.size].decode("utf-8", "ignore")
+
+
+class SharedCatalog:
+    """A class used to represent the shared memory segments of a catalog."""
+
+    def __init__(self, name, catalog_segment, flags_segment, owner):
+        self._name = name
+        self._catalog_segment = catalog_segment
+        self._flags_segment = flags_segment
+        self._owner = owner
+        self._flags = flags_segment.buf[_CODES_START:]
+        self._reasons = {}                              # Code -> (slot generation, reason)
+        self._lock_path = os.path.join(tempfile.gettempdir(), f"{name}.flags.lock")
+        buf = catalog_segment.buf
+        magic, header_length = _TABLE_HEADER.unpack_from(buf, 0)
+        if magic != _MAGIC:
+            raise ValueError(f"{catalog_segment.name} is not a shared catalog")
+        header = json.loads(bytes(buf[_TABLE_HEADER.size:_TABLE_HEADER.size + header_length]))
+        base = _TABLE_HEADER.size + header_length
+        self._rows = header["rows"]
+        self._sections = {}                             # Name -> memoryview into the segment
+        for name, (offset, length) in header["sections"].items():
+            self._sections[name] = buf[base + offset:base + offset + length].cast(_SECTIONS[name])
+
+    @classmethod
+    def publish(cls, library, name):
+        """Copies a library, its indexes and its flags into new shared memory segments.
+
+        Args:
+            library: The VideoLibrary to publish.
+            name: The name attaching processes will use.
+        """
+        videos = library.get_all_videos()
+        data = _catalog_bytes(videos)
+        catalog_segment = shared_memory.SharedMemory(f"{name}_catalog", create=True, size=len(data))
+        catalog_segment.buf[:len(data)] = data
+        flags_segment = shared_memory.SharedMemory(
+            f"{name}_flags", create=True, size=_CODES_START + max(len(videos), 1))
+        flags_segment.buf[:] = bytes(flags_segment.size)
+        shared = cls(name, catalog_segment, flags_segment, owner=True)
+        shared.set_flags((ordinal, video.flag) for ordinal, video in enumerate(videos) if video.flag)
+        return shared
+
+    @classmethod
+    def attach(cls, name):
+        """Attaches to the segments published under name."""
+        segments = []
+        for suffix in ("_catalog", "_flags"):
+            segment = shared_memory.SharedMemory(f"{name}{suffix}")
+            # Before Python 3.13 attaching registers the segment with this
+            # process' resource tracker, which would unlink it on exit.
+            resource_tracker.unregister(segment._name, "shared_memory")
+            segments.append(segment)
+        return cls(name, *segments, owner=False)
+
+    @property
+    def name(self) -> str:
+        """Returns the name the catalog was published under"""
+        return self._name
+
+    @property
+    def rows(self) -> int:
+        """Returns the number of published videos"""
+        return self._rows
+
+    def section(self, name):
+        """Returns a catalog section as a typed memoryview, without copying it"""
+        return self._sections[name]
+
+    @property
+    def flags(self):
+        """Returns the flag code of every ordinal, as a writable memoryview"""
+        return self._flags
+
+    @property
+    def epoch(self) -> int:
+        """Returns the number of flag changes made by any process"""
+        return _HEADER.unpack_from(self._flags_segment.buf, 0)[0]
+
+    def _slot(self, code):
+        """Returns the (text length, generation, offset of the text) of a reason slot, length None if free"""
+        offset = _HEADER.size + (code - 1) * REASON_SIZE
+        length, generation = _SLOT.unpack_from(self._flags_segment.buf, offset)
+        return (length - 1 if length else None), generation, offset + _SLOT.size
+
+    def reason(self, code):
+        """Returns the flag reason of a code, None for code 0"""
+        if code == 0:
+            return None
+        if code == OVERFLOW_CODE:
+            return OVERFLOW_REASON
+        length, generation, offset = self._slot(code)
+        cached = self._reasons.get(code)
+        if cached is None or cached[0] != generation:
+            text = self._flags_segment.buf[offset:offset + (length or 0)]
+            cached = self._reasons[code] = generation, str(text, "utf-8", "ignore")
+        return cached[1]
+
+    def code_of(self, reason):
+        """Returns the code of a stored reason without storing it, or None"""
+        stored = _stored_reason(reason)
+        for code in range(1, REASON_SLOTS + 1):
+            if self._slot(code)[0] is not None and self.reason(code) == stored:
+                return code
+        return OVERFLOW_CODE if reason == OVERFLOW_REASON else None
+
+    def _intern_reason(self, reason, codes):
+        """Returns the code of reason, storing it in a free slot if needed.
+
+        When no slot is free, the slots of reasons no video is flagged with
+        any more are freed first. Must be called with the lock held.
+
+        Args:
+            reason: The flag reason.
+            codes: Dict of reason -> code interned under the same lock
+                hold; cleared when slots are freed.
+        """
+        code = codes.get(reason)
+        if code is None:
+            code = codes[reason] = self.code_of(reason)
+        if code is not None:
+            return code
+        encoded = _stored_reason(reason).encode("utf-8")
+        free = [code for code in range(1, REASON_SLOTS + 1) if self._slot(code)[0] is None]
+        if not free:
+            used = set(bytes(self._flags))
+            for code in range(1, REASON_SLOTS + 1):
+                if code not in used:
+                    self._free_slot(code)
+                    free.append(code)
+            codes.clear()
+        if not free:
+            return OVERFLOW_CODE
+        code = free[0]
+        _, generation, offset = self._slot(code)
+        buf = self._flags_segment.buf
+        buf[offset:offset + len(encoded)] = encoded
+        _SLOT.pack_into(buf, offset - _SLOT.size, len(encoded) + 1, (generation + 1) & 0xFFFF)
+        codes[reason] = code
+        return code
+
+    def _free_slot(self, code):
+        """Marks a reason slot free, advancing its generation"""
+        _, generation, offset = self._slot(code)
+        _SLOT.pack_into(self._flags_segment.buf, offset - _SLOT.size, 0, (generation + 1) & 0xFFFF)
+
+    def _locked(self):
+        """Returns an open lock file, exclusively locked where supported"""
+        lock_file = open(self._lock_path, "a")
+        if fcntl:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        return lock_file
+
+    def set_flags(self, flags, clear=False):
+        """Sets flag reasons and advances the shared epoch once.
+
+        Args:
+            flags: Iterable of (ordinal, reason) pairs, None to allow.
+            clear: Whether to allow every other video first.
+        """
+        with self._locked():
+            if clear:
+                self._flags[:] = bytes(len(self._flags))
+            codes = {}
+            for ordinal, reason in flags:
+                self._flags[ordinal] = 0 if reason is None else self._intern_reason(reason, codes)
+            buf = self._flags_segment.buf
+            _HEADER.pack_into(buf, 0, _HEADER.unpack_from(buf, 0)[0] + 1)
+
+    def set_flag(self, ordinal, reason):
+        """Sets the flag reason of one ordinal, None to allow it"""
+        self.set_flags([(ordinal, reason)])
+
+    def close(self):
+        """Detaches from the segments, removing them if this process published them"""
+        self._flags.release()
+        for section in self._sections.values():
+            section.release()
+        self._catalog_segment.close()
+        self._flags_segment.close()
+        if self._owner:
+            self._catalog_segment.unlink()
+            self._flags_segment.unlink()
+
+
+class _PackedStrings:
+    """A sequence over a section of NUL-terminated utf-8 strings, decoded on access"""
+
+    def __init__(self, data, offsets):
+        self._data = data
+        self._offsets = offsets
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        return str(self._data[self._offsets[index]:self._offsets[index + 1] - 1], "utf-8")
+
+
+class _SortedKeys:
+    """A sequence of the keys of sorted entries, computed on access so bisect can search it"""
+
+    def __init__(self, entries, key):
+        self._entries = entries
+        self._key = key
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __getitem__(self, index):
+        return self._key(self._entries[index])
+
+
+class _SharedVideo(Video):
+    """A Video whose flag is read from the shared flag codes"""
+
+    def __init__(self, video_title, video_id, video_tags, library, ordinal):
+        super().__init__(video_title, video_id, video_tags)
+        self._library = library
+        self._ordinal = ordinal
+
+    @property
+    def flag(self) -> str:
+        """Returns the flag of a video, as currently set by any process"""
+        return self._library.shared_flag(self._ordinal)
+
+
+class SharedVideoLibrary(VideoLibrary):
+    """A read-only VideoLibrary backed by a published SharedCatalog.
+
+    Every query reads the shared catalog sections in place, so the memory of
+    an attached process does not grow with the catalog.
+    """
+
+    def __init__(self, shared):
+        """Attaches the library to the sections of a shared catalog.
+
+        Args:
+            shared: A SharedCatalog, usually from SharedCatalog.attach().
+        """
+        self._shared = shared
+        self._workers = None
+        self._catalog_path = None
+        self._catalog_stat = None
+        self._rows = shared.rows
+        self._flagged = shared.flags                    # Flag checks read shared memory
+        self._ids = _PackedStrings(shared.section("ids"), shared.section("id_offsets"))
+        self._titles = _PackedStrings(shared.section("titles"), shared.section("title_offsets"))
+        self._tags = _PackedStrings(shared.section("tags"), shared.section("tag_offsets"))
+        self._folded_ids = _PackedStrings(shared.section("folded_ids"), shared.section("folded_id_offsets"))
+        self._folded_titles = _PackedStrings(shared.section("folded_titles"),
+                                             shared.section("folded_title_offsets"))
+        self._tag_keys = _PackedStrings(shared.section("tag_keys"), shared.section("tag_key_offsets"))
+        self._id_keys = _SortedKeys(shared.section("id_order"), self._ids.__getitem__)
+        self._completion_keys = _SortedKeys(shared.section("completion"), self._completion_key)
+
+    def _completion_key(self, entry):
+        """Returns the case-folded id or title a completion entry is sorted by"""
+        return (self._folded_titles if entry & 1 else self._folded_ids)[entry >> 1]
+
+    def _video(self, ordinal):
+        """Returns a new Video object for an ordinal, read from the shared sections"""
+        tags = self._tags[ordinal]
+        return _SharedVideo(self._titles[ordinal], self._ids[ordinal],
+                            tags.split(_TITLE_SEPARATOR) if tags else (), self, ordinal)
+
+    def _tag_postings(self, tag):
+        """Returns the sorted ordinals of the videos with a tag, empty for unknown tags"""
+        key = tag.casefold()
+        tag_id = bisect.bisect_left(self._tag_keys, key)
+        if tag_id == len(self._tag_keys) or self._tag_keys[tag_id] != key:
+            return ()
+        offsets = self._shared.section("posting_offsets")
+        return self._shared.section("postings")[offsets[tag_id]:offsets[tag_id + 1]]
+
+    def _videos_in_bitmap(self, bitmap):
+        return [self._video(ordinal) for ordinal in _iter_bits(bitmap)]
+
+    def _flagged_bits(self):
+        return _bitmap_of(bytes(self._flagged))
+
+    def _live_bits(self):
+        return (1 << self._rows) - 1
+
+    def shared_flag(self, ordinal):
+        """Returns the shared flag reason of the video with an ordinal, None if not flagged."""
+        return self._shared.reason(self._flagged[ordinal])
+
+    @property
+    def read_only(self) -> bool:
+        return True
+
+    @property
+    def epoch(self) -> int:
+        return self._shared.epoch
+
+    @property
+    def catalog_version(self) -> int:
+        return 0
+
+    @property
+    def ordinal_count(self) -> int:
+        return self._rows
+
+    def poll_catalog(self):
+        return None
+
+    def save_columnar(self, path, compression="zlib"):
+        write_columnar_catalog(path, (
+            (video.video_id, video.title, video.tags, video.flag)
+            for video in map(self._video, range(self._rows))), compression)
+
+    def iter_ordinal_tags(self):
+        for ordinal in range(self._rows):
+            yield ordinal, self.tag_ids_of(ordinal)
+
+    def tag_ids_of(self, ordinal):
+        offsets = self._shared.section("tag_id_offsets")
+        return tuple(self._shared.section("tag_ids")[offsets[ordinal]:offsets[ordinal + 1]])
+
+    def id_table(self):
+        return bytes(self._shared.section("ids")[:-1])
+
+    def map_id_table(self, id_table):
+        return [self.get_ordinal(video_id) if video_id else None
+                for video_id in id_table.decode("utf-8").split(_TITLE_SEPARATOR)]
+
+    def live_map(self):
+        return b"\x01" * self._rows
+
+    def flag_video(self, video, flag_reason):
+        self._shared.set_flag(self.get_ordinal(video.video_id), flag_reason)
+
+    def allow_video(self, video):
+        self._shared.set_flag(self.get_ordinal(video.video_id), None)
+
+    def restore_flags(self, flags):
+        self._shared.set_flags(flags, clear=True)
+
+    def _flagged_with(self, flag_reason):
+        """Returns the ordinals flagged with a reason, scanning the shared flag codes"""
+        code = self._shared.code_of(flag_reason)
+        if code is None:
+            return []
+        codes, code_byte, ordinals = bytes(self._flagged), bytes([code]), []
+        ordinal = codes.find(code_byte)
+        while ordinal != -1:
+            ordinals.append(ordinal)
+            ordinal = codes.find(code_byte, ordinal + 1)
+        return ordinals
+
+    def get_flagged_videos(self, flag_reason):
+        """Returns the videos flagged with a reason, in ordinal order.
+
+        Flags can be changed by any process, so instead of a moderation
+        index the shared flag codes are scanned (a C-level byte search).
+        """
+        return [self._video(ordinal) for ordinal in self._flagged_with(flag_reason)]
+
+    def flag_reason_counts(self):
+        codes = bytes(self._flagged)
+        counts = {}
+        for code in set(codes) - {0}:
+            flag_reason = self._shared.reason(code)
+            counts[flag_reason] = counts.get(flag_reason, 0) + codes.count(code)
+        return counts
+
+    def allow_by_reason(self, flag_reason):
+        ordinals = self._flagged_with(flag_reason)
+        videos = [self._video(ordinal) for ordinal in ordinals]
+        if ordinals:
+            self._shared.set_flags((ordinal, None) for ordinal in ordinals)
+        return videos
+
+    def get_all_videos(self):
+        return [self._video(ordinal) for ordinal in range(self._rows)]
+
+    def get_video(self, video_id):
+        ordinal = self.get_ordinal(video_id)
+        return None if ordinal is None else self._video(ordinal)
+
+    def get_ordinal(self, video_id):
+        """Returns the ordinal of a video with a bisect on the shared id table."""
+        index = bisect.bisect_left(self._id_keys, video_id)
+        if index == len(self._id_keys) or self._id_keys[index] != video_id:
+            return None
+        return self._shared.section("id_order")[index]
+
+    def get_video_by_ordinal(self, ordinal):
+        if not 0 <= ordinal < self._rows:
+            raise IndexError("ordinal out of range")
+        return self._video(ordinal)
+
+    def get_sorted_video_ids(self):
+        return [self._ids[ordinal] for ordinal in self._shared.section("listing")]
+
+    def random_playable_video(self):
+        """Returns a random unflagged video, or None if every video is flagged.
+
+        A few random ordinals are tried first; only when they are all
+        flagged are the unflagged ordinals collected from the flag codes.
+        """
+        if not self._rows:
+            return None
+        for _ in range(8):
+            ordinal = random.randrange(self._rows)
+            if not self._flagged[ordinal]:
+                return self._video(ordinal)
+        playable = [ordinal for ordinal, code in enumerate(self._flagged[:self._rows]) if not code]
+        return self._video(random.choice(playable)) if playable else None
+
+    def complete(self, prefix, limit=10):
+        """Returns the ids of videos whose id or title starts with prefix.
+
+        The sorted completion entries are bisected in place, each key being
+        read from the case-folded id or title it points to.
+        """
+        prefix = prefix.casefold()
+        keys, entries = self._completion_keys, self._shared.section("completion")
+        index = bisect.bisect_left(keys, prefix)
+        matches = []
+        while index < len(keys) and len(matches) < limit:
+            if not keys[index].startswith(prefix):
+                break
+            video_id = self._ids[entries[index] >> 1]
+            if video_id not in matches:
+                matches.append(video_id)
+            index += 1
+        return matches
+
+    def search_titles(self, search_term):
+        """Returns the videos whose title contains search_term.
+
+        The shared case-folded title buffer is searched in place with a
+        bytes pattern; each hit is mapped back to its ordinal with a bisect
+        on the title offsets and the search resumes at the next title.
+        """
+        pattern = re.compile(re.escape(search_term.casefold().encode("utf-8")))
+        buffer = self._shared.section("folded_titles")
+        offsets = self._shared.section("folded_title_offsets")
+        matches = []
+        match = pattern.search(buffer)
+        while match:
+            ordinal = bisect.bisect_right(offsets, match.start()) - 1
+            if ordinal >= self._rows:                   # Empty term matching the end
+                break
+            matches.append(self._video(ordinal))
+            match = pattern.search(buffer, offsets[ordinal + 1])
+        return matches
+
+
+def main(argv):
+    """Publishes a catalog until interrupted, then removes the segments."""
+    if not argv or len(argv) > 2:
+        print("Usage: python -m src.shared_catalog NAME [catalog_path]")
+        return 2
+    library = VideoLibrary(argv[1] if len(argv) > 1 else None)
+    shared = SharedCatalog.publish(library, argv[0])
+    signal.signal(signal.SIGTERM, lambda *args: sys.exit(0))
+    print(f"Published {len(library.get_all_videos())} videos as {argv[0]}, "
+          "press Ctrl-C to stop")
+    try:
+        signal.pause() if hasattr(signal, "pause") else input()
+    except (KeyboardInterrupt, SystemExit, EOFError):
+        pass
+    finally:
+        shared.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,76 @@
+"""A tag query parser."""
+
+import re
+
+
+class TagQueryException(Exception):
+    """A class used to represent a malformed tag expression."""
+    pass
+
+
+_TOKEN_PATTERN = re.compile(r"\(|\)|[^\s()]+")
+
+
+def evaluate_tag_query(query, tag_bitmap, universe):
+    """Evaluates an AND/OR/NOT tag expression over video bitmaps.
+
+    Grammar, from loosest to tightest binding:
+        expression := term (OR term)*
+        term       := factor (AND factor)*
+        factor     := NOT factor | "(" expression ")" | <tag>
+
+    Args:
+        query: The expression, e.g. "#cat AND NOT #dog".
+        tag_bitmap: Callable returning the bitmap of videos with a tag.
+        universe: Bitmap of every video, used to complement NOT.
+
+    Returns:
+        The bitmap of videos matching the expression.
+
+    Raises:
+        TagQueryException: If the expression cannot be parsed.
+    """
+    tokens = _TOKEN_PATTERN.findall(query)
+    position = 0
+
+    def peek():
+        return tokens[position].upper() if position < len(tokens) else None
+
+    def take():
+        nonlocal position
+        if position >= len(tokens):
+            raise TagQueryException("Unexpected end of tag expression")
+        position += 1
+        return tokens[position - 1]
+
+    def expression():
+        bitmap = term()
+        while peek() == "OR":
+            take()
+            bitmap |= term()
+        return bitmap
+
+    def term():
+        bitmap = factor()
+        while peek() == "AND":
+            take()
+            bitmap &= factor()
+        return bitmap
+
+    def factor():
+        token = take()
+        if token.upper() == "NOT":
+            return universe & ~factor()
+        if token == "(":
+            bitmap = expression()
+            if take() != ")":
+                raise TagQueryException("Missing closing parenthesis")
+            return bitmap
+        if token == ")" or token.upper() in ("AND", "OR"):
+            raise TagQueryException(f"Unexpected {token} in tag expression")
+        return tag_bitmap(token)
+
+    bitmap = expression()
+    if position != len(tokens):
+        raise TagQueryException(f"Unexpected {tokens[position]} in tag expression")
+    return bitmap
@@ -0,0 +1,130 @@
+"""Approximate top-N counters with bounded memory.
+
+A CountMinSketch estimates how often any key was seen with a fixed table
+of counters: estimates never undercount and overcount by at most
+epsilon * total with probability 1 - delta. HeavyHitters pairs a sketch
+with a min-heap of the capacity keys with the highest estimates (the
+Space-Saving idea), so the top keys are known without a counter per key.
+"""
+
+from array import array
+import heapq
+import math
+import random
+
+DEFAULT_EPSILON = 0.001                                 # Overcount bound, as a share of all counts
+DEFAULT_DELTA = 0.01                                    # Probability of exceeding the bound
+DEFAULT_CAPACITY = 100                                  # Keys tracked by a HeavyHitters
+_PRIME = (1 << 61) - 1                                  # Modulus of the row hash functions
+
+
+class CountMinSketch:
+    """A class used to represent a Count-Min sketch with conservative update."""
+
+    def __init__(self, epsilon=DEFAULT_EPSILON, delta=DEFAULT_DELTA, seed=None):
+        """Count Min Sketch Constructor
+
+        Args:
+            epsilon: Estimates exceed true counts by at most epsilon * total...
+            delta: ...except with probability delta.
+            seed: Seed of the row hash functions.
+        """
+        self.epsilon = epsilon
+        self.delta = delta
+        self._width = math.ceil(math.e / epsilon)
+        depth = math.ceil(math.log(1 / delta))
+        rng = random.Random(seed)
+        self._hashes = [(rng.randrange(1, _PRIME), rng.randrange(_PRIME)) for _ in range(depth)]
+        self._rows = [array("Q", bytes(8 * self._width)) for _ in range(depth)]
+        self.total = 0
+
+    def _cells(self, key):
+        """Returns the counter index of key in every row.
+
+        Each row applies its own (a * h + b) mod p function to the key hash,
+        so rows collide independently; salting the key in a tuple hash
+        gives rows that collide together.
+        """
+        key_hash = hash(key)
+        return [(a * key_hash + b) % _PRIME % self._width for a, b in self._hashes]
+
+    def add(self, key, count=1):
+        """Counts key, returns its new estimate.
+
+        Only the rows at the current minimum are raised (conservative
+        update), which keeps the bound and makes estimates tighter.
+        """
+        cells = self._cells(key)
+        estimate = min(row[cell] for row, cell in zip(self._rows, cells)) + count
+        for row, cell in zip(self._rows, cells):
+            if row[cell] < estimate:
+                row[cell] = estimate
+        self.total += count
+        return estimate
+
+    def estimate(self, key):
+        """Returns how often key was counted, never less than the truth"""
+        return min(row[cell] for row, cell in zip(self._rows, self._cells(key)))
+
+    @property
+    def error_bound(self) -> float:
+        """Returns the most an estimate overcounts, with probability 1 - delta"""
+        return self.epsilon * self.total
+
+
+class HeavyHitters:
+    """A class used to track the most frequent keys of a stream."""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, epsilon=DEFAULT_EPSILON, delta=DEFAULT_DELTA):
+        """Heavy Hitters Constructor
+
+        Args:
+            capacity: Number of top keys kept.
+            epsilon, delta: Error bound of the sketch, see CountMinSketch.
+        """
+        self._sketch = CountMinSketch(epsilon, delta)
+        self._capacity = capacity
+        self._counts = {}                               # key -> estimate, the top candidates
+        self._heap = []                                 # (estimate, key), may hold stale entries
+
+    def __len__(self):
+        return len(self._counts)
+
+    @property
+    def total(self) -> int:
+        """Returns the number of counts added"""
+        return self._sketch.total
+
+    @property
+    def error_bound(self) -> float:
+        """Returns the most a reported count overcounts, see CountMinSketch"""
+        return self._sketch.error_bound
+
+    def add(self, key, count=1):
+        """Counts key and keeps it if it is now among the top keys"""
+        estimate = self._sketch.add(key, count)
+        if key in self._counts or len(self._counts) < self._capacity:
+            self._counts[key] = estimate
+            heapq.heappush(self._heap, (estimate, key))
+        else:
+            heap = self._heap
+            while heap[0][0] != self._counts.get(heap[0][1]):   # Drop outdated minimums
+                heapq.heappop(heap)
+            if estimate <= heap[0][0]:
+                return
+            evicted = heapq.heapreplace(heap, (estimate, key))[1]
+            del self._counts[evicted]
+            self._counts[key] = estimate
+        if len(self._heap) > 4 * self._capacity:        # Bound the stale entries
+            self._heap = [(estimate, key) for key, estimate in self._counts.items()]
+            heapq.heapify(self._heap)
+
+    def top(self, n, keep=None):
+        """Returns up to n (key, estimate) pairs, highest estimate first.
+
+        Args:
+            n: Number of pairs returned.
+            keep: Predicate on keys; keys failing it are skipped.
+        """
+        ranked = sorted(self._counts.items(), key=lambda item: (-item[1], item[0]))
+        return [item for item in ranked if keep is None or keep(item[0])][:n]
@@ -1,8 +1,62 @@
 """A video library class."""
 
+from .catalog_format import CatalogFormatException
+from .catalog_format import is_columnar_catalog
+from .catalog_format import read_columnar_catalog
+from .catalog_format import write_columnar_catalog
+from .tag_query import evaluate_tag_query
 from .video import Video
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import compress
+from itertools import repeat
 from pathlib import Path
+import bisect
 import csv
+import io
+import operator
+import os
+import random
+
+
+# Separates titles in the packed title buffer. It cannot be typed as part of
+# a search term, so a match never spans two titles.
+_TITLE_SEPARATOR = "\x00"
+
+# Turns a bytearray of flag bytes into the "0"/"1" digits of a bitmap,
+# any non-zero byte counting as flagged.
+_BIT_DIGITS = b"0" + b"1" * 255
+
+# Catalog files smaller than this are parsed in-process: below it, starting
+# a process pool costs more than it saves.
+PARALLEL_LOAD_MIN_BYTES = 16 * 1024 * 1024
+
+# Catalog changes remembered for changed_ordinals(); indexes that fall
+# further behind are rebuilt instead of updated.
+CHANGE_LOG_SIZE = 1024
+
+
+def _iter_bits(bitmap):
+    """Yields the positions of the set bits of an int bitmap, lowest first.
+
+    Scans the binary text with str.find, which stays in C for large sparse
+    bitmaps instead of shifting the whole int once per set bit.
+    """
+    bits = bin(bitmap)[:1:-1]
+    position = bits.find("1")
+    while position != -1:
+        yield position
+        position = bits.find("1", position + 1)
+
+
+def _bitmap_of(flags):
+    """Returns the int bitmap with bit i set where byte i of flags is non-zero.
+
+    The int is built in one pass over the bytes instead of OR-ing one bit
+    per ordinal, which copies the whole int every time.
+    """
+    return int(flags.translate(_BIT_DIGITS)[::-1] or b"0", 2)
 
 
 # Helper Wrapper around CSV reader to strip whitespace from around
@@ -11,22 +65,735 @@ def _csv_reader_with_strip(reader):
     yield from ((item.strip() for item in line) for line in reader)
 
 
+class CatalogDiff:
+    """A class used to represent the changes applied by a catalog reload."""
+
+    def __init__(self, added, removed, updated, removed_ordinals=()):
+        self.added = added
+        self.removed = removed
+        self.updated = updated
+        self.removed_ordinals = removed_ordinals
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.updated)
+
+
+def _listing_key(video):
+    """Returns the sort key of a video in the full listing.
+
+    Matches the "title (video_id) [tags]" text the player prints, so the
+    listing comes out in the same order as sorting the printed lines.
+    """
+    return f"{video.title} ({video.video_id}) [{' '.join(video.tags)}]"
+
+
+def _parse_catalog_lines(video_file):
+    """Parses catalog lines into a list of (video_id, title, tags) rows."""
+    rows = []
+    reader = _csv_reader_with_strip(
+        csv.reader(video_file, delimiter="|"))
+    for video_info in reader:
+        title, url, tags = video_info
+        rows.append((
+            url,
+            title,
+            tuple(tag.strip() for tag in tags.split(",")) if tags else (),
+        ))
+    return rows
+
+
+def _parse_catalog_range(catalog_path, start, end):
+    """Parses the catalog rows in the byte range [start, end) of the file.
+
+    Both ends must fall on line boundaries. Runs in a worker process.
+    """
+    with open(catalog_path, "rb") as video_file:
+        video_file.seek(start)
+        chunk = video_file.read(end - start)
+    return _parse_catalog_lines(io.TextIOWrapper(io.BytesIO(chunk)))
+
+
+def _split_catalog(catalog_path, parts):
+    """Splits the catalog file into at most parts newline-aligned byte ranges."""
+    size = os.path.getsize(catalog_path)
+    boundaries = [0]
+    with open(catalog_path, "rb") as video_file:
+        for part in range(1, parts):
+            position = max(size * part // parts, boundaries[-1])
+            video_file.seek(position)
+            video_file.readline()                       # Move to the start of the next line
+            boundaries.append(min(video_file.tell(), size))
+    boundaries.append(size)
+    return [(start, end) for start, end in zip(boundaries, boundaries[1:]) if start < end]
+
+
+def _read_catalog(catalog_path, workers=None):
+    """Reads a catalog file into a dict of video_id -> (title, tags).
+
+    Catalogs of at least PARALLEL_LOAD_MIN_BYTES are split into
+    newline-aligned byte ranges parsed in a process pool; the ranges are
+    merged back in file order. Either way rows are kept in file order and a
+    duplicated video_id keeps the last row.
+
+    Args:
+        catalog_path: The catalog file to read.
+        workers: Number of parsing processes, os.cpu_count() by default.
+            1 always parses in this process.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and os.path.getsize(catalog_path) >= PARALLEL_LOAD_MIN_BYTES:
+        ranges = _split_catalog(catalog_path, workers)
+        with ProcessPoolExecutor(max_workers=len(ranges)) as pool:
+            chunks = pool.map(_parse_catalog_range, repeat(catalog_path),
+                              [start for start, _ in ranges], [end for _, end in ranges])
+            parsed = [row for chunk in chunks for row in chunk]
+    else:
+        with open(catalog_path) as video_file:
+            parsed = _parse_catalog_lines(video_file)
+
+    rows = {}
+    for video_id, title, tags in parsed:
+        rows[video_id] = (title, tags)
+    return rows
+
+
+def _load_catalog(catalog_path, workers=None):
+    """Reads a text or columnar catalog file.
+
+    Returns:
+        A dict of video_id -> (title, tags) in file order, and a dict of
+        video_id -> flag reason for the flags saved in a columnar catalog.
+    """
+    if not is_columnar_catalog(catalog_path):
+        return _read_catalog(catalog_path, workers), {}
+    columns = read_columnar_catalog(catalog_path)
+    rows, flags = {}, {}
+    for video_id, title, tags, flag in zip(
+            columns["ids"], columns["titles"], columns["tags"], columns["flags"]):
+        rows[video_id] = (title, tags)
+        if flag is not None:
+            flags[video_id] = flag
+    return rows, flags
+
+
 class VideoLibrary:
     """A class used to represent a Video Library."""
 
-    def __init__(self):
-        """The VideoLibrary class is initialized."""
+    def __init__(self, catalog_path=None, workers=None):
+        """The VideoLibrary class is initialized.
+
+        Args:
+            catalog_path: The catalog file to load, videos.txt next to this
+                module by default.
+            workers: Number of processes used to parse large catalogs,
+                os.cpu_count() by default.
+        """
+        self._workers = workers
+        self._catalog_path = Path(catalog_path or Path(__file__).parent / "videos.txt")
+        self._catalog_stat = self._stat_catalog()
+        self._failed_stat = None                        # Stat of a catalog file that failed to parse
+        self._load(*_load_catalog(self._catalog_path, workers))
+        self._added = {}                                # Runtime overlay on the file: video_id -> (title, tags)
+        self._removed = set()                           # ...ids removed at runtime
+        self._retagged = {}                             # ...video_id -> tags set at runtime
+
+    def _load(self, rows, flags):
+        """Builds the catalog and every index from parsed rows.
+
+        Args:
+            rows: A dict of video_id -> (title, tags), in catalog order.
+            flags: A dict of video_id -> flag reason.
+        """
         self._videos = {}
-        with open(Path(__file__).parent / "videos.txt") as video_file:
-            reader = _csv_reader_with_strip(
-                csv.reader(video_file, delimiter="|"))
-            for video_info in reader:
-                title, url, tags = video_info
-                self._videos[url] = Video(
-                    title,
-                    url,
-                    [tag.strip() for tag in tags.split(",")] if tags else [],
-                )
+        self._epoch = 0
+        self._catalog_version = 0
+        self._changes = deque(maxlen=CHANGE_LOG_SIZE)   # (catalog version, changed ordinals)
+        self._ordinals = {}                             # video_id -> dense int ordinal
+        self._ordinal_ids = []                          # ordinal -> video_id, None once removed
+        self._live = bytearray()                        # Byte per ordinal, 1 while in the library
+        self._flagged = bytearray()                     # Byte per ordinal, for O(1) flag checks
+        self._flag_reasons = {}                         # Flag reason -> {video_id: None}, in flag order
+        self._tag_ids = {}                              # Case-folded tag -> interned tag id
+        self._tag_names = []                            # Tag id -> tag as first seen
+        self._tag_postings_by_id = []                   # Tag id -> sorted array of ordinals with the tag
+        self._ordinal_ids = list(rows)
+        self._ordinals = {video_id: ordinal for ordinal, video_id in enumerate(self._ordinal_ids)}
+        self._live = bytearray(b"\x01") * len(rows)
+        self._flagged = bytearray(len(rows))
+        tag_ids, postings_by_id = self._tag_ids, self._tag_postings_by_id
+        for ordinal, (video_id, (title, tags)) in enumerate(rows.items()):
+            self._videos[video_id] = self._make_video(title, video_id, tags)
+            for tag in tags:                            # Ordinals ascend, so postings stay sorted
+                tag_id = tag_ids.get(tag.casefold())
+                if tag_id is None:
+                    tag_id = self._intern_tag(tag)
+                postings = postings_by_id[tag_id]
+                if not postings or postings[-1] != ordinal:
+                    postings.append(ordinal)
+        for video_id, flag_reason in flags.items():
+            self._videos[video_id].flag = flag_reason
+            self._flagged[self._ordinals[video_id]] = 1
+            self._index_flag(video_id, flag_reason)
+        self._build_completion_index()
+        self._build_title_buffer()
+        self._build_listing()
+        self._build_playable_pool()
+
+    def _make_video(self, title, video_id, tags):
+        """Creates the Video object stored for a catalog row."""
+        return Video(title, video_id, tags)
+
+    def _flagged_bits(self):
+        """Returns the bitmap of flagged ordinals."""
+        return _bitmap_of(self._flagged)
+
+    def _live_bits(self):
+        """Returns the bitmap of ordinals still in the library."""
+        return _bitmap_of(self._live)
+
+    def _stat_catalog(self):
+        """Returns the (mtime, size) pair used to detect catalog changes."""
+        stat = self._catalog_path.stat()
+        return stat.st_mtime_ns, stat.st_size
+
+    def _assign_ordinal(self, video_id):
+        """Gives a new video the next dense ordinal."""
+        ordinal = len(self._ordinal_ids)
+        self._ordinals[video_id] = ordinal
+        self._ordinal_ids.append(video_id)
+        self._flagged.append(0)
+        self._live.append(1)
+
+    def _release_ordinal(self, video_id):
+        """Retires the ordinal of a removed video; ordinals are never reused."""
+        ordinal = self._ordinals.pop(video_id)
+        self._ordinal_ids[ordinal] = None
+        self._live[ordinal] = 0
+        self._flagged[ordinal] = 0
+
+    def _index_flag(self, video_id, flag_reason):
+        """Adds a flagged video to the moderation index."""
+        self._flag_reasons.setdefault(flag_reason, {})[video_id] = None
+
+    def _unindex_flag(self, video_id, flag_reason):
+        """Removes a video from the moderation index, dropping empty reasons."""
+        video_ids = self._flag_reasons[flag_reason]
+        del video_ids[video_id]
+        if not video_ids:
+            del self._flag_reasons[flag_reason]
+
+    def _intern_tag(self, tag):
+        """Returns the interned id of a tag, creating it on first use."""
+        key = tag.casefold()
+        tag_id = self._tag_ids.get(key)
+        if tag_id is None:
+            tag_id = len(self._tag_names)
+            self._tag_ids[key] = tag_id
+            self._tag_names.append(tag)
+            self._tag_postings_by_id.append(array("I"))
+        return tag_id
+
+    def _index_tags(self, video):
+        """Adds the ordinal of a video to the postings of each of its tags.
+
+        New videos get the highest ordinal so this is an append; a retagged
+        video keeps its ordinal and is inserted in place.
+        """
+        ordinal = self._ordinals[video.video_id]
+        for tag_id in {self._intern_tag(tag) for tag in video.tags}:
+            postings = self._tag_postings_by_id[tag_id]
+            if not postings or postings[-1] < ordinal:
+                postings.append(ordinal)
+            else:
+                bisect.insort(postings, ordinal)
+
+    def _unindex_tags(self, video):
+        """Removes the ordinal of a video from the postings of each of its tags."""
+        ordinal = self._ordinals[video.video_id]
+        for tag_id in {self._tag_ids[tag.casefold()] for tag in video.tags}:
+            postings = self._tag_postings_by_id[tag_id]
+            del postings[bisect.bisect_left(postings, ordinal)]
+
+    def _tag_postings(self, tag):
+        """Returns the sorted ordinals of the videos with a tag, empty for unknown tags."""
+        tag_id = self._tag_ids.get(tag.casefold())
+        return () if tag_id is None else self._tag_postings_by_id[tag_id]
+
+    def _tag_bitmap(self, tag):
+        """Returns the bitmap of videos with a tag, built from its postings for a query."""
+        bits = bytearray(self.ordinal_count)
+        for ordinal in self._tag_postings(tag):
+            bits[ordinal] = 1
+        return _bitmap_of(bits)
+
+    def _videos_in_bitmap(self, bitmap):
+        """Returns the videos of the set ordinals of bitmap, in ordinal order."""
+        return [self._videos[self._ordinal_ids[ordinal]] for ordinal in _iter_bits(bitmap)]
+
+    def _build_completion_index(self):
+        """Builds the sorted prefix index over case-folded ids and titles.
+
+        Keys and video ids are kept in two parallel lists so a prefix lookup
+        is a single bisect on plain strings followed by a forward scan.
+        """
+        entries = []
+        for video in self._videos.values():
+            entries.append((video.video_id.casefold(), video.video_id))
+            entries.append((video.title.casefold(), video.video_id))
+        entries.sort()
+        self._completion_keys = [key for key, _ in entries]
+        self._completion_ids = [video_id for _, video_id in entries]
+
+    def _index_completion(self, video):
+        """Inserts the completion keys of one video."""
+        for key in (video.video_id.casefold(), video.title.casefold()):
+            index = bisect.bisect_left(self._completion_keys, key)
+            while (index < len(self._completion_keys)
+                   and self._completion_keys[index] == key
+                   and self._completion_ids[index] < video.video_id):
+                index += 1
+            self._completion_keys.insert(index, key)
+            self._completion_ids.insert(index, video.video_id)
+
+    def _unindex_completion(self, video):
+        """Removes the completion keys of one video."""
+        for key in (video.video_id.casefold(), video.title.casefold()):
+            index = bisect.bisect_left(self._completion_keys, key)
+            while self._completion_ids[index] != video.video_id:
+                index += 1
+            del self._completion_keys[index]
+            del self._completion_ids[index]
+
+    def _build_title_buffer(self):
+        """Packs every case-folded title into one separator-delimited string.
+
+        _title_offsets[i] is where the i-th title starts in the buffer, with
+        a trailing entry marking the end, and _title_ids[i] is its video id.
+        Titles added later go to the short _title_tail string that follows
+        the buffer; removed titles keep their slot with a None id until the
+        next rebuild.
+        """
+        videos = list(self._videos.values())
+        folded_titles = [video.title.casefold() for video in videos]
+        self._title_ids = [video.video_id for video in videos]
+        self._title_slots = {video_id: slot for slot, video_id in enumerate(self._title_ids)}
+        self._title_offsets = array("q")
+        position = 0
+        for title in folded_titles:
+            self._title_offsets.append(position)
+            position += len(title) + len(_TITLE_SEPARATOR)
+        self._title_offsets.append(position)
+        self._title_buffer = "".join(
+            title + _TITLE_SEPARATOR for title in folded_titles)
+        self._title_tail = ""
+        self._dead_titles = 0
+
+    def _index_title(self, video):
+        """Appends the title of one video to the tail of the title buffer."""
+        title = video.title.casefold() + _TITLE_SEPARATOR
+        self._title_slots[video.video_id] = len(self._title_ids)
+        self._title_ids.append(video.video_id)
+        self._title_tail += title
+        self._title_offsets.append(self._title_offsets[-1] + len(title))
+
+    def _unindex_title(self, video):
+        """Marks the title slot of one video as removed."""
+        self._title_ids[self._title_slots.pop(video.video_id)] = None
+        self._dead_titles += 1
+
+    def _compact_title_buffer(self):
+        """Rebuilds the title buffer once the tail or dead slots grow large.
+
+        Keeps the cost of incremental updates amortized: the rebuild is O(n)
+        but only happens after O(n) changes.
+        """
+        if (len(self._title_tail) > len(self._title_buffer) // 4 + 4096
+                or self._dead_titles > len(self._title_ids) // 2):
+            self._build_title_buffer()
+
+    def _build_listing(self):
+        """Builds the video ids sorted the way SHOW_ALL_VIDEOS lists them."""
+        entries = sorted((_listing_key(video), video.video_id)
+                         for video in self._videos.values())
+        self._listing_keys = [key for key, _ in entries]
+        self._listing_ids = [video_id for _, video_id in entries]
+
+    def _index_listing(self, video):
+        """Inserts one video into the sorted listing."""
+        index = bisect.bisect_left(self._listing_keys, _listing_key(video))
+        self._listing_keys.insert(index, _listing_key(video))
+        self._listing_ids.insert(index, video.video_id)
+
+    def _unindex_listing(self, video):
+        """Removes one video from the sorted listing."""
+        index = bisect.bisect_left(self._listing_keys, _listing_key(video))
+        del self._listing_keys[index]
+        del self._listing_ids[index]
+
+    def _build_playable_pool(self):
+        """Builds the pool of unflagged video ids used by random play.
+
+        _playable_slots maps each id to its position in _playable_ids so an
+        id can be removed in O(1) by swapping it with the last one.
+        """
+        playable = map(operator.gt, self._live, self._flagged)     # Live and not flagged
+        self._playable_ids = list(compress(self._ordinal_ids, playable))
+        self._playable_slots = dict(zip(self._playable_ids, range(len(self._playable_ids))))
+
+    def _add_playable(self, video_id):
+        """Adds one video id to the random-play pool."""
+        self._playable_slots[video_id] = len(self._playable_ids)
+        self._playable_ids.append(video_id)
+
+    def _discard_playable(self, video_id):
+        """Removes one video id from the random-play pool if present."""
+        slot = self._playable_slots.pop(video_id, None)
+        if slot is None:
+            return
+        last_id = self._playable_ids.pop()
+        if last_id != video_id:
+            self._playable_ids[slot] = last_id
+            self._playable_slots[last_id] = slot
+
+    def _add_video(self, video):
+        """Adds a video to the catalog and to every index."""
+        self._videos[video.video_id] = video
+        self._assign_ordinal(video.video_id)
+        self._index_tags(video)
+        self._index_completion(video)
+        self._index_title(video)
+        self._index_listing(video)
+        if not video.flag:
+            self._add_playable(video.video_id)
+
+    def _remove_video(self, video_id):
+        """Removes a video from the catalog and from every index."""
+        video = self._videos.pop(video_id)
+        if self._flagged[self._ordinals[video_id]]:
+            self._unindex_flag(video_id, video.flag)
+        self._unindex_tags(video)
+        self._release_ordinal(video_id)
+        self._unindex_completion(video)
+        self._unindex_title(video)
+        self._unindex_listing(video)
+        self._discard_playable(video_id)
+        return video
+
+    def _replace_video(self, video):
+        """Replaces a video keeping its position in the catalog and its flag."""
+        old_video = self._videos[video.video_id]
+        video.flag = old_video.flag
+        self._unindex_tags(old_video)
+        self._unindex_completion(old_video)
+        self._unindex_title(old_video)
+        self._unindex_listing(old_video)
+        self._videos[video.video_id] = video
+        self._index_tags(video)
+        self._index_completion(video)
+        self._index_title(video)
+        self._index_listing(video)
+
+    @property
+    def catalog_path(self) -> Path:
+        """Returns the path of the catalog file."""
+        return self._catalog_path
+
+    @property
+    def read_only(self) -> bool:
+        """Returns True if videos cannot be added, removed or retagged."""
+        return False
+
+    def save_columnar(self, path, compression="zlib"):
+        """Writes the library, flags included, as a columnar catalog.
+
+        Args:
+            path: The file to write.
+            compression: "zlib", "lzma" or "none".
+        """
+        write_columnar_catalog(path, (
+            (video.video_id, video.title, video.tags, video.flag)
+            for video in self._videos.values()), compression)
+
+    def poll_catalog(self):
+        """Reloads the catalog file if its mtime or size changed.
+
+        Only the rows that differ from the loaded catalog are applied: new
+        ids are added, missing ids removed and retitled or retagged videos
+        replaced, keeping their flags. Videos added, removed or retagged at
+        runtime are laid over the file rows first, so a reload keeps them.
+
+        A file that cannot be parsed, e.g. one saved while half written,
+        leaves the catalog as it is; it is read again once it changes.
+
+        Returns:
+            A CatalogDiff of the applied changes, or None if the file did
+            not change or could not be read.
+        """
+        try:
+            catalog_stat = self._stat_catalog()
+        except OSError:                                 # Mid-rewrite or removed: keep current catalog
+            return None
+        if catalog_stat in (self._catalog_stat, self._failed_stat):
+            return None
+        try:
+            rows, _ = _load_catalog(self._catalog_path, self._workers)
+        except (OSError, ValueError, csv.Error, CatalogFormatException):
+            self._failed_stat = catalog_stat            # Malformed: keep current catalog
+            return None
+        self._catalog_stat = catalog_stat
+        for video_id in self._removed:
+            rows.pop(video_id, None)
+        for video_id, tags in self._retagged.items():
+            if video_id in rows:
+                rows[video_id] = (rows[video_id][0], tags)
+        rows.update(self._added)
+
+        removed = [video_id for video_id in self._videos if video_id not in rows]
+        added, updated = [], []
+        for video_id, (title, tags) in rows.items():
+            video = self._videos.get(video_id)
+            if video is None:
+                added.append(video_id)
+            elif video.title != title or video.tags != tags:
+                updated.append(video_id)
+
+        removed_ordinals = [self._ordinals[video_id] for video_id in removed]
+        for video_id in removed:
+            self._remove_video(video_id)
+        for video_id in updated:
+            self._replace_video(Video(rows[video_id][0], video_id, rows[video_id][1]))
+        for video_id in added:
+            self._add_video(Video(rows[video_id][0], video_id, rows[video_id][1]))
+        self._compact_title_buffer()
+
+        diff = CatalogDiff(added, removed, updated, removed_ordinals)
+        if diff:
+            self._epoch += 1
+            self._record_change(removed_ordinals + [self._ordinals[video_id] for video_id in updated + added])
+        return diff
+
+    def add_video(self, video):
+        """Adds a new video to the library, updating every index.
+
+        Args:
+            video: The Video object to add. Its video_id must not exist yet.
+        """
+        self._add_video(video)
+        self._removed.discard(video.video_id)
+        self._added[video.video_id] = (video.title, video.tags)
+        self._compact_title_buffer()
+        self._epoch += 1
+        self._record_change([self._ordinals[video.video_id]])
+
+    def remove_video(self, video_id):
+        """Removes a video from the library, updating every index.
+
+        Args:
+            video_id: The id of an existing video.
+
+        Returns:
+            The removed Video object.
+        """
+        ordinal = self._ordinals[video_id]
+        video = self._remove_video(video_id)
+        if self._added.pop(video_id, None) is None:
+            self._removed.add(video_id)
+        self._retagged.pop(video_id, None)
+        self._compact_title_buffer()
+        self._epoch += 1
+        self._record_change([ordinal])
+        return video
+
+    def retag_video(self, video_id, tags):
+        """Replaces the tags of a video, keeping its title and flag.
+
+        Args:
+            video_id: The id of an existing video.
+            tags: The new tags of the video.
+
+        Returns:
+            The new Video object now stored under video_id.
+        """
+        old_video = self._videos[video_id]
+        video = Video(old_video.title, video_id, tags)
+        video.flag = old_video.flag
+        self._unindex_tags(old_video)                   # Title, id and ordinal are unchanged:
+        self._unindex_listing(old_video)                # only the tags and listing key move
+        self._videos[video_id] = video
+        self._index_tags(video)
+        self._index_listing(video)
+        if video_id in self._added:
+            self._added[video_id] = (video.title, video.tags)
+        else:
+            self._retagged[video_id] = video.tags
+        self._epoch += 1
+        self._record_change([self._ordinals[video_id]])
+        return video
+
+    def _record_change(self, ordinals):
+        """Advances the catalog version and logs the ordinals it changed."""
+        self._catalog_version += 1
+        self._changes.append((self._catalog_version, tuple(ordinals)))
+
+    def changed_ordinals(self, since_version):
+        """Returns the ordinals added, removed or changed after a catalog version.
+
+        Args:
+            since_version: A catalog_version seen earlier.
+
+        Returns:
+            A set of ordinals, or None if the changes since then are no
+            longer all logged and the caller must rebuild.
+        """
+        if since_version == self.catalog_version:
+            return set()
+        if not self._changes or self._changes[0][0] > since_version + 1:
+            return None
+        return {ordinal for version, ordinals in self._changes if version > since_version
+                for ordinal in ordinals}
+
+    @property
+    def epoch(self) -> int:
+        """Returns a counter that advances whenever flags or the catalog change."""
+        return self._epoch
+
+    @property
+    def catalog_version(self) -> int:
+        """Returns a counter that advances whenever videos are added, removed or changed."""
+        return self._catalog_version
+
+    @property
+    def ordinal_count(self) -> int:
+        """Returns the number of ordinals ever assigned, including removed ones."""
+        return len(self._ordinal_ids)
+
+    def iter_ordinal_tags(self):
+        """Yields (ordinal, interned tag ids) for every video, in ordinal order."""
+        for video_id in self._ordinal_ids:
+            if video_id is not None:
+                yield self._ordinals[video_id], self.tag_ids_of(self._ordinals[video_id])
+
+    def tag_ids_of(self, ordinal):
+        """Returns the interned tag ids of a video, empty once it was removed."""
+        video_id = self._ordinal_ids[ordinal]
+        if video_id is None:
+            return ()
+        return tuple(self._tag_ids[tag.casefold()] for tag in self._videos[video_id].tags)
+
+    def id_table(self):
+        """Returns every video id in ordinal order as one NUL-separated bytes.
+
+        Removed ordinals are kept as empty ids so positions line up.
+        """
+        if 0 not in self._live:                         # Nothing removed, join the ids as they are
+            return _TITLE_SEPARATOR.join(self._ordinal_ids).encode("utf-8")
+        return _TITLE_SEPARATOR.join(video_id or "" for video_id in self._ordinal_ids).encode("utf-8")
+
+    def map_id_table(self, id_table):
+        """Maps the positions of an id_table() to current ordinals.
+
+        Args:
+            id_table: An id_table() taken from this or another catalog.
+
+        Returns:
+            A list with, for each position of id_table, the current ordinal
+            of that video id, or None if it is not in the library.
+        """
+        return list(map(self._ordinals.get, id_table.decode("utf-8").split(_TITLE_SEPARATOR)))
+
+    def live_map(self):
+        """Returns one byte per ordinal, 1 while the video is in the library."""
+        return bytes(self._live)
+
+    def flagged_ordinals(self):
+        """Returns the ordinals of all flagged videos, in ordinal order."""
+        return list(compress(range(len(self._flagged)), self._flagged))
+
+    def restore_flags(self, flags):
+        """Replaces every flag of the library at once.
+
+        Only videos whose flag changes are touched, and the flag bytes, the
+        moderation index and the random-play pool are rebuilt once instead
+        of per video, with the per-ordinal passes done by map and compress.
+
+        Args:
+            flags: Iterable of (ordinal, flag_reason) pairs.
+        """
+        flags = dict(flags)
+        videos, ordinal_ids = self._videos, self._ordinal_ids
+        flagged = bytearray(len(ordinal_ids))
+        for ordinal in flags:
+            flagged[ordinal] = 1
+        cleared = map(operator.gt, self._flagged, flagged)         # Flagged before, not now
+        for video_id in compress(ordinal_ids, cleared):
+            videos[video_id].flag = None
+        video_ids = list(map(ordinal_ids.__getitem__, flags))
+        for video, flag_reason in zip(map(videos.__getitem__, video_ids), flags.values()):
+            if video.flag != flag_reason:
+                video.flag = flag_reason
+        flag_reasons = {}
+        for video_id, flag_reason in zip(video_ids, flags.values()):
+            flag_reasons.setdefault(flag_reason, {})[video_id] = None   # As _index_flag
+        self._flagged = flagged
+        self._flag_reasons = flag_reasons
+        self._build_playable_pool()
+        self._epoch += 1
+
+    def flag_video(self, video, flag_reason):
+        """Flags a video and advances the library epoch.
+
+        Args:
+            video: The Video object to flag.
+            flag_reason: The reason the video was flagged.
+        """
+        video.flag = flag_reason
+        self._flagged[self._ordinals[video.video_id]] = 1
+        self._index_flag(video.video_id, flag_reason)
+        self._discard_playable(video.video_id)
+        self._epoch += 1
+
+    def allow_video(self, video):
+        """Removes the flag from a video and advances the library epoch.
+
+        Args:
+            video: The Video object to allow again.
+        """
+        self._unflag(video)
+        self._epoch += 1
+
+    def _unflag(self, video):
+        """Clears the flag of a video in every index."""
+        self._unindex_flag(video.video_id, video.flag)
+        video.flag = None
+        self._flagged[self._ordinals[video.video_id]] = 0
+        if video.video_id not in self._playable_slots:
+            self._add_playable(video.video_id)
+
+    def allow_by_reason(self, flag_reason):
+        """Removes the flag from every video flagged with a reason.
+
+        Runs in time proportional to the number of videos allowed.
+
+        Args:
+            flag_reason: The exact flag reason.
+
+        Returns:
+            The list of allowed Video objects, in the order they were flagged.
+        """
+        videos = self.get_flagged_videos(flag_reason)
+        for video in videos:
+            self._unflag(video)
+        if videos:
+            self._epoch += 1
+        return videos
+
+    def get_flagged_videos(self, flag_reason):
+        """Returns the videos flagged with a reason, in the order they were flagged."""
+        return [self._videos[video_id] for video_id in self._flag_reasons.get(flag_reason, ())]
+
+    def flag_reason_counts(self):
+        """Returns a dict of flag reason -> number of videos flagged with it."""
+        return {flag_reason: len(video_ids) for flag_reason, video_ids in self._flag_reasons.items()}
 
     def get_all_videos(self):
         """Returns all available video information from the video library."""
@@ -43,3 +810,125 @@ class VideoLibrary:
             does not exist.
         """
         return self._videos.get(video_id, None)
+
+    def get_ordinal(self, video_id):
+        """Returns the dense int ordinal of a video.
+
+        Ordinals are assigned in load order, stay fixed while the video is in
+        the library and are never reused after it is removed.
+
+        Args:
+            video_id: The video url.
+
+        Returns:
+            The ordinal of the video, None if the video does not exist.
+        """
+        return self._ordinals.get(video_id, None)
+
+    def get_video_by_ordinal(self, ordinal):
+        """Returns the Video object with the given ordinal, None if removed."""
+        video_id = self._ordinal_ids[ordinal]
+        return None if video_id is None else self._videos[video_id]
+
+    def is_flagged_ordinal(self, ordinal):
+        """Returns True if the video with the given ordinal is flagged."""
+        return self._flagged[ordinal] != 0
+
+    def get_sorted_video_ids(self):
+        """Returns all video ids in listing order (by title, id and tags)."""
+        return list(self._listing_ids)
+
+    def random_playable_video(self):
+        """Returns a random unflagged video, or None if every video is flagged."""
+        if not self._playable_ids:
+            return None
+        return self._videos[random.choice(self._playable_ids)]
+
+    def complete(self, prefix, limit=10):
+        """Returns the ids of videos whose id or title starts with prefix.
+
+        Args:
+            prefix: The (case insensitive) start of a video id or title.
+            limit: The maximum number of video ids to return.
+
+        Returns:
+            A list of at most limit distinct video ids, ordered by the
+            matching key.
+        """
+        prefix = prefix.casefold()
+        keys = self._completion_keys
+        index = bisect.bisect_left(keys, prefix)
+        matches = []
+        while index < len(keys) and len(matches) < limit:
+            if not keys[index].startswith(prefix):
+                break
+            video_id = self._completion_ids[index]
+            if video_id not in matches:
+                matches.append(video_id)
+            index += 1
+        return matches
+
+    def search_titles(self, search_term):
+        """Returns the videos whose title contains search_term.
+
+        The whole catalog is scanned with str.find over the packed title
+        buffer and its tail; each hit is mapped back to its video with a
+        bisect on the title offsets and the scan resumes at the next title.
+        Titles rewritten into the tail are put back in place by ordinal.
+
+        Args:
+            search_term: The (case insensitive) query to look for.
+
+        Returns:
+            A list of matching Video objects, in library order.
+        """
+        term = search_term.casefold()
+        offsets = self._title_offsets
+        matches = []
+        base = 0
+        for buffer in (self._title_buffer, self._title_tail):
+            position = buffer.find(term)
+            while position != -1:
+                index = bisect.bisect_right(offsets, base + position) - 1
+                video_id = self._title_ids[index]
+                if video_id is not None:                # Skip removed titles
+                    matches.append(self._videos[video_id])
+                position = buffer.find(term, offsets[index + 1] - base)
+            base += len(buffer)
+        if self._title_tail and len(matches) > 1:       # Tail slots are not in ordinal order
+            ordinals = self._ordinals
+            matches.sort(key=lambda video: ordinals[video.video_id])
+        return matches
+
+    def search_tag(self, video_tag):
+        """Returns the unflagged videos with a tag (case insensitive).
+
+        Args:
+            video_tag: The tag to look for.
+
+        Returns:
+            A list of matching Video objects, in library order.
+        """
+        flagged = self._flagged
+        return [self.get_video_by_ordinal(ordinal) for ordinal in self._tag_postings(video_tag)
+                if not flagged[ordinal]]
+
+    def search_tag_query(self, query):
+        """Returns the unflagged videos matching an AND/OR/NOT tag expression.
+
+        Tags are stored as sorted ordinal postings; each tag of the query is
+        turned into a bitmap over video ordinals, so the expression is
+        evaluated with bitwise operations and flagged videos are removed
+        with one more AND.
+
+        Args:
+            query: The expression, e.g. "#cat AND NOT #dog".
+
+        Returns:
+            A list of matching Video objects, in library order.
+
+        Raises:
+            TagQueryException: If the expression cannot be parsed.
+        """
+        bitmap = evaluate_tag_query(query, self._tag_bitmap, self._live_bits())
+        return self._videos_in_bitmap(bitmap & ~self._flagged_bits())
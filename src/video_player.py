@@ -1,6 +1,26 @@
 """A video player class."""
 
-import random
+from array import array
+import time
+from . import play_history
+from . import player_result
+from . import player_state
+from .play_history import PlayHistory
+from .duplicate_finder import DuplicateFinder
+from .playback_clock import DEFAULT_VIDEO_DURATION
+from .playback_clock import PlaybackClock
+from .playback_clock import PlaybackPosition
+from .playback_clock import format_position
+from .playback_queue import PlaybackQueue
+from .playlist_names import PlaylistNames
+from .player_result import Result
+from .recommender import Recommender
+from .search_cache import SearchCache
+from .tag_query import TagQueryException
+from .trending import DEFAULT_DELTA
+from .trending import DEFAULT_EPSILON
+from .trending import HeavyHitters
+from .video import Video
 from .video_library import VideoLibrary
 from .video_playlist import Playlist
 
@@ -8,12 +28,40 @@ from .video_playlist import Playlist
 class VideoPlayer:
     """A class used to represent a Video Player."""
 
-    def __init__(self):
-        """Video Player Constructor"""
-        self._video_library = VideoLibrary()
+    def __init__(self, search_cache_size=256, catalog_path=None, history_size=1000,
+                 video_library=None, playback_clock=None,
+                 trending_epsilon=DEFAULT_EPSILON, trending_delta=DEFAULT_DELTA):
+        """Video Player Constructor
+
+        TRENDING and TOP_SEARCHES counts overestimate by at most
+        trending_epsilon * total plays (or searches), except with
+        probability trending_delta.
+        """
+        self._video_library = video_library or VideoLibrary(catalog_path)
         self._video_playing = False
         self._video_paused = False
         self._user_playlists = {}
+        self._playlist_names = PlaylistNames()                              # Sorted, case insensitive
+        self._playlists_version = 0                                         # Advances on create/delete/load
+        self._search_cache = SearchCache(search_cache_size)
+        self._queue = None
+        self._history = PlayHistory(history_size)
+        self._recommender = None
+        self._duplicate_finder = None
+        self._trending = HeavyHitters(epsilon=trending_epsilon, delta=trending_delta)      # Plays by video id
+        self._top_searches = HeavyHitters(epsilon=trending_epsilon, delta=trending_delta)  # Searches by term
+        self._clock = playback_clock or PlaybackClock()                     # May be shared by many players
+        self._position = None                                               # PlaybackPosition of playing video
+        self._end_timer = None                                              # Clock handle of its end event
+        self.video_duration = DEFAULT_VIDEO_DURATION                        # Seconds, the catalog has none
+        self.response_reader = None                                         # Callable answering search prompts
+        self.renderer = player_result.render_text                           # Callable given every Result, or None
+        self.playlist_page_size = 50                                        # Names per SHOW_ALL_PLAYLISTS page
+
+    @property
+    def video_library(self):
+        """Returns the VideoLibrary the player plays from"""
+        return self._video_library
 
     @property
     def all_videos(self):
@@ -28,41 +76,65 @@ class VideoPlayer:
         """Returns the user playlists stored -> List"""
         return self._user_playlists
 
+    def get_sorted_playlist_names(self, prefix=""):
+        """Returns the playlist names starting with prefix, sorted -> List"""
+        return self._playlist_names.names(prefix)
+
+    def get_playlist_video_ids(self, playlist):
+        """Returns the video ids of a Playlist, in playlist order -> List"""
+        return [self._video_library.get_video_by_ordinal(ordinal).video_id
+                for ordinal in playlist.get_all_ordinals]
+
+    @property
+    def playlists_version(self) -> int:
+        """Returns a counter that advances whenever playlists are created or deleted"""
+        return self._playlists_version
+
     def get_user_playlists_len(self):
         """Returns length of All User Playlists -> int"""
         return len(self._user_playlists)
 
     def get_playlist(self, playlist_name):
         """Returns Playlist with specifc name or None"""
-        for playlistName in self._user_playlists:
-            if playlistName.upper() == playlist_name.upper():
-                return self._user_playlists[playlistName]
-        return None
+        name = self._playlist_names.get(playlist_name)                      # Bisect, case insensitive
+        return None if name is None else self._user_playlists[name]
 
     def remove_playlist(self, playlist_name):
         """Removes Playlist with specific name if exists"""
-        playlist_id_to_remove = None
-        for playlistName in self._user_playlists:
-            if playlistName.upper() == playlist_name.upper():
-                playlist_id_to_remove = playlistName
-        self._user_playlists.pop(playlist_id_to_remove)
+        name = self._playlist_names.remove(playlist_name)
+        if name is not None:
+            self._user_playlists.pop(name)
+            self._playlists_version += 1
+
+    def emit(self, operation, status, text=(), videos=(), playlist=None, rows=()):
+        """Builds the Result of an operation, renders it and returns it
+
+        Args: see player_result.Result.
+        """
+        result = Result(operation, status, text, videos, playlist, rows)
+        if self.renderer:
+            self.renderer(result)
+        return result
 
     def number_of_videos(self):
-        """Prints number of videos in Library"""
+        """Reports number of videos in Library"""
         num_videos = len(self._video_library.get_all_videos())
-        print(f"{num_videos} videos in the library")
+        return self.emit("number_of_videos", player_result.OK, f"{num_videos} videos in the library",
+                         rows=[num_videos])
 
     # ------
     # PART 1
     # ------
 
     def show_all_videos(self):
-        """PRINT all videos"""
-        all_videos = self.all_videos                                        # Get all videos
-        videos_resulting_array = self.videos_to_string_array(all_videos)    # Array to store resulting strings
+        """Lists all videos"""
+        videos = [self.get_video(video_id)                                  # Library keeps ids
+                  for video_id in self._video_library.get_sorted_video_ids()]   # in listing order
 
-        print("Here's a list of all available videos:")                     # Print Header
-        print('\n'.join(map(str, videos_resulting_array)))                  # Join and Print all videos
+        return self.emit("show_all_videos", player_result.OK,
+                         lambda: ["Here's a list of all available videos:",   # Header
+                                  '\n'.join(map(self.get_video_to_string, videos))],
+                         rows=videos)
 
     def play_video(self, video_id):
         """Plays the respective video.
@@ -71,56 +143,54 @@ class VideoPlayer:
             video_id: The video_id to be played.
         """
 
-        def play_video_logic():
-            """Stop & put on Pause any currently playing video, then play current video """
-            if self._video_playing:
-                self.stop_video()
-                self._video_paused = False
-            print(f"Playing video: {video.title}")                          # PRINT: Play video
-            self._video_playing = video                                     # Add video to currently playing video
-
         video = self.get_video(video_id)                                    # Get Video with given id
 
         if video:                                                           # Check if video exists
             if video.flag:                                                  # Check if video has flag
-                print(f"Cannot play video: Video is currently flagged (reason: {video.flag})")
-            else:
-                play_video_logic()
-        else:                                                               # Video doesnt exist
-            print("Cannot play video: Video does not exist")
+                return self.emit("play_video", player_result.FLAGGED,
+                                 f"Cannot play video: Video is currently flagged (reason: {video.flag})", [video])
+            return self.start_video(video)
+        return self.emit("play_video", player_result.NOT_FOUND,        # Video doesnt exist
+                         "Cannot play video: Video does not exist")
+
+    def start_video(self, video):
+        """Stop & put on Pause any currently playing video, then play given video
+
+        Args: video - Video instance already checked to be playable.
+        """
+        if self._video_playing:
+            self.stop_video()
+            self._video_paused = False
+        result = self.emit("play_video", player_result.OK, f"Playing video: {video.title}", [video])
+        self._video_playing = video                                         # Add video to currently playing video
+        self.start_position()
+        self.record_history(play_history.PLAY, video)
+        self._trending.add(video.video_id)
+        return result
 
     def stop_video(self):
         """Stops the current video."""
         if self._video_playing:                                             # Check if video is playing
-            print(f"Stopping video: {self._video_playing.title}")           # PRINT: Stop video
+            video = self._video_playing
+            result = self.emit("stop_video", player_result.OK, f"Stopping video: {video.title}", [video])
+            self.record_history(play_history.STOP, video)
             self._video_playing = False                                     # Remove video from currently playing video
-        else:                                                               # No video playing
-            print("Cannot stop video: No video is currently playing")       # PRINT: error msg
+            self.clear_position()
+            return result
+        return self.emit("stop_video", player_result.INVALID_STATE,     # No video playing
+                         "Cannot stop video: No video is currently playing")
 
     def play_random_video(self):
         """Plays a random video from the video library."""
 
-        def random_video_logic():
-            """Gets a random video without any flags"""
-            _all_videos = self.all_videos                                   # Store all videos
-            _random_video = random.choice(_all_videos)                      # Get a random video
-
-            while _random_video.flag:                                       # Loop while video has flag
-                if len(_all_videos) > 1:
-                    _all_videos = self.remove_video(_random_video, _all_videos)     # Remove last video from list
-                    _random_video = random.choice(_all_videos)                      # Get new random video from updated list
-                break
-            return _random_video
-
         if self._video_playing:                                             # Check if video currently playing
             self.stop_video()                                               # Stop video
 
-        random_video = random_video_logic()                                 # Get random Video
+        random_video = self._video_library.random_playable_video()          # Random pick among unflagged videos
 
-        if random_video.flag:                                               # Check if video has flag
-            print("No videos available")
-        else:
-            self.play_video(random_video.video_id)                          # Play video
+        if not random_video:                                                # Every video has a flag
+            return self.emit("play_random_video", player_result.EMPTY, "No videos available")
+        return self.play_video(random_video.video_id)                       # Play video
 
     def remove_video(self, video, video_list):
         """Remove video from given list if present
@@ -138,36 +208,49 @@ class VideoPlayer:
 
     def pause_video(self):
         """Pauses the current video."""
-        if self._video_playing:                                             # Check if video playing exists
+        video = self._video_playing
+        if video:                                                           # Check if video playing exists
             if self._video_paused:                                          # Check if video paused
-                print(f"Video already paused: {self._video_playing.title}") # Err - already paused
-            else:                                                       # Video not paused
-                print(f"Pausing video: {self._video_playing.title}")        # Print Pausing msg
-                self._video_paused = True                                   # Update paused status
-        else:                                                           # Err - no video playing
-            print("Cannot pause video: No video is currently playing")
+                return self.emit("pause_video", player_result.CONFLICT,     # Err - already paused
+                                 f"Video already paused: {video.title}", [video])
+            result = self.emit("pause_video", player_result.OK, f"Pausing video: {video.title}", [video])
+            self.record_history(play_history.PAUSE, video)
+            self._video_paused = True                                       # Update paused status
+            self._position.pause(self._clock.now())                         # Freeze position, no end event
+            self.schedule_end()
+            return result
+        return self.emit("pause_video", player_result.INVALID_STATE,    # Err - no video playing
+                         "Cannot pause video: No video is currently playing")
 
     def continue_video(self):
         """Resumes playing the current video."""
-        if self._video_playing:                                             # Check if video playing exists
+        video = self._video_playing
+        if video:                                                           # Check if video playing exists
             if self._video_paused:                                          # Check if video paused
-                print(f"Continuing video: {self._video_playing.title}")     # Play video
+                result = self.emit("continue_video", player_result.OK, f"Continuing video: {video.title}", [video])
+                self.record_history(play_history.CONTINUE, video)
                 self._video_paused = False                                  # Update paused status
-            else:                                                       # If not paused
-                print("Cannot continue video: Video is not paused")         # Err - Video not paused
-        else:                                                           # Video not playing
-            print("Cannot continue video: No video is currently playing")   # Err - not playing
+                self._position.resume(self._clock.now())
+                self.schedule_end()
+                return result
+            return self.emit("continue_video", player_result.INVALID_STATE,  # Err - Video not paused
+                             "Cannot continue video: Video is not paused", [video])
+        return self.emit("continue_video", player_result.INVALID_STATE,  # Err - not playing
+                         "Cannot continue video: No video is currently playing")
 
     def show_playing(self):
         """Displays video currently playing."""
         if self._video_playing:                                             # Check if video playing exists
             current_video = self._video_playing                             # Store current video
-            status_string = f"Currently playing: {self.string_video_detail(current_video)}"     # Create status string
-            if self._video_paused:                                          # Add prefix if video paused
-                status_string += " - PAUSED"
-            print(status_string)                                            # PRINT: Video paused
-        else:                                                           # Video doesnt exist
-            print("No video is currently playing")                          # Err - no video
+            paused = self._video_paused
+            position, duration = self._position.position(self._clock.now()), self._position.duration
+            return self.emit("show_playing", player_result.OK,
+                             lambda: f"Currently playing: {self.string_video_detail(current_video)}"
+                                     + (" - PAUSED" if paused else "")     # Suffix if video paused
+                                     + f" - {format_position(position)} / {format_position(duration)}",
+                             [current_video], rows=[(current_video, paused, position, duration)])
+        return self.emit("show_playing", player_result.EMPTY,           # Err - no video
+                         "No video is currently playing")
 
     # ------
     # PART 2
@@ -180,10 +263,14 @@ class VideoPlayer:
             playlist_name: The playlist name.
         """
         if self.check_playlist_exists(playlist_name):                       # Check playlist with same name exists
-            print("Cannot create playlist: A playlist with the same name already exists")
-        else:
-            self._user_playlists[playlist_name] = Playlist(playlist_name)   # Add playlist to List
-            print(f"Successfully created new playlist: {playlist_name}")    # Print: Playlist added
+            return self.emit("create_playlist", player_result.CONFLICT,
+                             "Cannot create playlist: A playlist with the same name already exists",
+                             playlist=playlist_name)
+        self._user_playlists[playlist_name] = Playlist(playlist_name)       # Add playlist to List
+        self._playlist_names.add(playlist_name)                             # and to the sorted names
+        self._playlists_version += 1
+        return self.emit("create_playlist", player_result.OK,
+                         f"Successfully created new playlist: {playlist_name}", playlist=playlist_name)
 
     def add_to_playlist(self, playlist_name, video_id):
         """Adds a video to a playlist with a given name.
@@ -195,33 +282,55 @@ class VideoPlayer:
         current_video = self.get_video(video_id)                                            # Store current video
         current_playlist = self.get_playlist(playlist_name)                                 # & playlist
 
-        if current_playlist:                                                                # Check playlist exists
-            if current_video:                                                               # Check video exists
-                if current_video.flag:                                                      # Check if video has flag
-                    print(f"Cannot add video to {playlist_name}: Video is currently flagged (reason: {current_video.flag})")
-                else:                                                                   # Video not flagged
-                    if current_playlist.check_video_in_playlist(current_video.video_id):    # Check if video in playlist
-                        print(f"Cannot add video to {playlist_name}: Video already added")
-                    else:                                                               # Video not in Playlist
-                        current_playlist.add_video(current_video.video_id)                  # Add video to playlist
-                        print(f"Added video to {playlist_name}: {current_video.title}")
-            else:                                                                       # Video doesnt exist
-                print(f"Cannot add video to {playlist_name}: Video does not exist")         # Err - video doesnt exist
-        else:                                                                           # Playlist doesnt exist
-            print(f"Cannot add video to {playlist_name}: Playlist does not exist")          # Err- no playlist
-
-    def show_all_playlists(self):
-        """Display all playlists."""
-        if len(self._user_playlists) == 0:                                  # EXIT if no playlist in list
-            print("No playlists exist yet")
-        else:                                                           # Playlists present
-            print("Showing all playlists:")                                 # Print header
-            all_playlists_names = []
-            for playlist in self._user_playlists:                           # Append playlist names
-                all_playlists_names.append(playlist)
+        if not current_playlist:                                                            # Playlist doesnt exist
+            return self.emit("add_to_playlist", player_result.NOT_FOUND,
+                             f"Cannot add video to {playlist_name}: Playlist does not exist")
+        if not current_video:                                                               # Video doesnt exist
+            return self.emit("add_to_playlist", player_result.NOT_FOUND,
+                             f"Cannot add video to {playlist_name}: Video does not exist",
+                             playlist=current_playlist.title)
+        if current_video.flag:                                                              # Check if video has flag
+            return self.emit("add_to_playlist", player_result.FLAGGED,
+                             f"Cannot add video to {playlist_name}: Video is currently flagged "
+                             f"(reason: {current_video.flag})", [current_video], current_playlist.title)
+        ordinal = self._video_library.get_ordinal(current_video.video_id)
+        if current_playlist.check_video_in_playlist(ordinal):                               # Check if video in playlist
+            return self.emit("add_to_playlist", player_result.CONFLICT,
+                             f"Cannot add video to {playlist_name}: Video already added",
+                             [current_video], current_playlist.title)
+        current_playlist.add_video(ordinal)                                                 # Add video to playlist
+        return self.emit("add_to_playlist", player_result.OK,
+                         f"Added video to {playlist_name}: {current_video.title}",
+                         [current_video], current_playlist.title)
+
+    def show_all_playlists(self, prefix="", page=None):
+        """Display all playlists, or those whose name starts with prefix.
 
-            all_playlists_names.sort()                                      # Sort in alphabetic order
-            print('\n'.join(map(str, all_playlists_names)))                 # Print resulting array of playlist names
+        Args:
+            prefix: The (case insensitive) start of the playlist names.
+            page: The page of playlist_page_size names to show, from 1;
+                all names by default.
+        """
+        if len(self._user_playlists) == 0:                                  # EXIT if no playlist in list
+            return self.emit("show_all_playlists", player_result.EMPTY, "No playlists exist yet")
+        count = self._playlist_names.count(prefix)                          # Names are kept sorted
+        if count == 0:                                                      # EXIT if no name matches
+            return self.emit("show_all_playlists", player_result.EMPTY, f"No playlists start with {prefix}")
+        header = f"Showing playlists starting with {prefix}" if prefix else "Showing all playlists"
+        if page is None:
+            names = self._playlist_names.names(prefix)
+        else:
+            pages = -(-count // self.playlist_page_size)
+            if not 1 <= page <= pages:                                      # EXIT if page out of range
+                return self.emit("show_all_playlists", player_result.INVALID_ARGUMENT,
+                                 f"Cannot show page {page}: There are {pages} pages")
+            names = self._playlist_names.names(prefix, (page - 1) * self.playlist_page_size,
+                                               self.playlist_page_size)
+            header += f" (page {page} of {pages})"
+        return self.emit("show_all_playlists", player_result.OK,
+                         lambda: [header + ":",                             # Header
+                                  '\n'.join(names)],
+                         rows=names)
 
     def show_playlist(self, playlist_name):
         """Display all videos in a playlist with a given name.
@@ -230,20 +339,22 @@ class VideoPlayer:
             playlist_name: The playlist name.
         """
         if len(self._user_playlists) == 0:                                              # Exit if no playlist in list
-            print(f"Cannot show playlist {playlist_name}: Playlist does not exist yet")
-        else:                                                                       # Playlists present
-            print(f"Showing playlist: {playlist_name}")                                 # Print header
-            playlist = self.get_playlist(playlist_name)
-            all_video_ids = playlist.get_all_video_ids                                  # Get all video ids
-            if len(all_video_ids) == 0:                                                 # If result empty, print Err
-                print("No videos here yet")
-            else:
-                for video_id in all_video_ids:                                          # Loop through resulting array
-                    current_video = self._video_library.get_video(video_id)
-                    video_to_string = self.string_video_detail(current_video)           # Generic video to string
-                    if current_video.flag:                                              # Check for flag
-                        video_to_string += f" - FLAGGED (reason: {current_video.flag})"
-                    print(video_to_string)
+            return self.emit("show_playlist", player_result.NOT_FOUND,
+                             f"Cannot show playlist {playlist_name}: Playlist does not exist yet")
+        playlist = self.get_playlist(playlist_name)
+        if not playlist:                                                                # Playlist doesnt exist
+            return self.emit("show_playlist", player_result.NOT_FOUND,
+                             f"Cannot show playlist {playlist_name}: Playlist does not exist")
+        videos = [self._video_library.get_video_by_ordinal(ordinal)                     # Get all videos
+                  for ordinal in playlist.get_all_ordinals]
+        if len(videos) == 0:                                                            # If result empty, print Err
+            return self.emit("show_playlist", player_result.OK,
+                             [f"Showing playlist: {playlist_name}", "No videos here yet"],
+                             playlist=playlist.title)
+        return self.emit("show_playlist", player_result.OK,
+                         lambda: [f"Showing playlist: {playlist_name}"]                 # Header, then videos
+                                 + list(map(self.get_video_to_string, videos)),         # with their flags
+                         playlist=playlist.title, rows=videos)
 
     def remove_from_playlist(self, playlist_name, video_id):
         """Removes a video to a playlist with a given name.
@@ -252,23 +363,24 @@ class VideoPlayer:
             playlist_name: The playlist name.
             video_id: The video_id to be removed.
         """
-        if len(self._user_playlists) == 0:                                              # Exit if no playlist in list
-            print(f"Cannot remove video from {playlist_name}: Playlist does not exist")
-        else:                                                                           # Playlists present
-            current_video = self.get_video(video_id)
-            current_playlist = self.get_playlist(playlist_name)
-
-            if current_playlist:                                                        # Check playlist exists
-                if current_video:                                                       # Check video exists
-                    if current_playlist.check_video_in_playlist(current_video.video_id):    # Check if video in playlist
-                        print(f"Removed video from {playlist_name}: {current_video.title}") # Remove vid from playlist
-                        current_playlist.remove_video_from_playlist(video_id)
-                    else:                                                               # Video not in playlist
-                        print(f"Cannot remove video from {playlist_name}: Video is not in playlist")
-                else:                                                                   # Video doesnt exist
-                    print(f"Cannot remove video from {playlist_name}: Video does not exist")
-            else:                                                                       # Playlist doesnt exist
-                print(f"Cannot remove video from {playlist_name}: Playlist does not exist")
+        current_playlist = self.get_playlist(playlist_name)
+        if not current_playlist:                                                        # Playlist doesnt exist
+            return self.emit("remove_from_playlist", player_result.NOT_FOUND,
+                             f"Cannot remove video from {playlist_name}: Playlist does not exist")
+        current_video = self.get_video(video_id)
+        if not current_video:                                                           # Video doesnt exist
+            return self.emit("remove_from_playlist", player_result.NOT_FOUND,
+                             f"Cannot remove video from {playlist_name}: Video does not exist",
+                             playlist=current_playlist.title)
+        ordinal = self._video_library.get_ordinal(current_video.video_id)
+        if not current_playlist.check_video_in_playlist(ordinal):                       # Video not in playlist
+            return self.emit("remove_from_playlist", player_result.NOT_FOUND,
+                             f"Cannot remove video from {playlist_name}: Video is not in playlist",
+                             [current_video], current_playlist.title)
+        current_playlist.remove_video_from_playlist(ordinal)                            # Remove vid from playlist
+        return self.emit("remove_from_playlist", player_result.OK,
+                         f"Removed video from {playlist_name}: {current_video.title}",
+                         [current_video], current_playlist.title)
 
     def clear_playlist(self, playlist_name):
         """Removes all videos from a playlist with a given name.
@@ -276,15 +388,13 @@ class VideoPlayer:
         Args:
             playlist_name: The playlist name.
         """
-        if len(self._user_playlists) == 0:                                              # Exit if no playlist in list
-            print(f"Cannot clear playlist {playlist_name}: Playlist does not exist")
-        else:                                                                           # Playlists present
-            current_playlist = self.get_playlist(playlist_name)
-            if current_playlist:                                                        # Check if playlist exists
-                current_playlist.remove_all_videos()                                    # Empty out playlist
-                print(f"Successfully removed all videos from {playlist_name}")
-            else:                                                                       # Playlist doesnt exist
-                print(f"Cannot clear playlist {playlist_name}: Playlist does not exist")
+        current_playlist = self.get_playlist(playlist_name)
+        if not current_playlist:                                                        # Playlist doesnt exist
+            return self.emit("clear_playlist", player_result.NOT_FOUND,
+                             f"Cannot clear playlist {playlist_name}: Playlist does not exist")
+        current_playlist.remove_all_videos()                                            # Empty out playlist
+        return self.emit("clear_playlist", player_result.OK,
+                         f"Successfully removed all videos from {playlist_name}", playlist=current_playlist.title)
 
     def delete_playlist(self, playlist_name):
         """Deletes a playlist with a given name.
@@ -293,12 +403,16 @@ class VideoPlayer:
             playlist_name: The playlist name.
         """
         if len(self._user_playlists) == 0:                                              # Exit if no playlist in list
-            print(f"Cannot delete playlist {playlist_name}: Playlist does not exist")
-        else:                                                                           # Playlist present
-            current_playlist = self.get_playlist(playlist_name)
-            if current_playlist:                                                        # Check if playlist exists
-                self.remove_playlist(playlist_name)                                     # Remove playlist
-                print(f"Deleted playlist: {playlist_name}")
+            return self.emit("delete_playlist", player_result.NOT_FOUND,
+                             f"Cannot delete playlist {playlist_name}: Playlist does not exist")
+        current_playlist = self.get_playlist(playlist_name)
+        if not current_playlist:                                                        # Nothing to delete
+            return self.emit("delete_playlist", player_result.NOT_FOUND)
+        if self._queue and self._queue.playlist is current_playlist:                    # Stop queueing from it
+            self._queue = None
+        self.remove_playlist(playlist_name)                                             # Remove playlist
+        return self.emit("delete_playlist", player_result.OK,
+                         f"Deleted playlist: {playlist_name}", playlist=current_playlist.title)
 
     # ------
     # PART 3
@@ -310,44 +424,59 @@ class VideoPlayer:
         Args:
             search_term: The query to be used in search.
         """
-        all_videos = self.all_videos                                            # Get all videos
-        search_match_videos = []                                                # Array to store matching videos
+        def find_matches():
+            """Scan packed title buffer, then drop flagged videos"""
+            return [video for video in self._video_library.search_titles(search_term)
+                    if not video.flag]
 
-        for video in all_videos:                                                # Loop through videos
-            if self.search_term_in_video_title(search_term, video):             # Check for search term in title
-                search_match_videos.append(video)                                   # Append to array
+        search_match_videos = self.cached_search("title", search_term, find_matches)
+        self.count_search(search_term)
 
         if len(search_match_videos) == 0:                                       # No matches, Err
-            print(f"No search results for {search_term}")
-        else:                                                                   # Matches - apply logic
-            self.search_results_logic(search_term, search_match_videos)
+            return self.emit("search_videos", player_result.EMPTY, f"No search results for {search_term}")
+        return self.search_results_logic("search_videos", search_term, search_match_videos)
 
-    def search_results_logic(self, search_term, resulting_videos):
+    def search_results_logic(self, operation, search_term, resulting_videos, playlist=None):
         """Logic for results of searching word in title
 
-            Args: search_term: user provide search term.
+            Args: operation: name of the search operation, for the Result.
+            search_term: user provide search term.
             resulting_videos: all videos that match search term.
+            playlist: name of the playlist searched, if any.
         """
 
-        def print_search_results():
-            """Print all results with Header/Footer """
-            print(f"Here are the results for {search_term}:")                       # Print Header
-            for index, match_video in enumerate(resulting_videos):                  # Loop through matches & Print line
-                print(f"{index + 1}) {self.string_video_detail(match_video)}")
-            print("Would you like to play any of the above? If yes, specify the number of the video.")  # Print Footer
-            print("If your answer is not a valid number, we will assume it's a no.")
+        def search_results_text():
+            """All results with Header/Footer """
+            lines = [f"Here are the results for {search_term}:"]                    # Header
+            for index, match_video in enumerate(resulting_videos):                  # Loop through matches
+                lines.append(f"{index + 1}) {self.string_video_detail(match_video)}")
+            lines.append("Would you like to play any of the above? If yes, specify the number of the video.")
+            lines.append("If your answer is not a valid number, we will assume it's a no.")     # Footer
+            return lines
 
         def user_response_logic():
             """Deal with user response"""
             try:                                                # Check if input is int (ignore if not)
-                user_response = int(input()) - 1                     # Array index starts at 0, user input starts at 1
+                user_response = int(self.read_response()) - 1        # Array index starts at 0, user input starts at 1
                 if user_response < len(resulting_videos):            # Check if value less than length of response array
                     self.play_video(resulting_videos[user_response].video_id)       # Play corresponding video
             except ValueError:
                 pass
 
-        print_search_results()                                      # Print search results
+        result = self.emit(operation, player_result.OK, search_results_text,
+                           playlist=playlist, rows=resulting_videos)
         user_response_logic()                                       # Deal with user response
+        return result
+
+    def read_response(self):
+        """Reads the answer to a search prompt, from response_reader or stdin
+
+        Without response_reader, stdin is only read when the prompt was
+        printed as text; other renderers decline the prompt.
+        """
+        if self.response_reader:
+            return self.response_reader()
+        return input() if self.renderer is player_result.render_text else ""
 
     def search_videos_tag(self, video_tag):
         """Display all videos whose tags contains the provided tag.
@@ -355,17 +484,116 @@ class VideoPlayer:
         Args:
             video_tag: The video tag to be used in search.
         """
-        all_videos = self.all_videos                                # Get all videos
-        search_match_videos = []                                    # Array to store matching videos
+        def find_matches():
+            """Read the tag bitmap, minus flagged videos"""
+            return self._video_library.search_tag(video_tag)
 
-        for video in all_videos:                                    # Loop through videos
-            if self.search_tag_in_video(video_tag, video):          # Check if tags match
-                search_match_videos.append(video)                   # Append to array
+        search_match_videos = self.cached_search("tag", video_tag, find_matches)
+        self.count_search(video_tag)
 
         if len(search_match_videos) == 0:                           # Exit if no matches found
-            print(f"No search results for {video_tag}")
-        else:                                                       # Match found
-            self.search_results_logic(video_tag, search_match_videos)   # Apply Search results logic
+            return self.emit("search_videos_tag", player_result.EMPTY, f"No search results for {video_tag}")
+        return self.search_results_logic("search_videos_tag", video_tag, search_match_videos)
+
+    def search_tags(self, tag_query):
+        """Display all videos matching an AND/OR/NOT tag expression.
+
+        Args:
+            tag_query: The expression, e.g. "#cat AND NOT #dog".
+        """
+        try:
+            search_match_videos = self.cached_search(
+                "tags", " ".join(tag_query.split()),
+                lambda: self._video_library.search_tag_query(tag_query))
+        except TagQueryException as e:                              # Malformed expression, Err
+            return self.emit("search_tags", player_result.INVALID_ARGUMENT, f"Cannot search tags: {e}")
+        self.count_search(tag_query)                                # Only queries that parsed
+
+        if len(search_match_videos) == 0:                           # Exit if no matches found
+            return self.emit("search_tags", player_result.EMPTY, f"No search results for {tag_query}")
+        return self.search_results_logic("search_tags", tag_query, search_match_videos)
+
+    def search_playlist(self, playlist_name, search_term):
+        """Display the videos of a playlist whose titles contain the search_term.
+
+        Args:
+            playlist_name: The playlist name.
+            search_term: The query to be used in search.
+        """
+        return self.search_in_playlist("search_playlist", playlist_name, search_term,
+                                       lambda: self.cached_search("title", search_term, lambda: [
+                                           video for video in self._video_library.search_titles(search_term)
+                                           if not video.flag]))
+
+    def search_playlist_tag(self, playlist_name, video_tag):
+        """Display the videos of a playlist whose tags contain the provided tag.
+
+        Args:
+            playlist_name: The playlist name.
+            video_tag: The video tag to be used in search.
+        """
+        return self.search_in_playlist("search_playlist_tag", playlist_name, video_tag,
+                                       lambda: self.cached_search("tag", video_tag, lambda:
+                                                                  self._video_library.search_tag(video_tag)))
+
+    def search_in_playlist(self, operation, playlist_name, search_term, find_matches):
+        """Logic for searching inside one playlist
+
+        The global title or tag index answers the search and each match is
+        then looked up in the playlist's sorted ordinals, so the cost grows
+        with the number of matches rather than with the playlist length.
+
+            Args: operation: name of the search operation, for the Result.
+            playlist_name: The playlist name.
+            search_term: user provide search term or tag.
+            find_matches: callable returning the unflagged library matches.
+        """
+        playlist = self.get_playlist(playlist_name)
+        if not playlist:                                                # Playlist doesnt exist
+            return self.emit(operation, player_result.NOT_FOUND,
+                             f"Cannot search playlist {playlist_name}: Playlist does not exist")
+        get_ordinal = self._video_library.get_ordinal
+        search_match_videos = [video for video in find_matches()        # Keep playlist members
+                               if playlist.check_video_in_playlist(get_ordinal(video.video_id))]
+        self.count_search(search_term)
+        if len(search_match_videos) == 0:                               # No matches, Err
+            return self.emit(operation, player_result.EMPTY,
+                             f"No search results for {search_term} in {playlist_name}",
+                             playlist=playlist.title)
+        return self.search_results_logic(operation, f"{search_term} in {playlist_name}",
+                                         search_match_videos, playlist.title)
+
+    def count_search(self, search_term):
+        """Counts a search term for TOP_SEARCHES (case and spacing insensitive)"""
+        self._top_searches.add(" ".join(search_term.casefold().split()))
+
+    def cached_search(self, search_type, search_term, find_matches):
+        """Returns search results from the LRU cache, computing them on a miss
+
+        Args:
+            search_type: Kind of search ("title", "tag" or "tags"), part of the key.
+            search_term: The user provided term, normalized for the key.
+            find_matches: Callable returning the matching videos on a miss.
+
+        Return:
+            List of matching Video instances.
+        """
+        key = (search_type, search_term.casefold())
+        epoch = self._video_library.epoch
+        video_ids = self._search_cache.get(key, epoch)
+        if video_ids is None:                                               # Miss or stale: compute & store
+            videos = find_matches()
+            self._search_cache.put(key, epoch, [video.video_id for video in videos])
+            return videos
+        return [self.get_video(video_id) for video_id in video_ids]
+
+    def search_cache_stats(self):
+        """Reports the hit/miss counters and size of the search cache."""
+        cache = self._search_cache
+        stats = {"hits": cache.hits, "misses": cache.misses, "entries": len(cache), "capacity": cache.capacity}
+        return self.emit("search_cache_stats", player_result.OK,
+                         f"Search cache: {cache.hits} hits, {cache.misses} misses, "
+                         f"{len(cache)}/{cache.capacity} entries", rows=[stats])
 
     # ------
     # PART 4
@@ -382,14 +610,16 @@ class VideoPlayer:
         if self._video_playing and self._video_playing.video_id == current_video.video_id:  # Check if current video is playing
             self.stop_video()                                                               # Stop video if yes
 
-        if current_video:                                                                   # Check if video exists
-            if current_video.flag:                                                          # Check if video has flag
-                print("Cannot flag video: Video is already flagged")                        # Err - video already has flag
-            else:
-                current_video.flag = flag_reason if flag_reason != "" else "Not supplied"   # Add Frag (provide or default)
-                print(f"Successfully flagged video: {current_video.title} (reason: {current_video.flag})")
-        else:                                                                               # Video doesnt exist
-            print("Cannot flag video: Video does not exist")
+        if not current_video:                                                               # Video doesnt exist
+            return self.emit("flag_video", player_result.NOT_FOUND, "Cannot flag video: Video does not exist")
+        if current_video.flag:                                                              # Check if video has flag
+            return self.emit("flag_video", player_result.CONFLICT,                          # Err - video already has flag
+                             "Cannot flag video: Video is already flagged", [current_video])
+        self._video_library.flag_video(                                                     # Add Flag (provide or default)
+            current_video, flag_reason if flag_reason != "" else "Not supplied")
+        return self.emit("flag_video", player_result.OK,
+                         f"Successfully flagged video: {current_video.title} (reason: {current_video.flag})",
+                         [current_video])
 
     def allow_video(self, video_id):
         """Removes a flag from a video.
@@ -399,14 +629,732 @@ class VideoPlayer:
         """
         video = self.get_video(video_id)                                            # Store current video
 
-        if video:                                                                   # Checks video exists
-            if video.flag:                                                          # Checks video has flag
-                video.flag = None                                                   # Remove Flag
-                print(f"Successfully removed flag from video: {video.title}")
-            else:                                                               # Video has no flag
-                print("Cannot remove flag from video: Video is not flagged")        # Err - no flag
-        else:                                                                   # No video
-            print("Cannot remove flag from video: Video does not exist")            # Err - no video
+        if not video:                                                               # No video
+            return self.emit("allow_video", player_result.NOT_FOUND,
+                             "Cannot remove flag from video: Video does not exist")
+        if not video.flag:                                                          # Video has no flag
+            return self.emit("allow_video", player_result.CONFLICT,
+                             "Cannot remove flag from video: Video is not flagged", [video])
+        self._video_library.allow_video(video)                                      # Remove Flag
+        return self.emit("allow_video", player_result.OK,
+                         f"Successfully removed flag from video: {video.title}", [video])
+
+    # ----------
+    # MODERATION
+    # ----------
+
+    def show_flagged(self, flag_reason=None):
+        """Displays the videos flagged with a reason, or the count of every reason.
+
+        Args:
+            flag_reason: The exact flag reason, all reasons by default.
+        """
+        library = self._video_library
+        if flag_reason is not None:
+            videos = library.get_flagged_videos(flag_reason)            # Moderation index, no catalog scan
+            if len(videos) == 0:                                        # Nothing flagged for it, Err
+                return self.emit("show_flagged", player_result.EMPTY, f"No videos flagged for {flag_reason}")
+            return self.emit("show_flagged", player_result.OK,
+                             lambda: [f"Here are the videos flagged for {flag_reason}:"]     # Header
+                                     + list(map(self.string_video_detail, videos)),
+                             rows=videos)
+
+        counts = sorted(library.flag_reason_counts().items(), key=lambda item: (-item[1], item[0]))
+        if len(counts) == 0:                                            # Nothing flagged at all
+            return self.emit("show_flagged", player_result.EMPTY, "No videos are flagged")
+        return self.emit("show_flagged", player_result.OK,
+                         lambda: ["Flagged videos by reason:"]          # Header, most used reason first
+                                 + [f"  {reason}: {count}" for reason, count in counts],
+                         rows=counts)
+
+    def allow_by_reason(self, flag_reason):
+        """Removes the flag from every video flagged with a reason.
+
+        Args:
+            flag_reason: The exact flag reason.
+        """
+        videos = self._video_library.allow_by_reason(flag_reason)
+        if len(videos) == 0:                                            # Nothing flagged for it, Err
+            return self.emit("allow_by_reason", player_result.NOT_FOUND,
+                             f"Cannot remove flags: No videos flagged for {flag_reason}")
+        return self.emit("allow_by_reason", player_result.OK,
+                         f"Removed flag from {len(videos)} videos (reason: {flag_reason})", videos)
+
+    # --------------
+    # PLAYLIST QUEUE
+    # --------------
+
+    def play_playlist(self, playlist_name, shuffle=False):
+        """Plays the videos of a playlist in order or shuffled.
+
+        Args:
+            playlist_name: The playlist name.
+            shuffle: Whether to play the playlist in a random order.
+        """
+        current_playlist = self.get_playlist(playlist_name)
+        if not current_playlist:                                            # Playlist doesnt exist
+            return self.emit("play_playlist", player_result.NOT_FOUND,
+                             f"Cannot play playlist {playlist_name}: Playlist does not exist")
+        queue = PlaybackQueue(current_playlist,
+                              lambda ordinal: not self._video_library.is_flagged_ordinal(ordinal),
+                              shuffle)
+        ordinal = queue.next()
+        if ordinal is None:                                                 # Nothing playable, Err
+            return self.emit("play_playlist", player_result.EMPTY,
+                             f"Cannot play playlist {playlist_name}: No playable videos",
+                             playlist=current_playlist.title)
+        self._queue = queue
+        video = self._video_library.get_video_by_ordinal(ordinal)
+        result = self.emit("play_playlist", player_result.OK,
+                           f"Playing playlist: {current_playlist.title}" + (" (shuffled)" if shuffle else ""),
+                           [video], current_playlist.title)
+        self.start_video(video)
+        return result
+
+    def next_video(self):
+        """Plays the next video of the playlist being played."""
+        return self.step_queue(self._queue.next if self._queue else None, "next", "end")
+
+    def previous_video(self):
+        """Plays the previous video of the playlist being played."""
+        return self.step_queue(self._queue.previous if self._queue else None, "previous", "start")
+
+    def step_queue(self, step, direction, boundary):
+        """Moves the playlist queue and plays the video it lands on
+
+        Args: step - bound queue method returning an ordinal or None.
+              direction - "next" or "previous", for messages.
+              boundary - "end" or "start", for messages.
+        """
+        operation = f"{direction}_video"
+        if step is None:                                                    # No queue, Err
+            return self.emit(operation, player_result.INVALID_STATE,
+                             f"Cannot play {direction} video: No playlist is being played")
+        ordinal = step()
+        if ordinal is None:                                                 # Ran off the queue
+            title = self._queue.playlist.title
+            return self.emit(operation, player_result.EMPTY,
+                             f"Cannot play {direction} video: Reached the {boundary} of {title}",
+                             playlist=title)
+        return self.start_video(self._video_library.get_video_by_ordinal(ordinal))
+
+    # --------------
+    # PLAYBACK CLOCK
+    # --------------
+
+    def advance_clock(self):
+        """Fires the end-of-video events that are due, returns how many fired.
+
+        With a shared PlaybackClock this advances every player using it.
+        """
+        return self._clock.advance()
+
+    def start_position(self):
+        """Tracks the position of the playing video from its start"""
+        now = self._clock.now()
+        self._position = PlaybackPosition(self.video_duration, now)
+        if self._video_paused:
+            self._position.pause(now)
+        self.schedule_end()
+
+    def clear_position(self):
+        """Forgets the position and end event of a video no longer playing"""
+        self._position = None
+        self.schedule_end()
+
+    def schedule_end(self):
+        """(Re)schedules the end event of the playing video, if it is moving"""
+        if self._end_timer is not None:
+            self._clock.cancel(self._end_timer)
+            self._end_timer = None
+        if self._position and not self._position.paused:
+            self._end_timer = self._clock.schedule(self._position.remaining(self._clock.now()),
+                                                   self.video_ended)
+
+    def video_ended(self):
+        """Handles the end of the playing video: plays the next queued one"""
+        self._end_timer = None
+        video = self._video_playing
+        result = self.emit("video_ended", player_result.OK, f"Finished video: {video.title}", [video])
+        self.record_history(play_history.STOP, video)
+        self._video_playing = False
+        self._video_paused = False
+        self._position = None
+        if self._queue:                                                     # Auto-advance the queue
+            ordinal = self._queue.next()
+            if ordinal is not None:
+                self.start_video(self._video_library.get_video_by_ordinal(ordinal))
+        return result
+
+    # ------------
+    # PLAY HISTORY
+    # ------------
+
+    def record_history(self, event, video):
+        """Records a play/stop/pause/continue event for a video"""
+        ordinal = self._video_library.get_ordinal(video.video_id)
+        self._history.record(event, -1 if ordinal is None else ordinal)
+
+    def show_history(self, n=10):
+        """Displays the n most recent play events, newest first.
+
+        Args:
+            n: The number of events to show.
+        """
+        if len(self._history) == 0:                                         # Nothing recorded yet
+            return self.emit("show_history", player_result.EMPTY, "No play history yet")
+        now = time.monotonic()
+        rows = [(play_history.EVENT_NAMES[event],
+                 self._video_library.get_video_by_ordinal(ordinal) if ordinal >= 0 else None,
+                 now - timestamp)
+                for timestamp, event, ordinal in self._history.recent(n)]
+
+        def history_text():
+            lines = ["Here is your play history:"]                          # Header
+            for index, (event_name, video, seconds_ago) in enumerate(rows):
+                title = video.title if video else "(removed video)"
+                lines.append(f"{index + 1}) {event_name}: {title} ({seconds_ago:.1f}s ago)")
+            return lines
+
+        return self.emit("show_history", player_result.OK, history_text, rows=rows)
+
+    def play_last(self):
+        """Plays again the most recently played video other than the current one."""
+        current_id = self._video_playing.video_id if self._video_playing else None
+        for timestamp, event, ordinal in self._history.recent():           # Newest first
+            if event != play_history.PLAY or ordinal < 0:
+                continue
+            video = self._video_library.get_video_by_ordinal(ordinal)
+            if video and video.video_id != current_id:
+                return self.play_video(video.video_id)                      # Applies the usual flag checks
+        return self.emit("play_last", player_result.EMPTY, "Cannot play last video: No previously played video")
+
+    # ---------------
+    # RECOMMENDATIONS
+    # ---------------
+
+    def recommend(self, video_id=None):
+        """Displays videos sharing the most tags with a video.
+
+        Args:
+            video_id: The reference video, the one playing by default.
+        """
+        if video_id is None:
+            if not self._video_playing:                                     # Nothing to recommend from
+                return self.emit("recommend", player_result.INVALID_STATE,
+                                 "Cannot recommend videos: No video is currently playing")
+            video_id = self._video_playing.video_id
+        ordinal = self._video_library.get_ordinal(video_id)
+        if ordinal is None:                                                 # Video doesnt exist
+            return self.emit("recommend", player_result.NOT_FOUND, "Cannot recommend videos: Video does not exist")
+
+        library = self._video_library
+        if not self._recommender or not self._recommender.update(library):
+            self._recommender = Recommender(library)                        # Update after catalog changes, or rebuild
+        similar = self._recommender.similar(ordinal, library.is_flagged_ordinal)
+
+        video = library.get_video_by_ordinal(ordinal)
+        if len(similar) == 0:                                               # No matches, Err
+            return self.emit("recommend", player_result.EMPTY, f"No recommendations for {video.title}", [video])
+        videos = [library.get_video_by_ordinal(other) for other in similar]
+        return self.emit("recommend", player_result.OK,
+                         lambda: [f"Here are videos like {video.title}:"]  # Header
+                                 + [f"{index + 1}) {self.string_video_detail(other)}"
+                                    for index, other in enumerate(videos)],
+                         [video], rows=videos)
+
+    # ----------
+    # DUPLICATES
+    # ----------
+
+    def find_duplicates(self, video_id=None):
+        """Displays the near duplicates of a video, or every group of them.
+
+        Flagged videos are included so moderators can spot reuploads.
+
+        Args:
+            video_id: The reference video; all groups by default.
+        """
+        library = self._video_library
+        if not self._duplicate_finder or self._duplicate_finder.catalog_version != library.catalog_version:
+            self._duplicate_finder = DuplicateFinder(library)               # (Re)build after catalog changes
+        finder = self._duplicate_finder
+
+        if video_id is None:
+            groups = [[library.get_video_by_ordinal(ordinal) for ordinal in group]
+                      for group in finder.groups()]
+            if len(groups) == 0:                                            # No matches, Err
+                return self.emit("find_duplicates", player_result.EMPTY, "No duplicates found")
+
+            def groups_text():
+                lines = ["Here are the possible duplicate groups:"]         # Header
+                for index, group in enumerate(groups):
+                    lines.append(f"Group {index + 1}:")
+                    lines.extend(f"  {self.get_video_to_string(video)}" for video in group)
+                return lines
+
+            return self.emit("find_duplicates", player_result.OK, groups_text, rows=groups)
+
+        ordinal = library.get_ordinal(video_id)
+        if ordinal is None:                                                 # Video doesnt exist
+            return self.emit("find_duplicates", player_result.NOT_FOUND,
+                             "Cannot find duplicates: Video does not exist")
+        video = library.get_video_by_ordinal(ordinal)
+        matches = [(library.get_video_by_ordinal(other), similarity)
+                   for other, similarity in finder.similar(ordinal)]
+        if len(matches) == 0:                                               # No matches, Err
+            return self.emit("find_duplicates", player_result.EMPTY, f"No duplicates found for {video.title}", [video])
+        return self.emit("find_duplicates", player_result.OK,
+                         lambda: [f"Here are possible duplicates of {video.title}:"]   # Header
+                                 + [f"{index + 1}) {self.get_video_to_string(other)} - {similarity:.0%} similar"
+                                    for index, (other, similarity) in enumerate(matches)],
+                         [video], rows=matches)
+
+    # --------
+    # TRENDING
+    # --------
+
+    def show_trending(self, n=10):
+        """Displays the n most played videos, skipping flagged ones.
+
+        Args:
+            n: The number of videos to display.
+        """
+        library = self._video_library
+
+        def playable(video_id):
+            video = library.get_video(video_id)
+            return video is not None and not video.flag
+
+        top = self._trending.top(n, playable)
+        if len(top) == 0:                                                   # Nothing played yet
+            return self.emit("show_trending", player_result.EMPTY, "No trending videos yet")
+        videos = [library.get_video(video_id) for video_id, _ in top]
+        bound = int(self._trending.error_bound)
+
+        def trending_text():
+            lines = ["Here are the trending videos:"]                       # Header
+            for index, (video, (_, plays)) in enumerate(zip(videos, top)):
+                lines.append(f"{index + 1}) {self.string_video_detail(video)} - {plays} play{'s' * (plays != 1)}")
+            if bound:                                                       # Footer, once counts are approximate
+                lines.append(f"Play counts may be overestimated by up to {bound}")
+            return lines
+
+        return self.emit("show_trending", player_result.OK, trending_text,
+                         rows=[(video, plays) for video, (_, plays) in zip(videos, top)])
+
+    def show_top_searches(self, n=10):
+        """Displays the n most frequent search terms.
+
+        Args:
+            n: The number of search terms to display.
+        """
+        top = self._top_searches.top(n)
+        if len(top) == 0:                                                   # Nothing searched yet
+            return self.emit("show_top_searches", player_result.EMPTY, "No searches yet")
+        bound = int(self._top_searches.error_bound)
+
+        def top_searches_text():
+            lines = ["Here are the top searches:"]                          # Header
+            for index, (term, searches) in enumerate(top):
+                lines.append(f"{index + 1}) {term} - {searches} search{'es' * (searches != 1)}")
+            if bound:                                                       # Footer, once counts are approximate
+                lines.append(f"Search counts may be overestimated by up to {bound}")
+            return lines
+
+        return self.emit("show_top_searches", player_result.OK, top_searches_text, rows=top)
+
+    # ---------------
+    # STATE SNAPSHOTS
+    # ---------------
+
+    def save_state(self, path):
+        """Saves flags, playlists and playback state to a snapshot file.
+
+        Args:
+            path: The file to write.
+        """
+        library = self._video_library
+        flagged = library.flagged_ordinals()
+        reasons = {}
+        reason_codes = array("I", (reasons.setdefault(library.get_video_by_ordinal(ordinal).flag, len(reasons))
+                                   for ordinal in flagged))
+        names, offsets, ordinals = [], array("Q", [0]), array("I")
+        for name, playlist in self._user_playlists.items():
+            names.append(name)
+            ordinals.extend(playlist.get_all_ordinals)
+            offsets.append(len(ordinals))
+        id_table = library.id_table()                                       # Lets a restore detect catalog drift
+        state = {
+            "id_table": player_state.out_of_band(id_table),
+            "flagged": player_state.out_of_band(array("I", flagged)),
+            "reason_codes": player_state.out_of_band(reason_codes),
+            "reasons": list(reasons),
+            "playlist_names": names,
+            "playlist_offsets": player_state.out_of_band(offsets),
+            "playlist_ordinals": player_state.out_of_band(ordinals),
+            "playing": library.get_ordinal(self._video_playing.video_id) if self._video_playing else None,
+            "paused": self._video_paused,
+        }
+        try:
+            player_state.write_state(path, state)
+        except OSError as e:
+            return self.emit("save_state", player_result.IO_ERROR, f"Cannot save state: {e.strerror}")
+        return self.emit("save_state", player_result.OK,
+                         f"Saved state to {path}: {len(flagged)} flags, {len(names)} playlists",
+                         rows=[{"flags": len(flagged), "playlists": len(names)}])
+
+    def load_state(self, path):
+        """Restores flags, playlists and playback state from a snapshot file.
+
+        Saved ordinals are used directly when the snapshot was taken against
+        the same catalog; otherwise they are remapped by video id and entries
+        whose video no longer exists are dropped.
+
+        Args:
+            path: The file to read.
+        """
+        library = self._video_library
+        try:
+            state = player_state.read_state(path)
+        except OSError as e:
+            return self.emit("load_state", player_result.IO_ERROR, f"Cannot load state: {e.strerror}")
+        except player_state.StateFormatException as e:
+            return self.emit("load_state", player_result.INVALID_ARGUMENT, f"Cannot load state: {e}")
+
+        try:
+            flags, playlists, playing, paused, dropped = self.decode_state(state)
+        except player_state.StateFormatException as e:
+            return self.emit("load_state", player_result.INVALID_ARGUMENT, f"Cannot load state: {e}")
+        library.restore_flags(flags)
+
+        self._user_playlists = {}
+        self._playlist_names = PlaylistNames()
+        self._playlists_version += 1
+        self._queue = None
+        for playlist in playlists:
+            self._user_playlists[playlist.title] = playlist
+            self._playlist_names.add(playlist.title)
+
+        self._video_playing = library.get_video_by_ordinal(playing) if playing is not None else False
+        self._video_paused = bool(self._video_playing) and paused
+        if self._video_playing:                                             # Snapshots keep no position
+            self.start_position()
+        else:
+            self.clear_position()
+        return self.emit("load_state", player_result.OK,
+                         f"Loaded state from {path}: {len(flags)} flags, {len(self._user_playlists)} playlists"
+                         + (f", {dropped} entries for missing videos dropped" if dropped else ""),
+                         rows=[{"flags": len(flags), "playlists": len(self._user_playlists), "dropped": dropped}])
+
+    def decode_state(self, state):
+        """Validates a snapshot against the loaded catalog and decodes it.
+
+        Nothing is changed, so a bad snapshot leaves the player as it was.
+
+        Args:
+            state: The dict returned by player_state.read_state.
+
+        Returns:
+            (flags, playlists, playing, paused, dropped): (ordinal, reason)
+            pairs, Playlist instances, the playing ordinal or None, whether
+            it is paused and the number of entries dropped for missing videos.
+
+        Raises:
+            StateFormatException: If the snapshot is malformed or refers to
+                videos the saved catalog did not have.
+        """
+        library = self._video_library
+        try:
+            saved_ids = bytes(state["id_table"])
+            flagged = player_state.to_array("I", state["flagged"])
+            reason_codes = player_state.to_array("I", state["reason_codes"])
+            reasons = list(state["reasons"])
+            names = list(state["playlist_names"])
+            offsets = player_state.to_array("Q", state["playlist_offsets"])
+            ordinals = player_state.to_array("I", state["playlist_ordinals"])
+            playing, paused = state["playing"], bool(state["paused"])
+        except (KeyError, TypeError, ValueError) as e:                     # Missing key, bad buffer length
+            raise player_state.StateFormatException(f"Malformed snapshot ({type(e).__name__}: {e})")
+        if (len(reason_codes) != len(flagged) or max(reason_codes, default=-1) >= len(reasons)
+                or not all(isinstance(name, str) for name in names)
+                or len(offsets) != len(names) + 1 or offsets[0] != 0
+                or any(offsets[index] > offsets[index + 1] for index in range(len(names)))
+                or offsets[-1] != len(ordinals)
+                or not (playing is None or isinstance(playing, int))):
+            raise player_state.StateFormatException("Malformed snapshot (inconsistent lengths)")
+
+        exact = saved_ids == library.id_table()                            # Same catalog: ordinals line up
+        remap = None if exact else library.map_id_table(saved_ids)          # Else remap them by video id
+        size = library.ordinal_count if exact else len(remap)
+        if (max(flagged, default=-1) >= size or max(ordinals, default=-1) >= size
+                or (playing is not None and not 0 <= playing < size)):
+            raise player_state.StateFormatException("Snapshot refers to videos outside its catalog")
+
+        flag_reasons = map(reasons.__getitem__, reason_codes)
+        if exact:
+            live = library.live_map()
+            if (not all(map(live.__getitem__, flagged)) or not all(map(live.__getitem__, ordinals))
+                    or (playing is not None and not live[playing])):
+                raise player_state.StateFormatException("Snapshot refers to removed videos")
+            flags = list(zip(flagged, flag_reasons))
+        else:
+            flags = [(remap[ordinal], reason) for ordinal, reason in zip(flagged, flag_reasons)
+                     if remap[ordinal] is not None]
+            if playing is not None:
+                playing = remap[playing]
+        dropped = len(flagged) - len(flags)
+        playlists = []
+        for index, name in enumerate(names):
+            start, end = offsets[index], offsets[index + 1]
+            if exact:
+                try:
+                    playlist = Playlist.from_ordinals(name, ordinals[start:end])
+                except ValueError:
+                    raise player_state.StateFormatException(f"Malformed snapshot (playlist {name})")
+            else:
+                kept = [remap[ordinal] for ordinal in ordinals[start:end] if remap[ordinal] is not None]
+                dropped += end - start - len(kept)
+                playlist = Playlist(name)
+                playlist.add_videos(kept)
+            playlists.append(playlist)
+        return flags, playlists, playing, paused, dropped
+
+    # -------------
+    # BULK COMMANDS
+    # -------------
+
+    def add_videos_to_playlist(self, playlist_name, video_ids):
+        """Adds several videos to a playlist with a given name.
+
+        Args:
+            playlist_name: The playlist name.
+            video_ids: The video_ids to be added.
+        """
+        current_playlist = self.get_playlist(playlist_name)                 # Resolve playlist once
+        if not current_playlist:
+            return self.emit("add_videos_to_playlist", player_result.NOT_FOUND,
+                             f"Cannot add videos to {playlist_name}: Playlist does not exist")
+
+        to_add, skipped, seen = [], [], set()
+        for video_id in video_ids:                                          # Validate whole batch
+            ordinal = self._video_library.get_ordinal(video_id)
+            if ordinal is None:
+                skipped.append((video_id, "Video does not exist"))
+            elif self._video_library.is_flagged_ordinal(ordinal):
+                skipped.append((video_id, "Video is currently flagged "
+                                          f"(reason: {self.get_video(video_id).flag})"))
+            elif ordinal in seen or current_playlist.check_video_in_playlist(ordinal):
+                skipped.append((video_id, "Video already added"))
+            else:
+                seen.add(ordinal)
+                to_add.append(ordinal)
+
+        current_playlist.add_videos(to_add)                                 # Apply in one pass
+        return self.batch_summary("add_videos_to_playlist",
+                                  f"Added {len(to_add)} of {len(video_ids)} videos to {playlist_name}",
+                                  map(self._video_library.get_video_by_ordinal, to_add), skipped,
+                                  current_playlist.title)
+
+    def remove_videos_from_playlist(self, playlist_name, video_ids):
+        """Removes several videos from a playlist with a given name.
+
+        Args:
+            playlist_name: The playlist name.
+            video_ids: The video_ids to be removed.
+        """
+        current_playlist = self.get_playlist(playlist_name)                 # Resolve playlist once
+        if not current_playlist:
+            return self.emit("remove_videos_from_playlist", player_result.NOT_FOUND,
+                             f"Cannot remove videos from {playlist_name}: Playlist does not exist")
+
+        to_remove, skipped, seen = [], [], set()
+        for video_id in video_ids:                                          # Validate whole batch
+            ordinal = self._video_library.get_ordinal(video_id)
+            if ordinal is None:
+                skipped.append((video_id, "Video does not exist"))
+            elif ordinal in seen or not current_playlist.check_video_in_playlist(ordinal):
+                skipped.append((video_id, "Video is not in playlist"))
+            else:
+                seen.add(ordinal)
+                to_remove.append(ordinal)
+
+        current_playlist.remove_videos(to_remove)                           # Apply in one pass
+        return self.batch_summary("remove_videos_from_playlist",
+                                  f"Removed {len(to_remove)} of {len(video_ids)} videos from {playlist_name}",
+                                  map(self._video_library.get_video_by_ordinal, to_remove), skipped,
+                                  current_playlist.title)
+
+    def flag_videos(self, flag_reason, video_ids):
+        """Mark several videos as flagged with the same reason.
+
+        Args:
+            flag_reason: Reason for flagging the videos.
+            video_ids: The video_ids to be flagged.
+        """
+        to_flag, skipped, seen = [], [], set()
+        for video_id in video_ids:                                          # Validate whole batch
+            video = self.get_video(video_id)
+            if not video:
+                skipped.append((video_id, "Video does not exist"))
+            elif video.flag or video_id in seen:
+                skipped.append((video_id, "Video is already flagged"))
+            else:
+                seen.add(video_id)
+                to_flag.append(video)
+
+        if self._video_playing and self._video_playing.video_id in seen:    # Stop video if it gets flagged
+            self.stop_video()
+        for video in to_flag:                                               # Apply in one pass
+            self._video_library.flag_video(video, flag_reason)
+        return self.batch_summary("flag_videos",
+                                  f"Flagged {len(to_flag)} of {len(video_ids)} videos (reason: {flag_reason})",
+                                  to_flag, skipped)
+
+    def allow_videos(self, video_ids):
+        """Removes the flag from several videos.
+
+        Args:
+            video_ids: The video_ids to be allowed again.
+        """
+        to_allow, skipped, seen = [], [], set()
+        for video_id in video_ids:                                          # Validate whole batch
+            video = self.get_video(video_id)
+            if not video:
+                skipped.append((video_id, "Video does not exist"))
+            elif not video.flag or video_id in seen:
+                skipped.append((video_id, "Video is not flagged"))
+            else:
+                seen.add(video_id)
+                to_allow.append(video)
+
+        for video in to_allow:                                              # Apply in one pass
+            self._video_library.allow_video(video)
+        return self.batch_summary("allow_videos",
+                                  f"Removed flag from {len(to_allow)} of {len(video_ids)} videos",
+                                  to_allow, skipped)
+
+    def batch_summary(self, operation, header, applied, skipped, playlist=None):
+        """Reports one result for a bulk command
+
+        Args: operation - name of the bulk operation.
+              header - line describing what was applied.
+              applied - Video instances the command was applied to.
+              skipped - list of (video_id, reason) pairs that were not applied.
+              playlist - name of the affected playlist, if any.
+        """
+        return self.emit(operation, player_result.OK,
+                         lambda: [header] + [f"  Skipped {video_id}: {reason}" for video_id, reason in skipped],
+                         applied, playlist, rows=skipped)
+
+    # ----------
+    # HOT RELOAD
+    # ----------
+
+    def check_for_library_updates(self):
+        """Applies catalog file changes and fixes up playback and playlists."""
+        diff = self._video_library.poll_catalog()
+        if not diff:                                                        # Nothing changed
+            return None
+        self.forget_videos(diff.removed_ordinals)
+        if self._video_playing:                                             # Pick up new title/tags
+            self._video_playing = self.get_video(self._video_playing.video_id)
+        return self.emit("check_for_library_updates", player_result.OK,
+                         f"Catalog reloaded: {len(diff.added)} added, {len(diff.removed)} removed, "
+                         f"{len(diff.updated)} updated",
+                         rows=[{"added": diff.added, "removed": diff.removed, "updated": diff.updated}])
+
+    def forget_videos(self, ordinals):
+        """Stops and drops from every playlist videos removed from the library
+
+        Args: ordinals - ordinals of videos no longer in the library.
+        """
+        if not ordinals:
+            return
+        if self._video_playing and not self.get_video(self._video_playing.video_id):
+            self.stop_video()                                               # Playing video is gone
+            self._video_paused = False
+        for playlist in self._user_playlists.values():                      # Drop vanished ordinals
+            playlist.remove_videos(ordinals)
+
+    # ----------------
+    # CATALOG COMMANDS
+    # ----------------
+
+    def add_video(self, video_id, video_title, video_tags=()):
+        """Adds a new video to the library.
+
+        Args:
+            video_id: The id of the new video.
+            video_title: The title of the new video.
+            video_tags: The tags of the new video.
+        """
+        if self._video_library.read_only:                                   # Attached to a shared catalog
+            return self.emit("add_video", player_result.READ_ONLY, "Cannot add video: Catalog is read-only")
+        if self.get_video(video_id):                                        # Ids must be unique
+            return self.emit("add_video", player_result.CONFLICT,
+                             "Cannot add video: A video with the same id already exists")
+        video = Video(video_title, video_id, video_tags)
+        self._video_library.add_video(video)
+        return self.emit("add_video", player_result.OK, f"Added video: {video_title}", [video])
+
+    def remove_video_from_library(self, video_id):
+        """Removes a video from the library, its playlists and playback.
+
+        Args:
+            video_id: The video_id to be removed.
+        """
+        ordinal = self._video_library.get_ordinal(video_id)
+        if self._video_library.read_only:
+            return self.emit("remove_video_from_library", player_result.READ_ONLY,
+                             "Cannot remove video: Catalog is read-only")
+        if ordinal is None:
+            return self.emit("remove_video_from_library", player_result.NOT_FOUND,
+                             "Cannot remove video: Video does not exist")
+        video = self._video_library.remove_video(video_id)
+        self.forget_videos([ordinal])                                       # Stop & drop from playlists
+        return self.emit("remove_video_from_library", player_result.OK, f"Removed video: {video.title}", [video])
+
+    def retag_video(self, video_id, video_tags):
+        """Replaces the tags of a video.
+
+        Args:
+            video_id: The video_id to be retagged.
+            video_tags: The new tags of the video.
+        """
+        if self._video_library.read_only:
+            return self.emit("retag_video", player_result.READ_ONLY, "Cannot retag video: Catalog is read-only")
+        if not self.get_video(video_id):
+            return self.emit("retag_video", player_result.NOT_FOUND, "Cannot retag video: Video does not exist")
+        video = self._video_library.retag_video(video_id, video_tags)
+        if self._video_playing and self._video_playing.video_id == video_id:
+            self._video_playing = video                                     # Keep playback on the new object
+        return self.emit("retag_video", player_result.OK,
+                         lambda: f"Retagged video: {self.string_video_detail(video)}", [video])
+
+    # ------------
+    # AUTOCOMPLETE
+    # ------------
+
+    def complete(self, prefix, limit=10):
+        """Display videos whose id or title starts with the prefix.
+
+        Args:
+            prefix: The (case insensitive) start of a video id or title.
+            limit: The maximum number of completions to display.
+        """
+        video_ids = self._video_library.complete(prefix, limit)            # Prefix lookup in library index
+        if len(video_ids) == 0:                                             # No matches, Err
+            return self.emit("complete", player_result.EMPTY, f"No completions for {prefix}")
+        videos = list(map(self.get_video, video_ids))
+        return self.emit("complete", player_result.OK,
+                         lambda: [f"Here are the completions for {prefix}:"]   # Header
+                                 + list(map(self.get_video_to_string, videos)),
+                         rows=videos)
+
+    def complete_video_ids(self, prefix, limit=10):
+        """Returns the ids of videos whose id or title starts with the prefix"""
+        return self._video_library.complete(prefix, limit)
 
     # ----------------
     # HELPER FUNCTIONS
@@ -445,13 +1393,7 @@ class VideoPlayer:
 
             Args: playlist_name - playlist name to check for.
         """
-        if len(self._user_playlists) == 0:                                  # EXIT : If no playlist in list
-            return False
-
-        for playlist in self._user_playlists:                               # Loop through playlists
-            if playlist.upper() == playlist_name.upper():                   # Compare playlist name - case insensitive
-                return True
-        return False
+        return self._playlist_names.get(playlist_name) is not None         # Bisect, case insensitive
 
     def search_term_in_video_title(self, search_term, video):
         """Searches for search term in video title - Case insensitive
@@ -1,11 +1,38 @@
 """A video playlist class."""
 
+from array import array
+
 
 class Playlist:
-    """A class used to represent a Playlist."""
+    """A class used to represent a Playlist.
+
+    Videos are stored as library ordinals rather than id strings: _ordinals
+    keeps the playlist order in 4-byte integers and _members is a bitmap
+    with one bit per library ordinal, so membership is a single bit test.
+    The bitmap only grows to the highest ordinal added, at most an eighth
+    of a byte per video in the library.
+    """
     def __init__(self, playlist_title: str):
         self._title = playlist_title
-        self._video_ids = []
+        self._ordinals = array("I")
+        self._members = bytearray()
+        self._version = 0
+
+    @classmethod
+    def from_ordinals(cls, playlist_title, ordinals):
+        """Builds a Playlist from a trusted array, e.g. a state snapshot.
+
+        Raises:
+            ValueError: If an ordinal appears more than once.
+        """
+        playlist = cls(playlist_title)
+        playlist._ordinals = array("I", ordinals)
+        members = playlist._members = bytearray((max(ordinals, default=-1) >> 3) + 1)
+        for ordinal in ordinals:
+            members[ordinal >> 3] |= 1 << (ordinal & 7)
+        if bin(int.from_bytes(members, "little")).count("1") != len(ordinals):
+            raise ValueError(f"Playlist {playlist_title} lists a video twice")
+        return playlist
 
     @property
     def title(self) -> str:
@@ -13,28 +40,63 @@ class Playlist:
         return self._title
 
     @property
-    def get_all_video_ids(self):
-        """Return all video ids stored"""
-        return self._video_ids
+    def version(self) -> int:
+        """Returns a counter that advances whenever the videos change"""
+        return self._version
+
+    @property
+    def get_all_ordinals(self):
+        """Return all video ordinals stored, in playlist order"""
+        return self._ordinals
+
+    def remove_video_from_playlist(self, ordinal):
+        """Remove Video from playlist by ordinal"""
+        self._ordinals.remove(ordinal)
+        self._members[ordinal >> 3] &= ~(1 << (ordinal & 7))
+        self._version += 1
 
-    def remove_video_from_playlist(self, video_id):
-        """Remove Video from playlist by id"""
-        self._video_ids.remove(video_id)
+    def remove_videos(self, ordinals):
+        """Remove several videos from playlist in a single pass"""
+        to_remove = {ordinal for ordinal in ordinals if self.check_video_in_playlist(ordinal)}
+        if not to_remove:
+            return
+        self._ordinals = array("I", (o for o in self._ordinals if o not in to_remove))
+        for ordinal in to_remove:
+            self._members[ordinal >> 3] &= ~(1 << (ordinal & 7))
+        self._version += 1
 
     def remove_all_videos(self):
         """Remove all videos from playlist"""
-        self._video_ids = []
+        self._ordinals = array("I")
+        self._members = bytearray()
+        self._version += 1
 
-    def add_video(self, video_id):
+    def add_video(self, ordinal):
         """Checks video not already in Playlist before adding"""
-        if not self.check_video_in_playlist(video_id):
-            self._video_ids.append(video_id)
-
-    def check_video_in_playlist(self, video_id):
-        """Checks if video_id in Playlist"""
-        if len(self._video_ids) == 0:
-            return False
-        for vid_id in self._video_ids:
-            if vid_id == video_id:
-                return True
-        return False
+        if not self.check_video_in_playlist(ordinal):
+            self._ordinals.append(ordinal)
+            self._mark(ordinal)
+            self._version += 1
+
+    def add_videos(self, ordinals):
+        """Adds several videos, skipping any already in Playlist"""
+        new_ordinals = array("I")
+        for ordinal in ordinals:
+            if not self.check_video_in_playlist(ordinal):   # Also skips repeats within ordinals
+                new_ordinals.append(ordinal)
+                self._mark(ordinal)
+        if new_ordinals:
+            self._ordinals.extend(new_ordinals)
+            self._version += 1
+
+    def check_video_in_playlist(self, ordinal):
+        """Checks if video ordinal in Playlist"""
+        index = ordinal >> 3
+        return index < len(self._members) and self._members[index] >> (ordinal & 7) & 1 == 1
+
+    def _mark(self, ordinal):
+        """Sets the membership bit of an ordinal, growing the bitmap to it"""
+        index = ordinal >> 3
+        if index >= len(self._members):
+            self._members.extend(bytes(index + 1 - len(self._members)))
+        self._members[index] |= 1 << (ordinal & 7)
@@ -0,0 +1,54 @@
+from src.video_player import VideoPlayer
+
+
+def test_add_videos_to_playlist(capfd):
+    player = VideoPlayer()
+    player.create_playlist("my_playlist")
+    player.add_to_playlist("my_playlist", "amazing_cats_video_id")
+    player.add_videos_to_playlist("my_playlist", [
+        "amazing_cats_video_id", "funny_dogs_video_id", "does_not_exist",
+        "funny_dogs_video_id"])
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert len(lines) == 6
+    assert "Added 1 of 4 videos to my_playlist" in lines[2]
+    assert "Skipped amazing_cats_video_id: Video already added" in lines[3]
+    assert "Skipped does_not_exist: Video does not exist" in lines[4]
+    assert "Skipped funny_dogs_video_id: Video already added" in lines[5]
+    assert player.get_playlist_video_ids(player.get_playlist("my_playlist")) == [
+        "amazing_cats_video_id", "funny_dogs_video_id"]
+
+
+def test_remove_videos_from_playlist(capfd):
+    player = VideoPlayer()
+    player.create_playlist("my_playlist")
+    player.add_videos_to_playlist("my_playlist", [
+        "amazing_cats_video_id", "funny_dogs_video_id", "nothing_video_id"])
+    player.remove_videos_from_playlist("my_playlist", [
+        "nothing_video_id", "amazing_cats_video_id", "life_at_google_video_id"])
+    player.remove_videos_from_playlist("another_playlist", ["nothing_video_id"])
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert len(lines) == 5
+    assert "Removed 2 of 3 videos from my_playlist" in lines[2]
+    assert "Skipped life_at_google_video_id: Video is not in playlist" in lines[3]
+    assert "Cannot remove videos from another_playlist: Playlist does not exist" \
+           in lines[4]
+    assert player.get_playlist_video_ids(player.get_playlist("my_playlist")) == [
+        "funny_dogs_video_id"]
+
+
+def test_flag_and_allow_videos(capfd):
+    player = VideoPlayer()
+    player.play_video("amazing_cats_video_id")
+    player.flag_videos("spam", ["amazing_cats_video_id", "funny_dogs_video_id"])
+    player.allow_videos(["funny_dogs_video_id", "nothing_video_id"])
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert len(lines) == 5
+    assert "Stopping video: Amazing Cats" in lines[1]
+    assert "Flagged 2 of 2 videos (reason: spam)" in lines[2]
+    assert "Removed flag from 1 of 2 videos" in lines[3]
+    assert "Skipped nothing_video_id: Video is not flagged" in lines[4]
+    assert player.get_video("amazing_cats_video_id").flag == "spam"
+    assert player.get_video("funny_dogs_video_id").flag is None
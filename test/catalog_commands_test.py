@@ -0,0 +1,69 @@
+from src.command_parser import CommandParser
+from src.video_player import VideoPlayer
+
+
+def test_add_video_updates_listing_search_and_completion(capfd):
+    player = VideoPlayer()
+    parser = CommandParser(player)
+    parser.execute_command(["ADD_VIDEO", "bird_video_id", "Bird", "Song", "#bird"])
+    parser.execute_command(["ADD_VIDEO", "bird_video_id", "Bird"])
+    player.show_all_videos()
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert "Added video: Bird Song" in lines[0]
+    assert "Cannot add video: A video with the same id already exists" in lines[1]
+    assert "Bird Song (bird_video_id) [#bird]" in lines[5]
+    assert player.complete_video_ids("bird") == ["bird_video_id"]
+
+
+def test_remove_video_stops_playback_and_updates_playlists(capfd):
+    player = VideoPlayer()
+    player.create_playlist("my_playlist")
+    player.add_videos_to_playlist("my_playlist", [
+        "amazing_cats_video_id", "funny_dogs_video_id"])
+    player.play_video("amazing_cats_video_id")
+    player.remove_video_from_library("amazing_cats_video_id")
+    player.remove_video_from_library("amazing_cats_video_id")
+    player.number_of_videos()
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert "Stopping video: Amazing Cats" in lines[3]
+    assert "Removed video: Amazing Cats" in lines[4]
+    assert "Cannot remove video: Video does not exist" in lines[5]
+    assert "4 videos in the library" in lines[6]
+    assert player.get_playlist_video_ids(player.get_playlist("my_playlist")) == [
+        "funny_dogs_video_id"]
+
+
+def test_retag_video_keeps_flag(capfd):
+    player = VideoPlayer()
+    player.flag_video("funny_dogs_video_id", "spam")
+    player.retag_video("funny_dogs_video_id", ["#puppy"])
+    player.allow_video("funny_dogs_video_id")
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert "Retagged video: Funny Dogs (funny_dogs_video_id) [#puppy]" in lines[1]
+    assert "Successfully removed flag from video: Funny Dogs" in lines[2]
+
+
+def test_play_random_skips_flagged_videos(capfd):
+    player = VideoPlayer()
+    player.flag_videos("spam", [
+        "funny_dogs_video_id", "amazing_cats_video_id", "another_cat_video_id",
+        "life_at_google_video_id"])
+    player.play_random_video()
+    out, err = capfd.readouterr()
+    assert "Playing video: Video about nothing" in out.splitlines()[-1]
+
+
+def test_retag_video_leaves_title_index(capfd):
+    player = VideoPlayer()
+    library = player.video_library
+    player.retag_video("another_cat_video_id", ["#kitten"])
+    capfd.readouterr()
+
+    assert library._title_tail == ""
+    assert [video.video_id for video in library.search_titles("video")] == [
+        "another_cat_video_id", "nothing_video_id"]
+    assert [video.video_id for video in library.search_tag("#kitten")] == ["another_cat_video_id"]
+    assert library.search_tag("#cat") == [library.get_video("amazing_cats_video_id")]
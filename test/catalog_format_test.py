@@ -0,0 +1,53 @@
+import pytest
+
+from src.catalog_format import CatalogFormatException
+from src.catalog_format import read_columnar_catalog
+from src.catalog_format import write_columnar_catalog
+from src.video_library import VideoLibrary
+
+ROWS = [
+    ("a_id", "Video A", ("#cat", "#animal"), None),
+    ("b_id", "Video B", (), "spam"),
+    ("c_id", "Video C", ("#animal",), None),
+]
+
+
+@pytest.mark.parametrize("compression", ["none", "zlib", "lzma"])
+def test_round_trip(tmp_path, compression):
+    path = tmp_path / "videos.vcat"
+    write_columnar_catalog(path, ROWS, compression)
+    columns = read_columnar_catalog(path)
+
+    assert columns["ids"] == ["a_id", "b_id", "c_id"]
+    assert columns["titles"] == ["Video A", "Video B", "Video C"]
+    assert columns["tags"] == [("#cat", "#animal"), (), ("#animal",)]
+    assert columns["flags"] == [None, "spam", None]
+
+
+def test_reads_only_requested_columns(tmp_path):
+    path = tmp_path / "videos.vcat"
+    write_columnar_catalog(path, ROWS)
+
+    assert read_columnar_catalog(path, ["titles"]) == {
+        "titles": ["Video A", "Video B", "Video C"]}
+    assert list(read_columnar_catalog(path, ["ids", "tags"])) == ["ids", "tags"]
+
+
+def test_rejects_text_catalog(tmp_path):
+    path = tmp_path / "videos.txt"
+    path.write_text("Video A | a_id | #cat\n")
+    with pytest.raises(CatalogFormatException):
+        read_columnar_catalog(path)
+
+
+def test_library_saves_and_loads_columnar_catalog(tmp_path):
+    library = VideoLibrary()
+    library.flag_video(library.get_video("funny_dogs_video_id"), "spam")
+    path = tmp_path / "videos.vcat"
+    library.save_columnar(path)
+    loaded = VideoLibrary(path)
+
+    assert [(v.video_id, v.title, v.tags, v.flag) for v in loaded.get_all_videos()] \
+        == [(v.video_id, v.title, v.tags, v.flag) for v in library.get_all_videos()]
+    assert [v.video_id for v in loaded.search_tag("#animal")] == [
+        "amazing_cats_video_id", "another_cat_video_id"]
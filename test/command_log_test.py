@@ -0,0 +1,52 @@
+from unittest import mock
+
+from src.command_log import CommandRecorder
+from src.command_log import read_log
+from src.command_parser import CommandParser
+from src.replay import format_report
+from src.replay import percentile
+from src.replay import replay
+from src.video_player import VideoPlayer
+
+
+@mock.patch('builtins.input', lambda *args: '1')
+def record_session(path, commands):
+    player = VideoPlayer()
+    parser = CommandParser(player)
+    recorder = CommandRecorder(path, player)
+    for command in commands:
+        with recorder.record(command):
+            parser.execute_command(command.split())
+    recorder.close()
+
+
+def test_recorder_writes_commands_answers_and_output(tmp_path, capfd):
+    path = tmp_path / "session.jsonl.gz"
+    record_session(path, ["SEARCH_VIDEOS cat", "SHOW_PLAYING"])
+    entries = read_log(path)
+
+    assert [entry["cmd"] for entry in entries] == ["SEARCH_VIDEOS cat", "SHOW_PLAYING"]
+    assert entries[0]["answers"] == ["1"]
+    assert "Playing video: Amazing Cats" in entries[0]["out"]
+    assert entries[1]["out"].startswith("Currently playing: Amazing Cats")
+
+
+def test_replay_reports_latencies_and_divergences(tmp_path, capfd):
+    path = tmp_path / "session.jsonl"
+    record_session(path, ["SEARCH_VIDEOS cat", "SHOW_PLAYING", "NUMBER_OF_VIDEOS"])
+    entries = read_log(path)
+    entries[2]["out"] = "something else\n"
+
+    latencies, divergences, elapsed = replay(entries, real_time=False)
+    assert sorted(latencies) == ["NUMBER_OF_VIDEOS", "SEARCH_VIDEOS", "SHOW_PLAYING"]
+    assert divergences == [(2, "NUMBER_OF_VIDEOS")]
+    report = format_report(latencies, divergences, elapsed)
+    assert "3 commands in" in report
+    assert "1 commands diverged from the recording" in report
+
+
+def test_percentile_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 0.50) == 50
+    assert percentile(values, 0.99) == 99
+    assert percentile([], 0.5) == 0.0
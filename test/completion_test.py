@@ -0,0 +1,29 @@
+from src.video_library import VideoLibrary
+from src.video_player import VideoPlayer
+
+
+def test_complete_matches_ids_and_titles():
+    library = VideoLibrary()
+    assert library.complete("another") == ["another_cat_video_id"]
+    assert library.complete("AMAZING") == ["amazing_cats_video_id"]
+    assert library.complete("life at") == ["life_at_google_video_id"]
+
+
+def test_complete_respects_limit_and_deduplicates():
+    library = VideoLibrary()
+    assert library.complete("a") == ["amazing_cats_video_id",
+                                     "another_cat_video_id"]
+    assert library.complete("a", limit=1) == ["amazing_cats_video_id"]
+    assert library.complete("zzz") == []
+
+
+def test_complete_command(capfd):
+    player = VideoPlayer()
+    player.complete("funny")
+    player.complete("xyz")
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert len(lines) == 3
+    assert "Here are the completions for funny:" in lines[0]
+    assert "Funny Dogs (funny_dogs_video_id) [#dog #animal]" in lines[1]
+    assert "No completions for xyz" in lines[2]
@@ -0,0 +1,68 @@
+from src import duplicate_finder
+from src.duplicate_finder import DuplicateFinder
+from src.video_library import VideoLibrary
+from src.video_player import VideoPlayer
+
+CATALOG = """Amazing Cats | amazing_cats_video_id |  #cat , #animal
+Amazing Cats!! | amazing_cats_reupload_id |  #cat , #animal
+AMAZING cats (reupload) | amazing_cats_copy_id |  #cat , #animal
+Funny Dogs | funny_dogs_video_id |  #dog , #animal
+Life at Google | life_at_google_video_id |  #google , #career
+Video about nothing | nothing_video_id |
+"""
+
+
+def write_catalog(tmp_path):
+    path = tmp_path / "videos.txt"
+    path.write_text(CATALOG)
+    return str(path)
+
+
+def test_similar_finds_reuploads(tmp_path):
+    library = VideoLibrary(write_catalog(tmp_path))
+    finder = DuplicateFinder(library)
+    cats = library.get_ordinal("amazing_cats_video_id")
+    similar = [library.get_video_by_ordinal(ordinal).video_id for ordinal, _ in finder.similar(cats)]
+    assert set(similar) == {"amazing_cats_reupload_id", "amazing_cats_copy_id"}
+    assert finder.similar(library.get_ordinal("funny_dogs_video_id")) == []
+    assert finder.groups() == [sorted(library.get_ordinal(video_id) for video_id in (
+        "amazing_cats_video_id", "amazing_cats_reupload_id", "amazing_cats_copy_id"))]
+
+
+def test_process_pool_builds_same_signatures(tmp_path, monkeypatch):
+    library = VideoLibrary(write_catalog(tmp_path))
+    serial = DuplicateFinder(library, processes=1)
+    monkeypatch.setattr(duplicate_finder, "_CHUNK_SIZE", 2)
+    pooled = DuplicateFinder(library, processes=2)
+    assert pooled._signatures == serial._signatures
+
+
+def test_find_duplicates(tmp_path, capfd):
+    player = VideoPlayer(catalog_path=write_catalog(tmp_path))
+    player.flag_video("amazing_cats_copy_id", "reupload")
+    player.find_duplicates("amazing_cats_reupload_id")
+    player.find_duplicates("funny_dogs_video_id")
+    player.find_duplicates("missing_video_id")
+    player.find_duplicates()
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert lines[1] == "Here are possible duplicates of Amazing Cats!!:"
+    assert lines[2].startswith("1) Amazing Cats (amazing_cats_video_id) [#cat #animal] - ")
+    assert lines[3].startswith("2) AMAZING cats (reupload) (amazing_cats_copy_id) [#cat #animal]"
+                               " - FLAGGED (reason: reupload) - ")
+    assert lines[4:] == [
+        "No duplicates found for Funny Dogs",
+        "Cannot find duplicates: Video does not exist",
+        "Here are the possible duplicate groups:",
+        "Group 1:",
+        "  Amazing Cats (amazing_cats_video_id) [#cat #animal]",
+        "  Amazing Cats!! (amazing_cats_reupload_id) [#cat #animal]",
+        "  AMAZING cats (reupload) (amazing_cats_copy_id) [#cat #animal] - FLAGGED (reason: reupload)",
+    ]
+
+
+def test_find_duplicates_none(capfd):
+    player = VideoPlayer()
+    player.find_duplicates()
+    out, err = capfd.readouterr()
+    assert out.splitlines() == ["No duplicates found"]
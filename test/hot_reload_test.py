@@ -0,0 +1,114 @@
+import os
+
+from src.video_library import VideoLibrary
+from src.video_player import VideoPlayer
+
+CATALOG = """Funny Dogs | funny_dogs_video_id |  #dog , #animal
+Amazing Cats | amazing_cats_video_id |  #cat , #animal
+Life at Google | life_at_google_video_id |  #google , #career
+"""
+
+UPDATED_CATALOG = """Funny Dogs | funny_dogs_video_id |  #dog , #animal
+Amazing Kittens | amazing_cats_video_id |  #cat
+Life at Google | life_at_google_video_id |  #google , #career
+New Video | new_video_id |  #new
+"""
+
+
+def write_catalog(path, text):
+    path.write_text(text)
+    # Bump the mtime explicitly so the change is seen on coarse clocks.
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+
+def test_poll_catalog_without_changes(tmp_path):
+    catalog = tmp_path / "videos.txt"
+    catalog.write_text(CATALOG)
+    library = VideoLibrary(catalog)
+
+    assert library.poll_catalog() is None
+
+
+def test_poll_catalog_applies_diff_and_keeps_flags(tmp_path):
+    catalog = tmp_path / "videos.txt"
+    catalog.write_text(CATALOG)
+    library = VideoLibrary(catalog)
+    library.flag_video(library.get_video("amazing_cats_video_id"), "spam")
+    write_catalog(catalog, UPDATED_CATALOG)
+
+    diff = library.poll_catalog()
+    assert diff.added == ["new_video_id"]
+    assert diff.removed == []
+    assert diff.updated == ["amazing_cats_video_id"]
+
+    video = library.get_video("amazing_cats_video_id")
+    assert video.title == "Amazing Kittens"
+    assert video.tags == ("#cat",)
+    assert video.flag == "spam"
+    assert [v.video_id for v in library.search_titles("kitten")] == [
+        "amazing_cats_video_id"]
+    assert library.search_titles("amazing cats") == []
+    assert library.complete("new") == ["new_video_id"]
+
+
+def test_reload_removes_videos_from_playlists_and_playback(tmp_path, capfd):
+    catalog = tmp_path / "videos.txt"
+    catalog.write_text(CATALOG)
+    player = VideoPlayer(catalog_path=catalog)
+    player.create_playlist("my_playlist")
+    player.add_videos_to_playlist("my_playlist", [
+        "funny_dogs_video_id", "life_at_google_video_id"])
+    player.play_video("life_at_google_video_id")
+    write_catalog(catalog, CATALOG.splitlines(True)[0])
+
+    player.check_for_library_updates()
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert "Stopping video: Life at Google" in lines[-2]
+    assert "Catalog reloaded: 0 added, 2 removed, 0 updated" in lines[-1]
+    assert player.get_playlist_video_ids(player.get_playlist("my_playlist")) == [
+        "funny_dogs_video_id"]
+
+
+def test_reloaded_title_keeps_search_order(tmp_path):
+    catalog = tmp_path / "videos.txt"
+    catalog.write_text(CATALOG)
+    library = VideoLibrary(catalog)
+    write_catalog(catalog, CATALOG.replace("Funny Dogs", "Funny Dogs at Google"))
+
+    library.poll_catalog()
+    assert [v.video_id for v in library.search_titles("google")] == [
+        "funny_dogs_video_id", "life_at_google_video_id"]
+
+
+def test_reload_keeps_runtime_catalog_changes(tmp_path, capfd):
+    catalog = tmp_path / "videos.txt"
+    catalog.write_text(CATALOG)
+    player = VideoPlayer(catalog_path=catalog)
+    player.add_video("bird_video_id", "Bird Song", ["#bird"])
+    player.remove_video_from_library("funny_dogs_video_id")
+    player.retag_video("life_at_google_video_id", ["#work"])
+    player.create_playlist("my_playlist")
+    player.add_videos_to_playlist("my_playlist", ["bird_video_id"])
+    write_catalog(catalog, CATALOG + "New Video | new_video_id |  #new\n")
+
+    player.check_for_library_updates()
+    out, err = capfd.readouterr()
+    assert "Catalog reloaded: 1 added, 0 removed, 0 updated" in out.splitlines()[-1]
+    assert player.get_playlist_video_ids(player.get_playlist("my_playlist")) == ["bird_video_id"]
+    assert player.get_video("funny_dogs_video_id") is None
+    assert player.get_video("life_at_google_video_id").tags == ("#work",)
+
+
+def test_poll_catalog_keeps_catalog_on_malformed_file(tmp_path):
+    catalog = tmp_path / "videos.txt"
+    catalog.write_text(CATALOG)
+    library = VideoLibrary(catalog)
+    write_catalog(catalog, CATALOG + "Half written | half_")
+
+    assert library.poll_catalog() is None
+    assert library.poll_catalog() is None
+    assert len(library.get_all_videos()) == 3
+    write_catalog(catalog, UPDATED_CATALOG)
+    assert library.poll_catalog().added == ["new_video_id"]
@@ -0,0 +1,89 @@
+import http.client
+import json
+import threading
+
+import pytest
+
+from src.http_api import start_server
+from src.run import _unlocked_reader
+from src.video_player import VideoPlayer
+
+
+@pytest.fixture
+def api():
+    player = VideoPlayer()
+    player.renderer = None
+    server = start_server(player, 0)
+    yield player, server
+    server.shutdown()
+    server.server_close()
+
+
+def get(server, path, etag=None):
+    connection = http.client.HTTPConnection(*server.server_address)
+    connection.request("GET", path, headers={"If-None-Match": etag} if etag else {})
+    response = connection.getresponse()
+    body = response.read()
+    connection.close()
+    return response.status, response.getheader("ETag"), json.loads(body) if body else None
+
+
+def test_videos_listing_and_not_modified(api):
+    player, server = api
+    status, etag, videos = get(server, "/videos")
+    assert status == 200
+    assert [video["id"] for video in videos][:2] == ["amazing_cats_video_id", "another_cat_video_id"]
+
+    assert get(server, "/videos", etag)[:2] == (304, etag)
+    player.flag_video("amazing_cats_video_id", "spam")
+    status, new_etag, videos = get(server, "/videos", etag)
+    assert (status, videos[0]["flag"]) == (200, "spam")
+    assert new_etag != etag
+
+
+def test_search_and_single_video(api):
+    player, server = api
+    assert [video["id"] for video in get(server, "/search?q=cat")[2]] == \
+        ["amazing_cats_video_id", "another_cat_video_id"]
+    assert [video["id"] for video in get(server, "/search?tag=%23dog")[2]] == ["funny_dogs_video_id"]
+    assert get(server, "/search?tags=%23cat%20AND")[0] == 400
+    assert get(server, "/videos/funny_dogs_video_id")[2]["title"] == "Funny Dogs"
+    assert get(server, "/videos/nope")[0] == 404
+
+
+def test_playlist_etags_follow_playlist_changes(api):
+    player, server = api
+    player.create_playlist("my_playlist")
+    status, etag, playlist = get(server, "/playlists/my_playlist")
+    assert (status, playlist) == (200, {"name": "my_playlist", "videos": []})
+    assert get(server, "/playlists/MY_PLAYLIST", etag)[0] == 304
+
+    player.add_to_playlist("my_playlist", "funny_dogs_video_id")
+    status, etag, playlist = get(server, "/playlists/my_playlist", etag)
+    assert [video["id"] for video in playlist["videos"]] == ["funny_dogs_video_id"]
+
+    player.delete_playlist("my_playlist")
+    player.create_playlist("my_playlist")
+    assert get(server, "/playlists/my_playlist", etag)[0] == 200
+    assert get(server, "/playlists")[2] == ["my_playlist"]
+
+
+def test_etags_do_not_match_across_servers(api):
+    player, server = api
+    etag = get(server, "/videos")[1]
+    other = start_server(player, 0)
+    try:
+        assert get(other, "/videos", etag)[0] == 200
+    finally:
+        other.shutdown()
+        other.server_close()
+
+
+def test_prompt_answer_is_read_without_the_lock():
+    lock = threading.Lock()
+    held = []
+    reader = _unlocked_reader(lambda: held.append(lock.locked()) or "yes", lock)
+    with lock:
+        assert reader() == "yes"
+        assert lock.locked()
+    assert held == [False]
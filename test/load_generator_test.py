@@ -0,0 +1,56 @@
+import threading
+
+from src.load_generator import InProcessSession
+from src.load_generator import SessionServer
+from src.load_generator import SocketSession
+from src.load_generator import VirtualUser
+from src.load_generator import DEFAULT_MIX
+from src.load_generator import find_knee
+from src.load_generator import parse_mix
+from src.load_generator import run_level
+from src.playback_clock import PlaybackClock
+from src.video_library import VideoLibrary
+
+
+def test_virtual_user_commands_are_valid():
+    library = VideoLibrary()
+    session = InProcessSession(library, PlaybackClock(), threading.Lock())
+    user = VirtualUser(library, DEFAULT_MIX, seed=3)
+    assert all(session.execute(user.next_command()) for _ in range(2000))
+
+
+def test_parse_mix():
+    assert parse_mix("play=3,SEARCH_VIDEOS") == {"PLAY": 3.0, "SEARCH_VIDEOS": 1.0}
+
+
+def test_run_level_in_process():
+    library = VideoLibrary()
+    clock, lock = PlaybackClock(), threading.Lock()
+    level = run_level(3, 0.2, lambda: InProcessSession(library, clock, lock), library, warmup=0)
+
+    assert level["users"] == 3
+    assert level["commands"] > 0
+    assert level["errors"] == 0
+    assert level["throughput"] == level["commands"] / 0.2
+    assert set(level["latencies"]) <= set(DEFAULT_MIX)
+
+
+def test_run_level_over_socket():
+    library = VideoLibrary()
+    server = SessionServer(library, PlaybackClock())
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        level = run_level(2, 0.2, lambda: SocketSession(server.server_address), library,
+                          {"PLAY": 1, "SHOW_PLAYLIST": 1}, warmup=0)
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert level["commands"] > 0
+    assert level["errors"] == 0
+
+
+def test_find_knee():
+    levels = [{"users": users, "throughput": throughput} for users, throughput in
+              [(1, 100), (2, 190), (4, 350), (8, 400), (16, 410), (32, 405)]]
+    assert find_knee(levels) == 4
+    assert find_knee(levels[:2]) == 2
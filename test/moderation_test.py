@@ -0,0 +1,87 @@
+from src.command_parser import CommandParser
+from src.video_library import VideoLibrary
+from src.video_player import VideoPlayer
+
+
+def test_show_flagged_counts_reasons(capfd):
+    player = VideoPlayer()
+    player.show_flagged()
+    player.flag_videos("spam", ["funny_dogs_video_id", "life_at_google_video_id"])
+    player.flag_video("amazing_cats_video_id", "dont_like_cats")
+    player.show_flagged()
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert lines[0] == "No videos are flagged"
+    assert lines[3:] == [
+        "Flagged videos by reason:",
+        "  spam: 2",
+        "  dont_like_cats: 1",
+    ]
+
+
+def test_show_flagged_with_reason(capfd):
+    player = VideoPlayer()
+    player.flag_video("life_at_google_video_id", "spam")
+    player.flag_video("funny_dogs_video_id", "spam")
+    player.show_flagged("spam")
+    player.show_flagged("other")
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert lines[2:] == [
+        "Here are the videos flagged for spam:",
+        "Life at Google (life_at_google_video_id) [#google #career]",
+        "Funny Dogs (funny_dogs_video_id) [#dog #animal]",
+        "No videos flagged for other",
+    ]
+
+
+def test_allow_by_reason(capfd):
+    player = VideoPlayer()
+    player.flag_videos("spam", ["funny_dogs_video_id", "life_at_google_video_id"])
+    player.flag_video("amazing_cats_video_id", "dont_like_cats")
+    player.allow_by_reason("spam")
+    player.allow_by_reason("spam")
+    player.play_video("funny_dogs_video_id")
+    player.show_flagged()
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert lines[2:] == [
+        "Removed flag from 2 videos (reason: spam)",
+        "Cannot remove flags: No videos flagged for spam",
+        "Playing video: Funny Dogs",
+        "Flagged videos by reason:",
+        "  dont_like_cats: 1",
+    ]
+
+
+def test_index_follows_removals_and_restores():
+    library = VideoLibrary()
+    library.flag_video(library.get_video("funny_dogs_video_id"), "spam")
+    library.flag_video(library.get_video("amazing_cats_video_id"), "spam")
+    library.remove_video("funny_dogs_video_id")
+    assert [video.video_id for video in library.get_flagged_videos("spam")] == ["amazing_cats_video_id"]
+
+    library.restore_flags([(library.get_ordinal("another_cat_video_id"), "old")])
+    assert library.flag_reason_counts() == {"old": 1}
+    assert library.get_flagged_videos("spam") == []
+    assert library.get_video("amazing_cats_video_id").flag is None
+    assert library.flagged_ordinals() == [library.get_ordinal("another_cat_video_id")]
+    assert sorted(library._playable_ids) == sorted(
+        video.video_id for video in library.get_all_videos() if not video.flag)
+
+
+def test_commands_take_multi_word_reasons(capfd):
+    player = VideoPlayer()
+    parser = CommandParser(player)
+    player.flag_video("funny_dogs_video_id")
+    player.flag_video("amazing_cats_video_id")
+    parser.execute_command(["SHOW_FLAGGED", "Not", "supplied"])
+    parser.execute_command(["ALLOW_BY_REASON", "Not", "supplied"])
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert lines[2:] == [
+        "Here are the videos flagged for Not supplied:",
+        "Funny Dogs (funny_dogs_video_id) [#dog #animal]",
+        "Amazing Cats (amazing_cats_video_id) [#cat #animal]",
+        "Removed flag from 2 videos (reason: Not supplied)",
+    ]
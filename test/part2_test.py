@@ -141,6 +141,16 @@ def test_show_playlist_nonexistent_playlist(capfd):
     assert "Cannot show playlist another_playlist: Playlist does not exist" in lines[0]
 
 
+def test_show_playlist_nonexistent_playlist_among_others(capfd):
+    player = VideoPlayer()
+    player.create_playlist("my_playlist")
+    player.show_playlist("another_playlist")
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert len(lines) == 2
+    assert "Cannot show playlist another_playlist: Playlist does not exist" in lines[1]
+
+
 def test_remove_from_playlist(capfd):
     player = VideoPlayer()
     player.create_playlist("my_cool_playlist")
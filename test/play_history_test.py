@@ -0,0 +1,43 @@
+from src import play_history
+from src.play_history import PlayHistory
+from src.video_player import VideoPlayer
+
+
+def test_ring_buffer_keeps_most_recent_events():
+    history = PlayHistory(capacity=3)
+    for ordinal in range(5):
+        history.record(play_history.PLAY, ordinal)
+
+    assert len(history) == 3
+    assert [ordinal for _, _, ordinal in history.recent()] == [4, 3, 2]
+    assert [ordinal for _, _, ordinal in history.recent(2)] == [4, 3]
+
+
+def test_history_command(capfd):
+    player = VideoPlayer()
+    player.show_history()
+    player.play_video("amazing_cats_video_id")
+    player.pause_video()
+    player.continue_video()
+    player.play_video("funny_dogs_video_id")
+    capfd.readouterr()
+    player.show_history(3)
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert len(lines) == 4
+    assert "Here is your play history:" in lines[0]
+    assert lines[1].startswith("1) Played: Funny Dogs")
+    assert lines[2].startswith("2) Stopped: Amazing Cats")
+    assert lines[3].startswith("3) Continued: Amazing Cats")
+
+
+def test_play_last(capfd):
+    player = VideoPlayer()
+    player.play_last()
+    player.play_video("amazing_cats_video_id")
+    player.play_video("funny_dogs_video_id")
+    player.play_last()
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert "Cannot play last video: No previously played video" in lines[0]
+    assert "Playing video: Amazing Cats" in lines[-1]
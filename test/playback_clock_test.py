@@ -0,0 +1,105 @@
+import random
+
+from src.playback_clock import PlaybackClock
+from src.playback_clock import PlaybackPosition
+from src.playback_clock import TimerWheel
+from src.playback_clock import format_position
+from src.video_player import VideoPlayer
+
+
+class FakeTime:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_position_is_computed_from_timestamps():
+    position = PlaybackPosition(100.0, now=10.0)
+    assert position.position(25.0) == 15.0
+    position.pause(30.0)
+    assert position.position(90.0) == 20.0
+    position.resume(90.0)
+    assert position.remaining(100.0) == 70.0
+    assert position.position(500.0) == 100.0
+    assert format_position(75.9) == "1:15"
+    assert format_position(3725) == "1:02:05"
+
+
+def test_timer_wheel_fires_every_timer_once_when_due():
+    random.seed(7)
+    wheel = TimerWheel(tick=1.0, slot_bits=3, levels=3)     # 512 tick span, forces cascades
+    fired, deadlines = [], {}
+    for index in range(2000):
+        deadlines[index] = random.uniform(0, 3000)
+        wheel.schedule(deadlines[index], lambda index=index: fired.append(index))
+    cancelled = set(random.sample(range(2000), 200))
+    for handle in cancelled:
+        wheel.cancel(handle)
+
+    now = 0.0
+    while now < 3100:
+        now += random.uniform(0, 40)
+        already = len(fired)
+        wheel.advance(now)
+        assert all(deadlines[index] <= now for index in fired[already:])
+        fired_set = set(fired)
+        assert all(index in fired_set for index, deadline in deadlines.items()
+                   if deadline <= now - 1 and index not in cancelled)
+    assert sorted(fired) == sorted(set(range(2000)) - cancelled)
+    assert len(wheel) == 0
+
+
+def test_show_playing_reports_position(capfd):
+    fake_time = FakeTime()
+    player = VideoPlayer(playback_clock=PlaybackClock(fake_time))
+    player.play_video("amazing_cats_video_id")
+    fake_time.now += 65
+    player.pause_video()
+    fake_time.now += 30
+    player.show_playing()
+    out, err = capfd.readouterr()
+    assert out.splitlines()[2] == \
+        "Currently playing: Amazing Cats (amazing_cats_video_id) [#cat #animal] - PAUSED - 1:05 / 3:00"
+
+
+def test_video_end_advances_queue(capfd):
+    fake_time = FakeTime()
+    player = VideoPlayer(playback_clock=PlaybackClock(fake_time))
+    player.create_playlist("my_playlist")
+    player.add_videos_to_playlist("my_playlist", ["amazing_cats_video_id", "funny_dogs_video_id"])
+    player.play_playlist("my_playlist")
+    fake_time.now += 100
+    player.pause_video()
+    fake_time.now += 1000                                   # Paused videos do not end
+    player.advance_clock()
+    player.continue_video()
+    fake_time.now += 81
+    player.advance_clock()
+    fake_time.now += 181
+    player.advance_clock()
+    player.show_playing()
+    out, err = capfd.readouterr()
+    assert out.splitlines()[4:] == [
+        "Pausing video: Amazing Cats",
+        "Continuing video: Amazing Cats",
+        "Finished video: Amazing Cats",
+        "Playing video: Funny Dogs",
+        "Finished video: Funny Dogs",
+        "No video is currently playing",
+    ]
+
+
+def test_shared_clock_ends_many_sessions():
+    fake_time = FakeTime()
+    clock = PlaybackClock(fake_time)
+    players = [VideoPlayer(playback_clock=clock) for _ in range(3)]
+    for delay, player in enumerate(players):
+        player.renderer = None
+        player.video_duration = 60.0 * (delay + 1)
+        player.play_video("amazing_cats_video_id")
+    fake_time.now += 121
+    assert players[0].advance_clock() == 2
+    assert [player.show_playing().status for player in players] == ["empty", "empty", "ok"]
+    assert clock.pending == 1
@@ -0,0 +1,66 @@
+from src.video_player import VideoPlayer
+
+
+def make_player():
+    player = VideoPlayer()
+    player.create_playlist("my_playlist")
+    player.add_videos_to_playlist("my_playlist", [
+        "amazing_cats_video_id", "funny_dogs_video_id", "nothing_video_id"])
+    return player
+
+
+def test_play_playlist_next_and_previous(capfd):
+    player = make_player()
+    capfd.readouterr()
+    player.play_playlist("my_playlist")
+    player.next_video()
+    player.previous_video()
+    player.previous_video()
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert "Playing playlist: my_playlist" in lines[0]
+    assert "Playing video: Amazing Cats" in lines[1]
+    assert "Playing video: Funny Dogs" in lines[3]
+    assert "Playing video: Amazing Cats" in lines[5]
+    assert "Cannot play previous video: Reached the start of my_playlist" \
+           in lines[6]
+
+
+def test_queue_skips_flagged_and_follows_playlist_edits(capfd):
+    player = make_player()
+    player.play_playlist("my_playlist")
+    player.flag_video("funny_dogs_video_id")
+    player.remove_from_playlist("my_playlist", "nothing_video_id")
+    player.add_to_playlist("my_playlist", "life_at_google_video_id")
+    capfd.readouterr()
+    player.next_video()
+    player.next_video()
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert "Playing video: Life at Google" in lines[1]
+    assert "Cannot play next video: Reached the end of my_playlist" in lines[2]
+
+
+def test_shuffle_plays_every_video_once(capfd):
+    player = make_player()
+    player.play_playlist("my_playlist", shuffle=True)
+    player.next_video()
+    player.next_video()
+    player.next_video()
+    out, err = capfd.readouterr()
+    played = [line for line in out.splitlines()
+              if line.startswith("Playing video:")]
+    assert sorted(played) == ["Playing video: Amazing Cats",
+                              "Playing video: Funny Dogs",
+                              "Playing video: Video about nothing"]
+    assert "Reached the end of my_playlist" in out.splitlines()[-1]
+
+
+def test_next_without_playlist(capfd):
+    player = VideoPlayer()
+    player.next_video()
+    player.play_playlist("missing")
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert "Cannot play next video: No playlist is being played" in lines[0]
+    assert "Cannot play playlist missing: Playlist does not exist" in lines[1]
@@ -0,0 +1,90 @@
+import json
+import os
+import subprocess
+import sys
+
+from src import player_result
+from src.player_result import render_json_lines
+from src.video_player import VideoPlayer
+
+
+def test_operations_return_structured_results(capfd):
+    player = VideoPlayer()
+    player.create_playlist("my_PLAYlist")
+    result = player.add_to_playlist("my_playlist", "amazing_cats_video_id")
+    missing = player.play_video("does_not_exist")
+    player.flag_video("funny_dogs_video_id", "dont_like_dogs")
+    flagged = player.play_video("funny_dogs_video_id")
+    capfd.readouterr()
+
+    assert result.ok
+    assert result.operation == "add_to_playlist"
+    assert result.playlist == "my_PLAYlist"
+    assert [video.video_id for video in result.videos] == ["amazing_cats_video_id"]
+    assert missing.status == player_result.NOT_FOUND
+    assert flagged.status == player_result.FLAGGED
+    assert flagged.text() == ["Cannot play video: Video is currently flagged (reason: dont_like_dogs)"]
+
+
+def test_rows_hold_videos(capfd):
+    player = VideoPlayer()
+    player.response_reader = lambda: "No"
+    result = player.search_videos("cat")
+    out, err = capfd.readouterr()
+
+    assert [video.video_id for video in result.rows] == \
+        ["amazing_cats_video_id", "another_cat_video_id"]
+    assert out.splitlines() == result.text()
+
+
+def test_no_renderer_prints_nothing(capfd):
+    player = VideoPlayer()
+    player.renderer = None
+    result = player.show_all_videos()
+    player.play_video("amazing_cats_video_id")
+    out, err = capfd.readouterr()
+
+    assert out == ""
+    assert len(result.rows) == 5
+    assert player.show_playing().rows[0][0].video_id == "amazing_cats_video_id"
+
+
+def test_json_lines_renderer(capfd):
+    player = VideoPlayer()
+    player.renderer = render_json_lines
+    player.play_video("amazing_cats_video_id")
+    player.play_video("life_at_google_video_id")
+    player.flag_videos("spam", ["funny_dogs_video_id", "nope"])
+    out, err = capfd.readouterr()
+    lines = [json.loads(line) for line in out.splitlines()]
+
+    assert [(line["op"], line["status"], line["videos"]) for line in lines] == [
+        ("play_video", "ok", ["amazing_cats_video_id"]),
+        ("stop_video", "ok", ["amazing_cats_video_id"]),
+        ("play_video", "ok", ["life_at_google_video_id"]),
+        ("flag_videos", "ok", ["funny_dogs_video_id"]),
+    ]
+    assert lines[3]["rows"] == [["nope", "Video does not exist"]]
+
+
+def test_json_renderer_declines_search_prompt(capfd, monkeypatch):
+    monkeypatch.setattr("builtins.input", lambda *args: "1")
+    player = VideoPlayer()
+    player.renderer = render_json_lines
+    player.search_videos("cat")
+    out, err = capfd.readouterr()
+
+    assert [json.loads(line)["op"] for line in out.splitlines()] == ["search_videos"]
+
+
+def test_run_json_output_runs_every_command():
+    completed = subprocess.run(
+        [sys.executable, "-m", "src.run", "--output", "json"],
+        input="SEARCH_VIDEOS cat\nNUMBER_OF_VIDEOS\nEXIT\n",
+        capture_output=True, text=True, timeout=30,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    operations = [json.loads(line[line.index("{"):])["op"]     # After any "YT> " prompts
+                  for line in completed.stdout.splitlines() if "{" in line]
+
+    assert completed.returncode == 0
+    assert operations == ["search_videos", "number_of_videos"]
@@ -0,0 +1,98 @@
+from src.video_player import VideoPlayer
+
+
+def make_player():
+    player = VideoPlayer()
+    player.flag_video("funny_dogs_video_id", "spam")
+    player.create_playlist("my_playlist")
+    player.add_videos_to_playlist("my_playlist", [
+        "nothing_video_id", "amazing_cats_video_id"])
+    player.play_video("life_at_google_video_id")
+    player.pause_video()
+    return player
+
+
+def test_save_and_load_state(tmp_path, capfd):
+    path = tmp_path / "state.bin"
+    make_player().save_state(path)
+    player = VideoPlayer()
+    player.load_state(path)
+    player.show_playing()
+    player.show_playlist("my_playlist")
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert f"Saved state to {path}: 1 flags, 1 playlists" in lines[5]
+    assert f"Loaded state from {path}: 1 flags, 1 playlists" in lines[6]
+    assert "Currently playing: Life at Google (life_at_google_video_id) " \
+           "[#google #career] - PAUSED" in lines[7]
+    assert "Video about nothing (nothing_video_id) []" in lines[9]
+    assert "Amazing Cats (amazing_cats_video_id) [#cat #animal]" in lines[10]
+    assert player.get_video("funny_dogs_video_id").flag == "spam"
+
+
+def test_load_state_remaps_changed_catalog(tmp_path, capfd):
+    path = tmp_path / "state.bin"
+    make_player().save_state(path)
+    player = VideoPlayer()
+    player.flag_video("another_cat_video_id")
+    player.remove_video_from_library("nothing_video_id")
+    player.add_video("new_video_id", "New")
+    player.load_state(path)
+    out, err = capfd.readouterr()
+    assert "1 entries for missing videos dropped" in out.splitlines()[-1]
+    assert player.get_video("another_cat_video_id").flag is None
+    assert player.get_video("funny_dogs_video_id").flag == "spam"
+    assert player.get_playlist_video_ids(player.get_playlist("my_playlist")) \
+        == ["amazing_cats_video_id"]
+
+
+def test_load_state_rejects_other_files(tmp_path, capfd):
+    path = tmp_path / "state.bin"
+    path.write_bytes(b"not a snapshot")
+    player = VideoPlayer()
+    player.load_state(path)
+    player.load_state(tmp_path / "missing.bin")
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert "is not a player state snapshot" in lines[0]
+    assert "Cannot load state: No such file or directory" in lines[1]
+
+
+def test_load_state_rejects_damaged_snapshots(tmp_path, capfd):
+    from array import array
+    from src import player_state
+
+    path = tmp_path / "state.bin"
+    make_player().save_state(path)
+    contents = path.read_bytes()
+    state = player_state.read_state(path)
+    state = {key: bytes(value) if isinstance(value, memoryview) else value
+             for key, value in state.items()}
+
+    damaged = []
+    for index, data in enumerate((contents[:20], contents[:-3], contents + b"x",
+                                  player_state.MAGIC + contents[8:20] + b"\x00" * (len(contents) - 20))):
+        damaged.append(tmp_path / f"bytes{index}.bin")
+        damaged[-1].write_bytes(data)
+    for index, changes in enumerate(({"playlist_names": None}, {"flagged": array("I", [10 ** 6])},
+                                     {"playlist_ordinals": array("I", [10 ** 6, 0])},
+                                     {"playing": 99}, {"reason_codes": array("I", [7])},
+                                     {"playlist_offsets": array("Q", [0, 5])},
+                                     {"playlist_ordinals": array("I", [3, 3])})):
+        damaged.append(tmp_path / f"state{index}.bin")
+        snapshot = dict(state, **changes)
+        if "playlist_names" in changes:
+            del snapshot["playlist_names"]
+        player_state.write_state(damaged[-1], {key: player_state.out_of_band(array("B", value))
+                                               if isinstance(value, bytes) else value
+                                               for key, value in snapshot.items()})
+
+    player = make_player()
+    capfd.readouterr()
+    for damaged_path in damaged:
+        result = player.load_state(damaged_path)
+        assert result.status == "invalid_argument", damaged_path
+    out, err = capfd.readouterr()
+    assert all(line.startswith("Cannot load state: ") for line in out.splitlines())
+    assert player.get_video("funny_dogs_video_id").flag == "spam"      # Left untouched
+    assert len(player.get_playlist("my_playlist").get_all_ordinals) == 2
@@ -0,0 +1,74 @@
+from src.command_parser import CommandParser
+from src.playlist_names import PlaylistNames
+from src.video_player import VideoPlayer
+
+
+def test_playlist_names_stay_sorted():
+    names = PlaylistNames(["rock", "Jazz", "blues"])
+    assert names.add("Rap")
+    assert not names.add("JAZZ")
+    assert list(names) == ["Jazz", "Rap", "blues", "rock"]             # Plain string order
+    assert names.get("jazz") == "Jazz"
+    assert names.remove("RAP") == "Rap"
+    assert names.remove("rap") is None
+    assert list(names) == ["Jazz", "blues", "rock"]
+
+
+def test_playlist_names_prefix_and_paging():
+    names = PlaylistNames([f"list{index:02d}" for index in range(12)] + ["other"])
+    assert names.names("LIST1") == ["list10", "list11"]
+    assert names.names("list", 10) == ["list10", "list11"]
+    assert names.names("list", 2, 3) == ["list02", "list03", "list04"]
+    assert names.names("x") == []
+    assert len(names.names()) == 13
+
+
+def test_playlist_names_prefix_pages_follow_changes():
+    names = PlaylistNames(["rock", "Rap", "jazz"])
+    assert names.names("r", 0, 1) == ["Rap"]
+    names.add("ROCK_classics")
+    names.add("pop")
+    assert names.names("R") == ["ROCK_classics", "Rap", "rock"]
+    names.remove("rap")
+    assert names.names("r", 1) == ["rock"]
+    assert names.names("j") == ["jazz"]
+
+
+def test_show_all_playlists_prefix_and_page(capfd):
+    player = VideoPlayer()
+    parser = CommandParser(player)
+    for name in ("rock", "Rap", "jazz", "ROCK_classics"):
+        player.create_playlist(name)
+    player.playlist_page_size = 2
+    capfd.readouterr()
+    parser.execute_command(["SHOW_ALL_PLAYLISTS", "r"])
+    parser.execute_command(["SHOW_ALL_PLAYLISTS", "PAGE", "2"])
+    parser.execute_command(["SHOW_ALL_PLAYLISTS", "ro", "PAGE", "1"])
+    parser.execute_command(["SHOW_ALL_PLAYLISTS", "PAGE", "3"])
+    parser.execute_command(["SHOW_ALL_PLAYLISTS", "pop"])
+    out, err = capfd.readouterr()
+    assert out.splitlines() == [
+        "Showing playlists starting with r:",
+        "ROCK_classics",
+        "Rap",
+        "rock",
+        "Showing all playlists (page 2 of 2):",
+        "jazz",
+        "rock",
+        "Showing playlists starting with ro (page 1 of 1):",
+        "ROCK_classics",
+        "rock",
+        "Cannot show page 3: There are 2 pages",
+        "No playlists start with pop",
+    ]
+
+
+def test_deleted_playlist_leaves_listing(capfd):
+    player = VideoPlayer()
+    player.create_playlist("my_playlist")
+    player.create_playlist("another_playlist")
+    player.delete_playlist("MY_PLAYLIST")
+    player.create_playlist("My_Playlist")
+    player.show_all_playlists()
+    out, err = capfd.readouterr()
+    assert out.splitlines()[-3:] == ["Showing all playlists:", "My_Playlist", "another_playlist"]
@@ -0,0 +1,55 @@
+from src.video_player import VideoPlayer
+from unittest import mock
+
+
+@mock.patch('builtins.input', lambda *args: 'No')
+def test_search_playlist(capfd):
+    player = VideoPlayer()
+    player.create_playlist("my_PLAYlist")
+    player.add_to_playlist("my_playlist", "another_cat_video_id")
+    player.add_to_playlist("my_playlist", "funny_dogs_video_id")
+    player.search_playlist("MY_playlist", "cat")
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert lines[3:] == [
+        "Here are the results for cat in MY_playlist:",
+        "1) Another Cat Video (another_cat_video_id) [#cat #animal]",
+        "Would you like to play any of the above? If yes, specify the number of the video.",
+        "If your answer is not a valid number, we will assume it's a no.",
+    ]
+
+
+@mock.patch('builtins.input', lambda *args: '1')
+def test_search_playlist_tag_and_play_answer(capfd):
+    player = VideoPlayer()
+    player.create_playlist("my_playlist")
+    player.add_to_playlist("my_playlist", "funny_dogs_video_id")
+    player.add_to_playlist("my_playlist", "amazing_cats_video_id")
+    player.search_playlist_tag("my_playlist", "#animal")
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert lines[3:] == [
+        "Here are the results for #animal in my_playlist:",
+        "1) Funny Dogs (funny_dogs_video_id) [#dog #animal]",
+        "2) Amazing Cats (amazing_cats_video_id) [#cat #animal]",
+        "Would you like to play any of the above? If yes, specify the number of the video.",
+        "If your answer is not a valid number, we will assume it's a no.",
+        "Playing video: Funny Dogs",
+    ]
+
+
+def test_search_playlist_no_results(capfd):
+    player = VideoPlayer()
+    player.create_playlist("my_playlist")
+    player.add_to_playlist("my_playlist", "amazing_cats_video_id")
+    player.flag_video("amazing_cats_video_id")
+    player.search_playlist("my_playlist", "cat")
+    player.search_playlist_tag("my_playlist", "#dog")
+    player.search_playlist("another_playlist", "cat")
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert lines[3:] == [
+        "No search results for cat in my_playlist",
+        "No search results for #dog in my_playlist",
+        "Cannot search playlist another_playlist: Playlist does not exist",
+    ]
@@ -0,0 +1,88 @@
+from src.recommender import Recommender
+from src.video import Video
+from src.video_library import VideoLibrary
+from src.video_player import VideoPlayer
+
+
+def test_similar_ranks_by_tag_overlap():
+    library = VideoLibrary()
+    recommender = Recommender(library, k=3)
+    cats = library.get_ordinal("amazing_cats_video_id")
+
+    similar = [library.get_video_by_ordinal(ordinal).video_id
+               for ordinal in recommender.similar(cats)]
+    assert similar == ["another_cat_video_id", "funny_dogs_video_id"]
+    assert recommender.similar(library.get_ordinal("nothing_video_id")) == []
+
+
+def test_recommend_playing_video_excludes_flagged(capfd):
+    player = VideoPlayer()
+    player.recommend()
+    player.flag_video("another_cat_video_id")
+    player.play_video("amazing_cats_video_id")
+    player.recommend()
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert "Cannot recommend videos: No video is currently playing" in lines[0]
+    assert "Here are videos like Amazing Cats:" in lines[3]
+    assert "1) Funny Dogs (funny_dogs_video_id) [#dog #animal]" in lines[4]
+    assert len(lines) == 5
+
+
+def test_recommend_rebuilds_after_catalog_change(capfd):
+    player = VideoPlayer()
+    player.recommend("life_at_google_video_id")
+    player.add_video("google_2_video_id", "More Google", ["#google"])
+    player.recommend("life_at_google_video_id")
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert "No recommendations for Life at Google" in lines[0]
+    assert "1) More Google (google_2_video_id) [#google]" in lines[-1]
+
+
+def test_frequent_tags_yield_candidates_by_overlap(tmp_path):
+    catalog = tmp_path / "videos.txt"
+    catalog.write_text("Target | target_id | #rock , #music\n"
+                       + "".join(f"Rock {i} | rock_{i}_id | #rock\n" for i in range(300))
+                       + "".join(f"Music {i} | music_{i}_id | #music\n" for i in range(300))
+                       + "Twin | twin_id | #rock , #music\n")
+    library = VideoLibrary(catalog)
+    similar = Recommender(library).similar(library.get_ordinal("target_id"))
+    assert library.get_video_by_ordinal(similar[0]).video_id == "twin_id"
+
+
+def test_update_matches_rebuild_after_catalog_changes():
+    library = VideoLibrary()
+    recommender = Recommender(library, k=3)
+    library.add_video(Video("Kitten", "kitten_video_id", ["#cat", "#animal"]))
+    library.retag_video("funny_dogs_video_id", ["#google"])
+    library.remove_video("another_cat_video_id")
+
+    assert recommender.update(library)
+    rebuilt = Recommender(library, k=3)
+    assert recommender.catalog_version == library.catalog_version
+    for ordinal in range(library.ordinal_count):
+        assert recommender.similar(ordinal) == rebuilt.similar(ordinal)
+    assert recommender.similar(library.get_ordinal("amazing_cats_video_id")) == [
+        library.get_ordinal("kitten_video_id")]
+
+
+def test_build_scales_linearly_with_frequent_tags(tmp_path):
+    import time
+
+    def build_seconds(size):
+        catalog = tmp_path / f"videos_{size}.txt"
+        catalog.write_text("".join(f"Video {i} | video_{i}_id | #tag{i % 97} , #tag{i % 389} , #all\n"
+                                   for i in range(size)))
+        library = VideoLibrary(catalog)
+        timings = []
+        for _ in range(2):
+            began = time.perf_counter()
+            recommender = Recommender(library)
+            timings.append(time.perf_counter() - began)
+        similar = recommender.similar(library.get_ordinal("video_0_id"))
+        assert all(ordinal % 389 == 0 or ordinal % 97 == 0 for ordinal in similar)
+        return min(timings)
+
+    # Every video has #all: scanning its postings would make 4x the videos cost 16x.
+    assert build_seconds(4000) < 8 * build_seconds(1000)
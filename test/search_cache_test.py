@@ -0,0 +1,47 @@
+from unittest import mock
+
+from src.search_cache import SearchCache
+from src.video_player import VideoPlayer
+
+
+def test_cache_evicts_least_recently_used():
+    cache = SearchCache(capacity=2)
+    cache.put("a", 0, ["x"])
+    cache.put("b", 0, ["y"])
+    assert cache.get("a", 0) == ("x",)
+    cache.put("c", 0, ["z"])
+
+    assert cache.get("b", 0) is None
+    assert cache.get("a", 0) == ("x",)
+    assert cache.get("c", 0) == ("z",)
+    assert (cache.hits, cache.misses) == (3, 1)
+
+
+def test_cache_treats_older_epoch_as_miss():
+    cache = SearchCache()
+    cache.put("a", 0, ["x"])
+
+    assert cache.get("a", 1) is None
+    assert cache.misses == 1
+
+
+@mock.patch('builtins.input', lambda *args: 'No')
+def test_repeated_search_hits_cache(capfd):
+    player = VideoPlayer()
+    player.search_videos("cat")
+    player.search_videos("CAT")
+    player.search_videos_tag("#cat")
+    assert (player._search_cache.hits, player._search_cache.misses) == (1, 2)
+
+
+@mock.patch('builtins.input', lambda *args: 'No')
+def test_flag_invalidates_cached_search(capfd):
+    player = VideoPlayer()
+    player.search_videos("cat")
+    player.flag_video("amazing_cats_video_id")
+    player.search_videos("cat")
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert "1) Amazing Cats (amazing_cats_video_id) [#cat #animal]" in lines[1]
+    assert "1) Another Cat Video (another_cat_video_id) [#cat #animal]" in lines[7]
+    assert player._search_cache.misses == 2
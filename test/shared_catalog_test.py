@@ -0,0 +1,135 @@
+import os
+import subprocess
+import sys
+import uuid
+
+import pytest
+
+from src.shared_catalog import SharedCatalog
+from src.shared_catalog import SharedVideoLibrary
+from src.video_library import VideoLibrary
+from src.video_player import VideoPlayer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def shared():
+    library = VideoLibrary()
+    library.flag_video(library.get_video("amazing_cats_video_id"), "dont_like_cats")
+    published = SharedCatalog.publish(library, f"yt_test_{uuid.uuid4().hex[:8]}")
+    yield published
+    published.close()
+
+
+def test_attached_library_matches_published_one(shared):
+    attached = SharedCatalog.attach(shared.name)
+    library = SharedVideoLibrary(attached)
+
+    assert [video.video_id for video in library.get_all_videos()] == \
+        [video.video_id for video in VideoLibrary().get_all_videos()]
+    assert library.get_video("amazing_cats_video_id").flag == "dont_like_cats"
+    assert "amazing_cats_video_id" in [video.video_id for video in library.search_titles("cat")]
+    assert library.read_only
+    del library
+    attached.close()
+
+
+def test_attached_library_reads_indexes_in_place(shared):
+    library = SharedVideoLibrary(shared)
+
+    assert not [name for name, value in vars(library).items()
+                if isinstance(value, (list, dict, set, bytearray)) and value]
+    assert library.get_ordinal("life_at_google_video_id") == 3
+    assert library.get_ordinal("missing_video_id") is None
+    assert [video.video_id for video in library.search_titles("CAT")] == \
+        ["amazing_cats_video_id", "another_cat_video_id"]
+    assert [video.video_id for video in library.search_tag("#ANIMAL")] == \
+        ["funny_dogs_video_id", "another_cat_video_id"]
+    assert library.get_video("funny_dogs_video_id").tags == ("#dog", "#animal")
+    assert library.complete("F") == ["funny_dogs_video_id"]
+    assert library.get_sorted_video_ids() == VideoLibrary().get_sorted_video_ids()
+    del library
+
+
+def test_flags_are_seen_by_other_libraries(shared):
+    first = SharedVideoLibrary(shared)
+    second = SharedVideoLibrary(shared)
+    epoch = second.epoch
+
+    first.flag_video(first.get_video("funny_dogs_video_id"), "too_loud")
+    first.allow_video(first.get_video("amazing_cats_video_id"))
+
+    assert second.get_video("funny_dogs_video_id").flag == "too_loud"
+    assert second.get_video("amazing_cats_video_id").flag is None
+    assert second.is_flagged_ordinal(second.get_ordinal("funny_dogs_video_id"))
+    assert second.epoch > epoch
+    assert second.search_tag_query("#dog AND NOT flagged") == []
+    del first, second
+
+
+def test_flags_are_seen_by_other_processes(shared):
+    script = ("import sys\n"
+              "from src.shared_catalog import SharedCatalog, SharedVideoLibrary\n"
+              "shared = SharedCatalog.attach(sys.argv[1])\n"
+              "library = SharedVideoLibrary(shared)\n"
+              "library.flag_video(library.get_video('life_at_google_video_id'), 'ads')\n"
+              "print(library.get_video('amazing_cats_video_id').flag)\n"
+              "del library\n"
+              "shared.close()\n")
+    result = subprocess.run([sys.executable, "-c", script, shared.name], cwd=ROOT,
+                            capture_output=True, text=True, check=True)
+
+    assert result.stdout == "dont_like_cats\n"
+    library = SharedVideoLibrary(shared)
+    assert library.get_video("life_at_google_video_id").flag == "ads"
+    del library
+
+
+def test_attached_player_refuses_catalog_changes(capfd, shared):
+    player = VideoPlayer(video_library=SharedVideoLibrary(shared))
+    player.add_video("new_id", "New Video")
+    player.remove_video_from_library("funny_dogs_video_id")
+    player.retag_video("funny_dogs_video_id", ["#new"])
+    player.play_video("amazing_cats_video_id")
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert lines == [
+        "Cannot add video: Catalog is read-only",
+        "Cannot remove video: Catalog is read-only",
+        "Cannot retag video: Catalog is read-only",
+        "Cannot play video: Video is currently flagged (reason: dont_like_cats)",
+    ]
+    del player
+
+
+def test_moderation_reads_shared_flags(shared):
+    first = SharedVideoLibrary(shared)
+    second = SharedVideoLibrary(shared)
+
+    first.flag_video(first.get_video("funny_dogs_video_id"), "dont_like_cats")
+    assert second.flag_reason_counts() == {"dont_like_cats": 2}
+    allowed = second.allow_by_reason("dont_like_cats")
+
+    assert sorted(video.video_id for video in allowed) == ["amazing_cats_video_id", "funny_dogs_video_id"]
+    assert first.flag_reason_counts() == {}
+    del first, second
+
+
+def test_reasons_are_cut_on_characters_and_slots_reclaimed(shared):
+    attached = SharedCatalog.attach(shared.name)
+    first, second = SharedVideoLibrary(shared), SharedVideoLibrary(attached)
+    long_reason = "a" + "é" * 300
+
+    first.flag_video(first.get_video("funny_dogs_video_id"), long_reason)
+    stored = second.get_video("funny_dogs_video_id").flag
+    assert long_reason.startswith(stored) and len(stored) > 200
+    assert [video.video_id for video in second.get_flagged_videos(long_reason)] == ["funny_dogs_video_id"]
+
+    for index in range(300):                            # More distinct reasons than slots
+        first.flag_video(first.get_video("nothing_video_id"), f"reason {index}")
+        assert second.get_video("nothing_video_id").flag == f"reason {index}"
+    assert second.get_video("funny_dogs_video_id").flag == stored
+    assert second.get_video("amazing_cats_video_id").flag == "dont_like_cats"
+    del first, second
+    attached.close()
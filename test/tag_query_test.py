@@ -0,0 +1,64 @@
+from unittest import mock
+
+import pytest
+
+from src.tag_query import TagQueryException
+from src.video import Video
+from src.video_library import VideoLibrary
+from src.video_player import VideoPlayer
+
+
+def video_ids(videos):
+    return [video.video_id for video in videos]
+
+
+def test_search_tag_query_operators():
+    library = VideoLibrary()
+    assert video_ids(library.search_tag_query("#cat AND NOT #dog")) == [
+        "amazing_cats_video_id", "another_cat_video_id"]
+    assert video_ids(library.search_tag_query("#DOG or #google")) == [
+        "funny_dogs_video_id", "life_at_google_video_id"]
+    assert video_ids(library.search_tag_query("NOT (#animal OR #career)")) == [
+        "nothing_video_id"]
+    assert library.search_tag_query("#unknown") == []
+
+
+def test_search_tag_query_excludes_flagged_and_removed():
+    library = VideoLibrary()
+    library.flag_video(library.get_video("amazing_cats_video_id"), "spam")
+    library.remove_video("funny_dogs_video_id")
+    assert video_ids(library.search_tag_query("#animal")) == [
+        "another_cat_video_id"]
+    assert video_ids(library.search_tag_query("NOT #cat")) == [
+        "life_at_google_video_id", "nothing_video_id"]
+
+
+def test_tag_postings_stay_sorted_through_retags():
+    library = VideoLibrary()
+    library.retag_video("funny_dogs_video_id", ("#cat", "#CAT"))
+    library.retag_video("another_cat_video_id", ("#dog",))
+    library.add_video(Video("Kitten", "kitten_video_id", ["#cat"]))
+    assert video_ids(library.search_tag("#cat")) == [
+        "funny_dogs_video_id", "amazing_cats_video_id", "kitten_video_id"]
+    assert video_ids(library.search_tag_query("#dog OR #cat")) == [
+        "funny_dogs_video_id", "amazing_cats_video_id", "another_cat_video_id", "kitten_video_id"]
+
+
+def test_search_tag_query_rejects_malformed_expressions():
+    library = VideoLibrary()
+    for query in ("#cat AND", "(#cat", "#cat #dog", "OR #cat"):
+        with pytest.raises(TagQueryException):
+            library.search_tag_query(query)
+
+
+@mock.patch('builtins.input', lambda *args: 'No')
+def test_search_tags_command(capfd):
+    player = VideoPlayer()
+    player.search_tags("#animal AND NOT #cat")
+    player.search_tags("#cat AND")
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert len(lines) == 5
+    assert "Here are the results for #animal AND NOT #cat:" in lines[0]
+    assert "1) Funny Dogs (funny_dogs_video_id) [#dog #animal]" in lines[1]
+    assert "Cannot search tags: Unexpected end of tag expression" in lines[4]
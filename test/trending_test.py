@@ -0,0 +1,80 @@
+from src.command_parser import CommandParser
+from src.trending import CountMinSketch
+from src.trending import HeavyHitters
+from src.video_player import VideoPlayer
+from unittest import mock
+
+
+def test_count_min_sketch_never_undercounts():
+    sketch = CountMinSketch(epsilon=0.01, delta=0.01, seed=1)
+    counts = {f"key{index}": index % 7 + 1 for index in range(500)}
+    for key, count in counts.items():
+        for _ in range(count):
+            sketch.add(key)
+    assert sketch.total == sum(counts.values())
+    for key, count in counts.items():
+        assert count <= sketch.estimate(key) <= count + sketch.error_bound
+
+
+def test_heavy_hitters_keep_frequent_keys():
+    hitters = HeavyHitters(capacity=5, epsilon=0.01)
+    for index in range(2000):
+        hitters.add(f"rare{index}")
+        if index % 4 == 0:
+            hitters.add("popular")
+        if index % 10 == 0:
+            hitters.add("common")
+    assert len(hitters) == 5
+    top = hitters.top(2)
+    assert [key for key, _ in top] == ["popular", "common"]
+    assert 500 <= top[0][1] <= 500 + hitters.error_bound
+    assert hitters.top(2, lambda key: key != "popular")[0][0] == "common"
+
+
+def test_trending_skips_flagged_videos(capfd):
+    player = VideoPlayer()
+    for video_id in ("amazing_cats_video_id", "funny_dogs_video_id", "amazing_cats_video_id",
+                     "life_at_google_video_id", "amazing_cats_video_id", "funny_dogs_video_id",
+                     "nothing_video_id"):
+        player.play_video(video_id)
+    player.stop_video()
+    player.flag_video("life_at_google_video_id")
+    capfd.readouterr()
+    player.show_trending(5)
+    out, err = capfd.readouterr()
+    assert out.splitlines() == [
+        "Here are the trending videos:",
+        "1) Amazing Cats (amazing_cats_video_id) [#cat #animal] - 3 plays",
+        "2) Funny Dogs (funny_dogs_video_id) [#dog #animal] - 2 plays",
+        "3) Video about nothing (nothing_video_id) [] - 1 play",
+    ]
+
+
+@mock.patch('builtins.input', lambda *args: 'No')
+def test_top_searches(capfd):
+    player = VideoPlayer()
+    parser = CommandParser(player)
+    player.search_videos("Cat")
+    player.search_videos("cat")
+    player.search_videos_tag("#dog")
+    player.search_tags("#cat  AND #animal")
+    player.search_tags("#CAT AND #animal")
+    player.search_tags("#cat AND #animal")
+    player.search_tags("( #cat")
+    capfd.readouterr()
+    parser.execute_command(["TOP_SEARCHES", "5"])
+    out, err = capfd.readouterr()
+    assert out.splitlines() == [
+        "Here are the top searches:",
+        "1) #cat and #animal - 3 searches",
+        "2) cat - 2 searches",
+        "3) #dog - 1 search",
+    ]
+
+
+def test_trending_empty(capfd):
+    player = VideoPlayer()
+    player.show_trending()
+    player.show_top_searches()
+    out, err = capfd.readouterr()
+    assert out.splitlines() == ["No trending videos yet", "No searches yet"]
@@ -24,3 +24,73 @@ def test_parses_video_correctly_without_tags():
     assert video.title == "Video about nothing"
     assert video.video_id == "nothing_video_id"
     assert video.tags == ()
+
+
+def test_search_titles_is_case_insensitive_and_ordered():
+    library = VideoLibrary()
+    videos = library.search_titles("CAT")
+
+    assert [video.video_id for video in videos] == [
+        "amazing_cats_video_id", "another_cat_video_id"]
+
+
+def test_search_titles_matches_each_video_once():
+    library = VideoLibrary()
+    videos = library.search_titles("o")
+
+    assert len(videos) == len({video.video_id for video in videos})
+    assert "nothing_video_id" in {video.video_id for video in videos}
+    assert library.search_titles("cats video") == []
+
+
+def test_ordinals_are_dense_and_not_reused():
+    library = VideoLibrary()
+    ordinals = [library.get_ordinal(video.video_id)
+                for video in library.get_all_videos()]
+    assert ordinals == [0, 1, 2, 3, 4]
+
+    library.remove_video("amazing_cats_video_id")
+    assert library.get_ordinal("amazing_cats_video_id") is None
+    assert library.get_video_by_ordinal(1) is None
+    assert library.get_video_by_ordinal(2).video_id == "another_cat_video_id"
+
+
+def test_flag_checks_by_ordinal():
+    library = VideoLibrary()
+    video = library.get_video("nothing_video_id")
+    ordinal = library.get_ordinal("nothing_video_id")
+    library.flag_video(video, "spam")
+    assert library.is_flagged_ordinal(ordinal)
+    library.allow_video(video)
+    assert not library.is_flagged_ordinal(ordinal)
+
+
+def test_parallel_load_matches_sequential_load(tmp_path, monkeypatch):
+    from src import video_library
+
+    catalog = tmp_path / "videos.txt"
+    catalog.write_text("".join(
+        f"Video {i} | video_{i % 40}_id | #tag{i % 3} , #all\n"
+        for i in range(100)))
+    sequential = VideoLibrary(catalog, workers=1)
+    monkeypatch.setattr(video_library, "PARALLEL_LOAD_MIN_BYTES", 0)
+    parallel = VideoLibrary(catalog, workers=3)
+
+    assert [(v.video_id, v.title, v.tags) for v in parallel.get_all_videos()] \
+        == [(v.video_id, v.title, v.tags) for v in sequential.get_all_videos()]
+    assert parallel.get_video("video_0_id").title == "Video 80"
+
+
+def test_changed_ordinals_since_a_catalog_version(monkeypatch):
+    from src import video_library
+
+    monkeypatch.setattr(video_library, "CHANGE_LOG_SIZE", 2)
+    library = VideoLibrary()
+    version = library.catalog_version
+    library.retag_video("funny_dogs_video_id", ["#dog"])
+    library.remove_video("nothing_video_id")
+
+    assert library.changed_ordinals(version) == {0, 4}
+    assert library.changed_ordinals(library.catalog_version) == set()
+    library.retag_video("amazing_cats_video_id", ["#cat"])
+    assert library.changed_ordinals(version) is None